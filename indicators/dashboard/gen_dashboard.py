@@ -3,7 +3,7 @@
 Generate TradingView Pine Script dashboard from watchlist CSV
 
 USAGE:
-    python3 gen_dashboard.py [input_csv] [output_pine]
+    python3 gen_dashboard.py [input_csv] [output_pine] [signals_csv] [--targets 1 2 3] [--account-risk 100] [--minify]
 
 EXAMPLES:
     # Use default files (watchlist.csv -> dashboard.pine)
@@ -15,6 +15,16 @@ EXAMPLES:
     # Specify both input and output files
     python3 gen_dashboard.py watchlist.csv custom_dashboard.pine
 
+    # Rank the watchlist by a candle-pattern signal matrix before filling the 20 slots
+    # (signals.csv from: python3 -m tvind.candle_patterns --prices daily.csv --watchlist watchlist.csv --output signals.csv)
+    python3 gen_dashboard.py watchlist.csv dashboard.pine signals.csv
+
+    # R multiples at 1.5R and 3R, share size for $250 risked per trade
+    python3 gen_dashboard.py --targets 1.5 3 --account-risk 250
+
+    # Minified output (tvind.pine_minify) with a per-section size report
+    python3 gen_dashboard.py watchlist.csv dashboard.pine --minify
+
 CSV FORMAT:
     The CSV file must have these columns:
     - Ticker: Stock symbol (e.g., AAPL, TSLA, GETTEX:RHM)
@@ -22,6 +32,10 @@ CSV FORMAT:
     - Stop: Stop loss price
     - Notes: Industry or notes about the stock
 
+    Rows with a non-numeric Trigger/Stop or a Stop at/above the Trigger are
+    rejected before generation. Risk per share, R-multiple targets and share
+    size are computed here and written into the script as constants.
+
 FEATURES GENERATED:
     - 20 symbol slots (auto-populated from CSV)
     - Separate Pre-MP and Post-MP columns
@@ -34,9 +48,14 @@ FEATURES GENERATED:
     - Previous Day High/Low levels
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import os
-from typing import List
+import sys
+from typing import List, Sequence
+
+DEFAULT_TARGETS = (1.0, 2.0, 3.0)
 
 def read_watchlist_csv(csv_file_path: str = 'watchlist.csv') -> pd.DataFrame:
     """Read and clean the watchlist CSV data."""
@@ -69,8 +88,74 @@ def read_watchlist_csv(csv_file_path: str = 'watchlist.csv') -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def generate_symbol_inputs(df: pd.DataFrame, max_symbols: int = 20) -> str:
-    """Generate the symbol input sections for PineScript."""
+def rank_by_signals(df: pd.DataFrame, signals_file: str) -> pd.DataFrame:
+    """Order the watchlist by the Score/Signals columns of a candle-pattern signal matrix."""
+    signals = pd.read_csv(signals_file)
+    sort_cols = [c for c in ('Score', 'Signals') if c in signals.columns]
+    if 'Ticker' not in signals.columns or not sort_cols:
+        print(f"Warning: {signals_file} has no Ticker/Score columns, keeping CSV order")
+        return df
+
+    ranks = signals.drop_duplicates('Ticker').set_index('Ticker')
+    ranked = df.copy()
+    for col in sort_cols:
+        ranked[col] = ranked['Ticker'].str.strip().map(ranks[col]).fillna(float('-inf'))
+    # Stable sort keeps the CSV order between tickers with equal scores
+    ranked = ranked.sort_values(sort_cols, ascending=False, kind='stable')
+    return ranked.drop(columns=sort_cols).reset_index(drop=True)
+
+
+def compute_trade_plan(df: pd.DataFrame, targets: Sequence[float] = DEFAULT_TARGETS,
+                       account_risk: float = None):
+    """
+    Numeric trigger/stop, risk per share, R-multiple targets and share size for
+    every row at once. Returns (valid rows with the new columns, rejected rows
+    with a Reason). Rows without a trigger or stop are kept without a plan.
+    """
+    trigger_str = df['Trigger'].astype(str).str.strip()
+    stop_str = df['Stop'].astype(str).str.strip()
+    trigger = pd.to_numeric(trigger_str, errors='coerce')
+    stop = pd.to_numeric(stop_str, errors='coerce')
+
+    reason = pd.Series('', index=df.index)
+    reason[(trigger_str != '') & trigger.isna()] = 'non-numeric Trigger'
+    reason[(reason == '') & (stop_str != '') & stop.isna()] = 'non-numeric Stop'
+    reason[(reason == '') & (trigger <= 0)] = 'Trigger must be positive'
+    reason[(reason == '') & (stop >= trigger)] = 'Stop at or above Trigger'
+
+    plan = df.copy()
+    plan['Trigger_Num'] = trigger
+    plan['Stop_Num'] = stop
+    plan['Risk'] = trigger - stop
+    plan['Risk %'] = plan['Risk'] / trigger * 100
+    for k in targets:
+        plan[f'{k:g}R'] = trigger + k * plan['Risk']
+    if account_risk:
+        plan['Shares'] = np.floor(account_risk / plan['Risk'])
+
+    rejected = df[reason != ''].assign(Reason=reason[reason != ''])
+    return plan[reason == ''].reset_index(drop=True), rejected
+
+
+def _pine_float(value) -> str:
+    """Float literal for Pine, 'na' for missing values."""
+    return 'na' if pd.isna(value) else repr(round(float(value), 6))
+
+
+def _plan_tooltip(row, targets: Sequence[float]) -> str:
+    """One-line trade plan shown as the R:R cell tooltip."""
+    if pd.isna(row.get('Risk')):
+        return ''
+    parts = [f"Risk {row['Risk']:.2f} ({row['Risk %']:.1f}%)"]
+    parts += [f"{k:g}R {row[f'{k:g}R']:.2f}" for k in targets]
+    if 'Shares' in row and pd.notna(row['Shares']):
+        parts.append(f"Shares {int(row['Shares'])}")
+    return ' | '.join(parts)
+
+
+def generate_symbol_inputs(df: pd.DataFrame, max_symbols: int = 20,
+                           targets: Sequence[float] = DEFAULT_TARGETS) -> str:
+    """Generate the symbol input sections for PineScript (df from compute_trade_plan)."""
     symbol_inputs = []
 
     for i in range(1, max_symbols + 1):
@@ -78,8 +163,10 @@ def generate_symbol_inputs(df: pd.DataFrame, max_symbols: int = 20) -> str:
             row = df.iloc[i-1]
             ticker = str(row['Ticker']).strip() if pd.notna(row['Ticker']) else ''
             name = ticker  # Use ticker as name
-            trigger = str(row['Trigger']).strip() if pd.notna(row['Trigger']) and str(row['Trigger']).strip() != '' else ''
-            stop = str(row['Stop']).strip() if pd.notna(row['Stop']) and str(row['Stop']).strip() != '' else ''
+            trigger = _pine_float(row['Trigger_Num'])
+            stop = _pine_float(row['Stop_Num'])
+            risk = _pine_float(row['Risk'])
+            plan = _plan_tooltip(row, targets)
             notes = str(row['Notes']).strip() if pd.notna(row['Notes']) else ''
 
             # Escape single quotes in notes for PineScript
@@ -89,16 +176,20 @@ def generate_symbol_inputs(df: pd.DataFrame, max_symbols: int = 20) -> str:
         else:
             ticker = ''
             name = ''
-            trigger = ''
-            stop = ''
+            trigger = 'na'
+            stop = 'na'
+            risk = 'na'
+            plan = ''
             notes = ''
             show = 'false'
 
         symbol_input = f"""show_{i} = input.bool({show}, '', group='Symbols', inline='Line {i}', display = display.none)
 ticker_{i} = input.symbol('{ticker}', '', group='Symbols', inline='Line {i}', display = display.none)
 name_{i} = input.string('{name}', '', group='Symbols', inline='Line {i}', display = display.none)
-trigger_{i} = input.string('{trigger}', 'Trigger', group='Symbols', inline='Line {i}', display = display.none)
-stop_{i} = input.string('{stop}', 'Stop', group='Symbols', inline='Line {i}', display = display.none)
+float trigger_{i} = {trigger}
+float stop_{i} = {stop}
+float risk_{i} = {risk}
+plan_{i} = '{plan}'
 notes_{i} = input.string('{notes}', 'Notes', group='Symbols', inline='Line {i}', display = display.none)
 bg_{i} = input.color(color.new(#909090, 70), '', group='Symbols', inline='Line {i}', display = display.none)
 txt_{i} = input.color(#d6d6d6, '', group='Symbols', inline='Line {i}', display = display.none)"""
@@ -118,7 +209,7 @@ def generate_table_rows(max_symbols: int = 20) -> str:
 [s{i}_kicker, s{i}_oel, s{i}_oeh, s{i}_oopsUp, s{i}_oopsDn, s{i}_inside, s{i}_engulf, s{i}_b3Up, s{i}_b3Dn] = combo_data(ticker_{i})
 s{i}_pdh = _pdh(ticker_{i})
 s{i}_pdl = _pdl(ticker_{i})
-row := _t(show_{i}, ticker_{i}, name_{i}, txt_{i}, bg_{i}, _val(ticker_{i}, name_{i}), trigger_{i}, stop_{i}, notes_{i}, row, s{i}_sling, s{i}_slingprice, s{i}_pv_signal, s{i}_pv_price, s{i}_kicker, s{i}_oopsUp, s{i}_oopsDn, s{i}_oel, s{i}_oeh, s{i}_inside, s{i}_engulf, s{i}_b3Up, s{i}_b3Dn, s{i}_pdh, s{i}_pdl, {i-1})"""
+row := _t(show_{i}, ticker_{i}, name_{i}, txt_{i}, bg_{i}, _val(ticker_{i}, name_{i}), trigger_{i}, stop_{i}, risk_{i}, plan_{i}, notes_{i}, row, s{i}_sling, s{i}_slingprice, s{i}_pv_signal, s{i}_pv_price, s{i}_kicker, s{i}_oopsUp, s{i}_oopsDn, s{i}_oel, s{i}_oeh, s{i}_inside, s{i}_engulf, s{i}_b3Up, s{i}_b3Dn, s{i}_pdh, s{i}_pdl, {i-1})"""
 
         table_rows.append(table_row)
 
@@ -272,20 +363,16 @@ _dist(price, metric_value) =>
     na(price) or na(metric_value) or metric_value == 0 ? na : (price - metric_value) / metric_value * 100
 
 // Helper functions to determine colors based on value comparison with price
-_get_value_text_color(value_str, price) =>
+_get_value_text_color(value, price) =>
     color.white  // Always white text for better contrast
 
-_get_value_bg_color(value_str, price) =>
-    if value_str == '' or na(price)
+_get_value_bg_color(value, price) =>
+    if na(value) or na(price)
         color.new(#2D3748, 0)  // Neutral dark gray
+    else if value < 0 or price < value
+        color.new(#7D1007, 0)  // Dark red background (bearish)
     else
-        value_num = str.tonumber(value_str)
-        if na(value_num)
-            color.new(#2D3748, 0)  // Neutral dark gray
-        else if value_num < 0 or price < value_num
-            color.new(#7D1007, 0)  // Dark red background (bearish)
-        else
-            color.new(#1B4332, 0)  // Dark green background (bullish)
+        color.new(#1B4332, 0)  // Dark green background (bullish)
 
 // Slingshot
 _sling(ticker, emaLen) =>
@@ -455,7 +542,7 @@ fill_offset(row) =>
             table.cell(tab, j, row, "", text_color=color.new(color.white, 100))
 
 // Dynamic Table row function with conditional column rendering
-_t(show, tkr, name, txtcol, bgcol, chg, trigger, stop, notes, base_row, sling, sling_price, pv_signal, pv_price,
+_t(show, tkr, name, txtcol, bgcol, chg, trigger, stop, risk, plan, notes, base_row, sling, sling_price, pv_signal, pv_price,
    kicker, oopsUp, oopsDn, oel, oeh, inside, engulf, b3Up, b3Dn, pdh, pdl, symbol_index) =>
     if show and (tkr != '' or name == "-")
         fill_offset(base_row)
@@ -484,38 +571,29 @@ _t(show, tkr, name, txtcol, bgcol, chg, trigger, stop, notes, base_row, sling, s
         d2_s = show_distances ? (na(d2) ? "" : str.tostring(d2, "#.##") + "%") : ""
         d3_s = show_distances ? (na(d3) ? "" : str.tostring(d3, "#.##") + "%") : ""
 
-        // Trading data
-        trigger_cell = show_trading ? (trigger == '' ? '' : trigger) : ''
-        stop_cell = show_trading ? (stop == '' ? '' : stop) : ''
+        // Trading data (trigger, stop and risk = trigger - stop are constants from gen_dashboard.py)
+        trigger_cell = show_trading and not na(trigger) ? str.tostring(trigger) : ''
+        stop_cell = show_trading and not na(stop) ? str.tostring(stop) : ''
         notes_cell = show_notes ? (notes == '' ? '' : notes) : ''
 
-        // Risk:Reward calculation: (trigger - current_price) / (trigger - stop)
-        float rr_ratio = na
-        rr_cell = ''
-        if show_trading and trigger_cell != '' and stop_cell != '' and not na(p)
-            trigger_num = str.tonumber(trigger_cell)
-            stop_num = str.tonumber(stop_cell)
-            if not na(trigger_num) and not na(stop_num) and trigger_num != stop_num
-                reward = trigger_num - p
-                risk = trigger_num - stop_num
-                if risk != 0
-                    rr_ratio := reward / risk
-                    rr_cell := str.tostring(rr_ratio, "#.##")
+        // Risk:Reward calculation: (trigger - current_price) / risk
+        float rr_ratio = show_trading and not na(risk) and not na(p) ? (trigger - p) / risk : na
+        rr_cell = na(rr_ratio) ? '' : str.tostring(rr_ratio, "#.##")
 
         // Colors
-        trigger_txt_color = show_trading ? _get_value_text_color(trigger_cell, p) : color.white
-        trigger_bg_color = show_trading ? _get_value_bg_color(trigger_cell, p) : color.new(#2D3748, 0)
-        stop_txt_color = show_trading ? _get_value_text_color(stop_cell, p) : color.white
-        stop_bg_color = show_trading ? _get_value_bg_color(stop_cell, p) : color.new(#2D3748, 0)
+        trigger_txt_color = show_trading ? _get_value_text_color(trigger, p) : color.white
+        trigger_bg_color = show_trading ? _get_value_bg_color(trigger, p) : color.new(#2D3748, 0)
+        stop_txt_color = show_trading ? _get_value_text_color(stop, p) : color.white
+        stop_bg_color = show_trading ? _get_value_bg_color(stop, p) : color.new(#2D3748, 0)
 
         // R:R colors: green for favorable (>1), red for unfavorable (<1), gray for neutral
         rr_txt_color = show_trading ? color.white : color.white
         rr_bg_color = show_trading ? (rr_cell == '' or na(rr_ratio) ? color.new(#2D3748, 0) : rr_ratio > 1 ? color.new(#1B4332, 0) : rr_ratio < 1 ? color.new(#7D1007, 0) : color.new(#2D3748, 0)) : color.new(#2D3748, 0)
 
-        pdh_txt_color = show_price_levels ? _get_value_text_color(str.tostring(pdh, "#.##"), p) : color.white
-        pdh_bg_color = show_price_levels ? _get_value_bg_color(str.tostring(pdh, "#.##"), p) : color.new(#2D3748, 0)
-        pdl_txt_color = show_price_levels ? _get_value_text_color(str.tostring(pdl, "#.##"), p) : color.white
-        pdl_bg_color = show_price_levels ? _get_value_bg_color(str.tostring(pdl, "#.##"), p) : color.new(#2D3748, 0)
+        pdh_txt_color = show_price_levels ? _get_value_text_color(pdh, p) : color.white
+        pdh_bg_color = show_price_levels ? _get_value_bg_color(pdh, p) : color.new(#2D3748, 0)
+        pdl_txt_color = show_price_levels ? _get_value_text_color(pdl, p) : color.white
+        pdl_bg_color = show_price_levels ? _get_value_bg_color(pdl, p) : color.new(#2D3748, 0)
 
         // Performance column colors - simplified to only Chg %
         perf_txt_color = show_basic ? color.white : color.white
@@ -567,7 +645,7 @@ _t(show, tkr, name, txtcol, bgcol, chg, trigger, stop, notes, base_row, sling, s
             current_col += 1
             table.cell(tab, current_col, base_row, stop_cell, text_color=stop_txt_color, text_size=tab_size, bgcolor=stop_bg_color, text_font_family=font)
             current_col += 1
-            table.cell(tab, current_col, base_row, rr_cell, text_color=rr_txt_color, text_size=tab_size, bgcolor=rr_bg_color, text_font_family=font)
+            table.cell(tab, current_col, base_row, rr_cell, text_color=rr_txt_color, text_size=tab_size, bgcolor=rr_bg_color, text_font_family=font, tooltip=plan)
             current_col += 1
 
         // Slingshot columns
@@ -642,7 +720,21 @@ def get_template_footer() -> str:
 // --- END OF SCRIPT ---"""
 
 
-def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dashboard.pine'):
+def minify_script(script: str) -> str:
+    """The script minified with tvind.pine_minify (checked against the original), with its size report."""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')))
+    from tvind.pine_minify import minify, print_report, verify
+
+    print("Minifying Pine Script...")
+    text, info = minify(script)
+    verify(script, text, info)
+    print_report(info, len(script), len(text))
+    return text
+
+
+def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dashboard.pine',
+                       signals_file: str = None, targets: Sequence[float] = DEFAULT_TARGETS,
+                       account_risk: float = None, minified: bool = False):
     """Main function to generate dashboard.pine from watchlist CSV."""
     try:
         print(f"Reading watchlist CSV: {csv_file}")
@@ -654,9 +746,23 @@ def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dash
 
         print(f"Found {len(df)} symbols in watchlist")
 
+        df, rejected = compute_trade_plan(df, targets, account_risk)
+        if not rejected.empty:
+            print(f"\n[!ALERT] Rejected {len(rejected)} rows:")
+            for _, row in rejected.iterrows():
+                print(f"  {row['Ticker']}: Trigger={row['Trigger']}, Stop={row['Stop']} -> {row['Reason']}")
+            print()
+        if df.empty:
+            print("Error: No valid rows left after validation.")
+            return False
+
+        if signals_file:
+            print(f"Ranking by signal matrix: {signals_file}")
+            df = rank_by_signals(df, signals_file)
+
         # Generate dynamic sections
         print("Generating symbol inputs...")
-        symbol_inputs = generate_symbol_inputs(df, max_symbols=20)
+        symbol_inputs = generate_symbol_inputs(df, max_symbols=20, targets=targets)
 
         print("Generating table rows...")
         table_rows = generate_table_rows(max_symbols=20)
@@ -669,6 +775,9 @@ def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dash
         pinescript_content += table_rows
         pinescript_content += get_template_footer()
 
+        if minified:
+            pinescript_content = minify_script(pinescript_content)
+
         # Write to output file
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(pinescript_content)
@@ -683,7 +792,8 @@ def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dash
         print(f"Output file: {output_file}")
         print("\nFirst 5 symbols:")
         for i, row in df.head(5).iterrows():
-            print(f"  {i+1}. {row['Ticker']}: Trigger={row['Trigger']}, Stop={row['Stop']}")
+            print(f"  {i+1}. {row['Ticker']}: Trigger={row['Trigger']}, Stop={row['Stop']}"
+                  f"{' | ' + _plan_tooltip(row, targets) if pd.notna(row['Risk']) else ''}")
         print("="*60)
 
         return True
@@ -695,12 +805,19 @@ def generate_dashboard(csv_file: str = 'watchlist.csv', output_file: str = 'dash
         return False
 
 
-if __name__ == "__main__":
-    import sys
-
+def main():
     # Allow command-line arguments for input and output files
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else 'watchlist.csv'
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'dashboard.pine'
+    parser = argparse.ArgumentParser(description="Generate the TradingView dashboard from a watchlist CSV")
+    parser.add_argument('csv_file', nargs='?', default='watchlist.csv')
+    parser.add_argument('output_file', nargs='?', default='dashboard.pine')
+    parser.add_argument('signals_file', nargs='?', help="Candle-pattern signal matrix to rank tickers by")
+    parser.add_argument('--targets', type=float, nargs='+', default=list(DEFAULT_TARGETS),
+                        help="R multiples for the target prices (default: 1 2 3)")
+    parser.add_argument('--account-risk', type=float, help="Amount risked per trade, for the share size")
+    parser.add_argument('--minify', action='store_true',
+                        help="Minify the generated script (comments, layout, local names, repeated strings)")
+    args = parser.parse_args()
+    csv_file, output_file, signals_file = args.csv_file, args.output_file, args.signals_file
 
     print("="*60)
     print("TradingView Dashboard Generator")
@@ -709,10 +826,14 @@ if __name__ == "__main__":
     print(f"Output file: {output_file}")
     print("="*60 + "\n")
 
-    success = generate_dashboard(csv_file, output_file)
+    success = generate_dashboard(csv_file, output_file, signals_file, args.targets, args.account_risk, args.minify)
 
     if success:
         print("\n🎉 Generation complete! You can now load dashboard.pine into TradingView.")
     else:
         print("\n❌ Generation failed. Please check the errors above.")
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
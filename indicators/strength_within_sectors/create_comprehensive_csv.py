@@ -4,12 +4,14 @@ Create CSV with ALL industries as columns and top 39 stocks as rows.
 Industries are sorted alphabetically, stocks are already sorted by market cap in HTML.
 """
 
+import argparse
 import os
-from bs4 import BeautifulSoup
 import csv
 
-HTML_DIR = "/home/imagda/_invest2024/tradingview/myIndicators/stock_vs_industry_industry_vs_SPY/docus/industries_stocks_market_cap"
-OUTPUT_CSV = "/home/imagda/_invest2024/tradingview/myIndicators/stock_vs_industry_industry_vs_SPY/all_industries_top39_by_marketcap.csv"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Saved "<Industry> Industry Performance — USA — TradingView" pages (override with --html-dir)
+HTML_DIR = os.path.join(SCRIPT_DIR, "industries_stocks_market_cap")
+OUTPUT_CSV = os.path.join(SCRIPT_DIR, "all_industries_top39_by_marketcap.csv")
 
 def clean_industry_name(filename):
     """Extract clean industry name from filename"""
@@ -19,6 +21,8 @@ def clean_industry_name(filename):
 
 def extract_top_stocks(html_file, max_stocks=39):
     """Extract top N stock symbols from HTML (already sorted by market cap)"""
+    from bs4 import BeautifulSoup
+
     with open(html_file, 'r', encoding='utf-8') as f:
         soup = BeautifulSoup(f, 'html.parser')
     
@@ -60,13 +64,22 @@ def extract_top_stocks(html_file, max_stocks=39):
     return stocks[:max_stocks]
 
 def main():
+    parser = argparse.ArgumentParser(description="Top 39 stocks per industry from saved TradingView industry pages")
+    parser.add_argument('--html-dir', default=HTML_DIR, help="Directory of the saved industry HTML pages")
+    parser.add_argument('--output', default=OUTPUT_CSV, help="CSV to write (industries as columns)")
+    args = parser.parse_args()
+    html_dir, output_csv = args.html_dir, args.output
+    if not os.path.isdir(html_dir):
+        print(f"Error: HTML directory not found at {html_dir}")
+        return
+
     print("=" * 70)
     print("Creating Comprehensive Industry CSV (Top 39 Stocks by Market Cap)")
     print("=" * 70)
     
     # Find all HTML files
     html_files = []
-    for filename in sorted(os.listdir(HTML_DIR)):
+    for filename in sorted(os.listdir(html_dir)):
         if filename.endswith('.html'):
             html_files.append(filename)
     
@@ -77,7 +90,7 @@ def main():
     
     for filename in html_files:
         industry_name = clean_industry_name(filename)
-        html_path = os.path.join(HTML_DIR, filename)
+        html_path = os.path.join(html_dir, filename)
         stocks = extract_top_stocks(html_path, max_stocks=39)
         
         if stocks:
@@ -90,7 +103,7 @@ def main():
     # Sort industries alphabetically
     sorted_industries = sorted(all_industries.keys())
     
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
+    with open(output_csv, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         
         # Header row - industry names
@@ -107,7 +120,7 @@ def main():
                     row.append('')  # Empty cell if industry has fewer stocks
             writer.writerow(row)
     
-    print(f"\n✓ Created: {OUTPUT_CSV}")
+    print(f"\n✓ Created: {output_csv}")
     print(f"✓ Industries: {len(sorted_industries)}")
     print(f"✓ Max stocks per industry: 39")
     print("=" * 70)
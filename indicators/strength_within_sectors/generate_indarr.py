@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Generate the Pine Script indArr block (industry -> peer symbols) for
+strength_within_sectors.pine.
+
+Two encodings are supported:
+    classic - one industry.new('<name>', array.from('SYM1', 'SYM2', ...)) per line
+              (the format of indArr_v1_generated.txt)
+    packed  - an indNames lookup table plus one ','-joined symbol string per
+              industry. The industry code is its index in indNames; each string is
+              split once with str.split on the first bar.
+
+The packed encoding drops the quotes, commas and spaces around every symbol and
+the industry.new/array.from wrappers around every industry, so roughly twice as
+many stocks fit under TradingView's 80,000 character limit.
+
+USAGE:
+    python3 generate_indarr.py [--encoding classic|packed] [--output FILE]
+    python3 generate_indarr.py --from-pine strength_within_sectors.pine --encoding packed --in-place
+    python3 generate_indarr.py --from-pine strength_within_sectors.pine --minified strength_within_sectors.min.pine
+
+EXAMPLES:
+    # Build from the market cap CSVs (60% rule allocations), write packed block
+    python3 generate_indarr.py --encoding packed --output indArr_packed.txt
+
+    # Re-encode the indArr already embedded in the indicator, in place
+    python3 generate_indarr.py --from-pine strength_within_sectors.pine --encoding packed --in-place
+
+    # Also write a minified copy of the whole script to paste into TradingView (tvind.pine_minify)
+    python3 generate_indarr.py --from-pine strength_within_sectors.pine --minified strength_within_sectors.min.pine
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP39_CSV = os.path.join(SCRIPT_DIR, 'all_industries_top39_by_marketcap.csv')
+ALLOCATION_CSV = os.path.join(SCRIPT_DIR, 'all_industries_top39_stock_counts.csv')
+
+PINE_CHAR_LIMIT = 80000
+DEFAULT_INCLUDE_TOP = 5
+
+# Matches an existing indArr block in either encoding, up to its closing paren line
+CLASSIC_BLOCK_RE = re.compile(r"var indArr\s*=\s*array\.from\(\n.*?\n\s*\)\n", re.S)
+PACKED_BLOCK_RE = re.compile(r"// indArr \(packed\).*?\n(?:var indNames.*?\n)?var indSyms.*?"
+                             r"indArr\.push\(industry\.new\(.*?\)\)\)\n", re.S)
+INDUSTRY_RE = re.compile(r"industry\.new\('((?:[^'\\]|\\.)*)',\s*array\.from\(([^)]*)\)\)")
+STRING_RE = re.compile(r"'((?:[^'\\]|\\.)*)'")
+
+
+def load_allocations(allocation_csv):
+    """Read the 'Include top' column (60% rule applied) per industry."""
+    allocations = {}
+    with open(allocation_csv, 'r') as f:
+        for row in csv.DictReader(f):
+            allocations[row['Industry']] = int(row['Include top'])
+    return allocations
+
+
+def load_industries_from_csv(top39_csv, allocation_csv):
+    """Build {industry: [symbols]} from the market cap CSV, cut at each allocation."""
+    allocations = load_allocations(allocation_csv)
+
+    with open(top39_csv, 'r') as f:
+        reader = csv.reader(f)
+        industry_names = next(reader)
+        all_rows = list(reader)
+
+    industries = {}
+    for idx, industry_name in enumerate(industry_names):
+        industry_name = industry_name.strip()
+        if not industry_name:
+            continue
+        stocks = [row[idx].strip() for row in all_rows if idx < len(row) and row[idx].strip()]
+        include_top = allocations.get(industry_name, DEFAULT_INCLUDE_TOP)
+        industries[industry_name] = stocks[:include_top]
+
+    return dict(sorted(industries.items()))
+
+
+def load_industries_from_pine(pine_path):
+    """Parse the indArr block of an existing Pine script (either encoding)."""
+    with open(pine_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    packed = PACKED_BLOCK_RE.search(source)
+    if packed:
+        names_line, syms_block = packed.group(0).split('var indSyms', 1)
+        names = STRING_RE.findall(names_line.split('var indNames', 1)[1])
+        packed_syms = STRING_RE.findall(syms_block.split('var indArr', 1)[0])
+        return {pine_unquote(name): [s for s in pine_unquote(syms).split(',') if s]
+                for name, syms in zip(names, packed_syms)}
+
+    industries = {}
+    for name, symbols in INDUSTRY_RE.findall(source):
+        industries[pine_unquote(name)] = [pine_unquote(s) for s in STRING_RE.findall(symbols)]
+    return industries
+
+
+def pine_quote(text):
+    """Escape a value for a single-quoted Pine string literal."""
+    return text.replace('\\', '\\\\').replace("'", "\\'")
+
+
+def pine_unquote(text):
+    """Reverse pine_quote for a parsed literal body."""
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def encode_classic(industries):
+    """One industry.new() per line, identical to indArr_v1_generated.txt."""
+    lines = []
+    for name, symbols in industries.items():
+        syms = ', '.join(f"'{pine_quote(s)}'" for s in symbols)
+        lines.append(f"     industry.new('{pine_quote(name)}', array.from({syms}))")
+    return "var indArr=array.from(\n" + ",\n".join(lines) + "\n     )\n"
+
+
+def encode_packed(industries):
+    """indNames lookup table + one ','-joined symbol string per industry code."""
+    for name, symbols in industries.items():
+        bad = [s for s in symbols if ',' in s]
+        if bad:
+            raise ValueError(f"Symbols in '{name}' contain the ',' delimiter: {bad}")
+
+    names = ','.join(f"'{pine_quote(name)}'" for name in industries)
+    packed = ",\n".join(f"     '{pine_quote(','.join(symbols))}'" for symbols in industries.values())
+    return ("// indArr (packed): industry code i -> indNames[i], symbols split once from indSyms[i]\n"
+            f"var indNames=array.from({names})\n"
+            "var indSyms=array.from(\n"
+            f"{packed}\n"
+            "     )\n"
+            "var indArr=array.new<industry>()\n"
+            "if barstate.isfirst\n"
+            "    for [i, n] in indNames\n"
+            "        indArr.push(industry.new(n, str.split(indSyms.get(i), ',')))\n")
+
+
+ENCODERS = {
+    'classic': encode_classic,
+    'packed': encode_packed,
+}
+
+
+def replace_block(source, block):
+    """Swap the indArr block of a Pine script (either encoding) for a new one."""
+    for pattern in (PACKED_BLOCK_RE, CLASSIC_BLOCK_RE):
+        if pattern.search(source):
+            return pattern.sub(lambda _: block, source, count=1)
+    raise ValueError("No indArr block found in Pine script")
+
+
+def report(industries, blocks, script_chars=None, current_block_chars=None):
+    """Print before/after character counts and how many stocks fit the limit."""
+    total_stocks = sum(len(s) for s in industries.values())
+    classic_chars = len(blocks['classic'])
+    packed_chars = len(blocks['packed'])
+    saved = classic_chars - packed_chars
+
+    print(f"\n📊 indArr CHARACTER COUNT:")
+    print(f"  Industries: {len(industries)}")
+    print(f"  Stocks: {total_stocks:,}")
+    print(f"  Classic: {classic_chars:,} characters ({classic_chars / max(total_stocks, 1):.1f} per stock)")
+    print(f"  Packed:  {packed_chars:,} characters ({packed_chars / max(total_stocks, 1):.1f} per stock)")
+    print(f"  Saved:   {saved:,} characters ({saved / max(classic_chars, 1) * 100:.1f}%)")
+
+    if script_chars is None:
+        return
+
+    rest = script_chars - (current_block_chars or 0)
+    print(f"\nTradingView Limit ({PINE_CHAR_LIMIT:,}):")
+    for encoding in ('classic', 'packed'):
+        total = rest + len(blocks[encoding])
+        per_stock = len(blocks[encoding]) / max(total_stocks, 1)
+        capacity = int((PINE_CHAR_LIMIT - rest) / per_stock) if per_stock else 0
+        status = f"UNDER by {PINE_CHAR_LIMIT - total:,}" if total <= PINE_CHAR_LIMIT else f"OVER by {total - PINE_CHAR_LIMIT:,}"
+        print(f"  {encoding:8} script: {total:,} characters ({status}), ~{capacity:,} stocks fit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the indArr block for strength_within_sectors.pine")
+    parser.add_argument('--encoding', choices=sorted(ENCODERS), default='packed')
+    parser.add_argument('--top39-csv', default=TOP39_CSV)
+    parser.add_argument('--allocation-csv', default=ALLOCATION_CSV)
+    parser.add_argument('--from-pine', help="Re-encode the indArr of an existing Pine script instead of the CSVs")
+    parser.add_argument('--output', help="Write the generated block to this file")
+    parser.add_argument('--in-place', action='store_true', help="Replace the indArr block inside --from-pine")
+    parser.add_argument('--minified', metavar='FILE',
+                        help="Write --from-pine with the new block, minified, to FILE and report its size")
+    args = parser.parse_args()
+
+    if args.in_place and not args.from_pine:
+        parser.error("--in-place requires --from-pine")
+    if args.minified and not args.from_pine:
+        parser.error("--minified requires --from-pine")
+
+    script_source = None
+    current_block_chars = None
+    if args.from_pine:
+        print(f"Reading indArr from: {args.from_pine}")
+        industries = load_industries_from_pine(args.from_pine)
+        with open(args.from_pine, 'r', encoding='utf-8') as f:
+            script_source = f.read()
+        match = PACKED_BLOCK_RE.search(script_source) or CLASSIC_BLOCK_RE.search(script_source)
+        current_block_chars = len(match.group(0)) if match else 0
+    else:
+        print(f"Reading: {args.top39_csv}")
+        print(f"Allocations: {args.allocation_csv}")
+        industries = load_industries_from_csv(args.top39_csv, args.allocation_csv)
+
+    if not industries:
+        print("Error: No industries found.")
+        return
+
+    blocks = {name: encode(industries) for name, encode in ENCODERS.items()}
+    report(industries, blocks,
+           len(script_source) if script_source is not None else None,
+           current_block_chars)
+
+    block = blocks[args.encoding]
+    if args.in_place:
+        with open(args.from_pine, 'w', encoding='utf-8') as f:
+            f.write(replace_block(script_source, block))
+        print(f"\n✓ Updated indArr ({args.encoding}) in {args.from_pine}")
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(block)
+        print(f"\n✓ Created: {args.output}")
+    elif not args.minified:
+        print()
+        print(block)
+
+    if args.minified:
+        write_minified(replace_block(script_source, block), args.minified)
+
+
+def write_minified(script, path):
+    """Minify the complete script with tvind.pine_minify and print its per-section sizes."""
+    sys.path.insert(0, os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..')))
+    from tvind.pine_minify import minify, print_report, verify
+
+    text, info = minify(script)
+    try:
+        verify(script, text, info)
+    except ValueError as e:
+        print(f"Error: minified script does not match the original ({e}), not written")
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"\n✓ Created minified script: {path}\n")
+    print_report(info, len(script), len(text), PINE_CHAR_LIMIT)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,12 @@ Generates combined chart+table visualizations for PV breakout and gap signals.
 Reads configuration from config_pv_screener.txt
 """
 
+import argparse
 import ast
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
 import re
+import sys
 from datetime import datetime
 
 # Configuration
@@ -20,9 +21,14 @@ CONFIG_FILE = os.path.join(SCRIPT_DIR, 'config_pv_screener.txt')
 # Output directory to png subdirectory
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'png')
 
+sys.path.insert(0, os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..')))
+from tvind.screener_csv import for_display, read_export
+
 def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
                 chart_metric=None, filter_expression='', sort_ascending=False,
                 show_bottom=True, sort_columns=None, sort_ascending_list=None):
+    import matplotlib.pyplot as plt  # deferred so --help and config errors start fast
+
     # If path is relative, join with WORK_DIR, else use as is
     if not os.path.isabs(input_csv_path):
         input_csv_path = os.path.join(WORK_DIR, input_csv_path)
@@ -31,8 +37,8 @@ def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
     print(f"Processing: {input_filename}...")
 
     try:
-        # Load Data
-        df = pd.read_csv(input_csv_path)
+        # Load Data (typed per screener profile; every column, the filter may use any)
+        df = read_export(input_csv_path)
         print(f"  Loaded: {len(df)} rows")
 
         # Apply filter if specified
@@ -55,7 +61,7 @@ def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
             missing = set(columns_to_keep) - set(available_columns)
             print(f"  Warning: Missing columns in {input_filename}: {missing}")
 
-        df_selected = df_filtered[available_columns].copy()
+        df_selected = for_display(df_filtered[available_columns])
 
         # Handle missing values
         # Replace empty strings with NaN
@@ -432,7 +438,9 @@ def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
                     with open(watchlist_path, 'w') as f:
                         # Write header comment
                         f.write(f"# TradingView Watchlist: io-PVscreener\n")
-                        f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                        # The export's date, not the wall clock: a re-render of the same export
+                        # writes identical bytes, so the pipeline does not rerun the steps below
+                        f.write(f"# Generated: {file_date if date_match else os.path.basename(input_filename)}\n")
                         f.write(f"# Filter: PV Days Ago < 20 AND Gap Days Ago < 20\n")
                         f.write(f"# Stocks: {len(symbols)}\n")
                         f.write(f"# Sort: PV Days Ago (asc), Gap1 Size % (desc)\n")
@@ -586,7 +594,17 @@ def parse_config(config_path):
     return files, columns_to_keep, sort_column, rows_to_display, chart_metric, filter_expression, sort_ascending, show_bottom, sort_columns, sort_ascending_list
 
 def main():
-    config_path = CONFIG_FILE
+    global WORK_DIR, OUTPUT_DIR
+    parser = argparse.ArgumentParser(description="PV breakout / gap charts and tables from the config's files to run")
+    parser.add_argument('config', nargs='?', default=CONFIG_FILE, help="Config file (default: config_pv_screener.txt)")
+    parser.add_argument('--work-dir', default=WORK_DIR, help="Directory of the exported CSVs")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for the PNGs and watchlists")
+    args = parser.parse_args()
+    WORK_DIR, OUTPUT_DIR = args.work_dir, args.output_dir
+
+    config_path = args.config
+    if not os.path.isabs(config_path) and not os.path.exists(config_path):
+        config_path = os.path.join(SCRIPT_DIR, config_path)
     if not os.path.exists(config_path):
         print(f"Error: Config file not found at {config_path}")
         return
@@ -1,8 +1,9 @@
+import argparse
 import ast
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
 import re
+import sys
 from datetime import datetime
 
 # Configuration
@@ -13,8 +14,13 @@ CONFIG_FILE = os.path.join(SCRIPT_DIR, 'run_top_losers_gainers_v2.txt')
 # Output directory to png subdirectory
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'png')
 
+sys.path.insert(0, os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..')))
+from tvind.screener_csv import for_display, read_export
+
 def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
                 chart_metric=None, generate_charts=True, generate_tables=True):
+    import matplotlib.pyplot as plt  # deferred so --help and config errors start fast
+
     # If path is relative, join with WORK_DIR, else use as is
     if not os.path.isabs(input_csv_path):
         input_csv_path = os.path.join(WORK_DIR, input_csv_path)
@@ -23,8 +29,8 @@ def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
     print(f"Processing: {input_filename}...")
     
     try:
-        # Load Data
-        df = pd.read_csv(input_csv_path)
+        # Load Data (only the configured columns, typed per screener profile)
+        df = read_export(input_csv_path, usecols=set(columns_to_keep) | {sort_column, chart_metric})
         
         # Select Columns
         available_columns = [col for col in columns_to_keep if col in df.columns]
@@ -32,7 +38,7 @@ def process_csv(input_csv_path, columns_to_keep, sort_column, rows_to_display,
             missing = set(columns_to_keep) - set(available_columns)
             print(f"  Warning: Missing columns in {input_filename}: {missing}")
         
-        df_filtered = df[available_columns].copy()
+        df_filtered = for_display(df[available_columns])
         
         # Handle NaN
         df_filtered = df_filtered.fillna(0)
@@ -379,7 +385,18 @@ def parse_config(config_path):
     return files, columns_to_keep, sort_column, rows_to_display, chart_metric, generate_charts, generate_tables
 
 def main():
-    config_path = CONFIG_FILE
+    global WORK_DIR, OUTPUT_DIR
+    parser = argparse.ArgumentParser(description="Perf screener tables and charts from the config's files to run")
+    parser.add_argument('config', nargs='?', default=CONFIG_FILE,
+                        help="Config file, e.g. run_sector_rotation.txt (default: run_top_losers_gainers_v2.txt)")
+    parser.add_argument('--work-dir', default=WORK_DIR, help="Directory of the exported CSVs")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for the PNGs")
+    args = parser.parse_args()
+    WORK_DIR, OUTPUT_DIR = args.work_dir, args.output_dir
+
+    config_path = args.config
+    if not os.path.isabs(config_path) and not os.path.exists(config_path):
+        config_path = os.path.join(SCRIPT_DIR, config_path)
     if not os.path.exists(config_path):
         print(f"Error: Config file not found at {config_path}")
         return
@@ -0,0 +1,11 @@
+"""
+Shared Python engines for the TradingView indicators, screeners and watchlists.
+
+Each module can be imported by the scripts in indicators/, post-processing/ and
+watchlists/, or run directly with `python3 -m tvind.<module>`.
+"""
+
+import os
+
+# Repository root (one level above this package) - default data paths hang off it
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,5 @@
+"""`python3 -m tvind <command> ...` - see tvind.cli."""
+
+from tvind.cli import main
+
+main()
@@ -0,0 +1,270 @@
+"""
+Local Alert Engine (replaces the per-symbol Pine alerts in webhook/)
+
+RSl_wathlist_alert.pine spends one request.security call and one alert() per
+symbol, so a script tops out at a few dozen symbols. This engine evaluates
+rule sets for the whole watchlist in one pass over a daily OHLCV panel:
+
+    rsi          ta.rsi(close, length) above / below a level
+    pv_breakout  long / short PV breakout on the bar (tvind.pv_gap)
+    gap          |open - close[1]| / close[1] * 100 >= threshold
+    rs_rank      RS Rank (tvind.rs_ranks, among the panel's symbols) up or
+                 down by at least `change` over `lookback` bars
+
+Every rule is one vector over the symbols. Hits on the same symbol and bar are
+merged into one message in the webhook/json_webhook format; (symbol, bar,
+rule) keys already sent are kept in a small CSV and skipped, like
+alert.freq_once_per_bar. The messages go out through tvind.webhooks: packed
+into <= 2000-character Discord payloads and posted over a few reused
+connections.
+
+Rules can be overridden with a config file in the screener config style,
+one `Name = {...}` line per rule (see RULES for the keys).
+
+USAGE:
+    python3 -m tvind.webhooks --serve                       # local stand-in webhook on :8787
+    python3 -m tvind.alerts --prices daily.csv --watchlist watchlist.txt --url http://127.0.0.1:8787/webhook
+    DISCORD_WEBHOOK_URL=... python3 -m tvind.alerts --prices daily.csv --rules alert_rules.txt
+    python3 -m tvind.alerts --prices daily.csv --dry-run    # print the messages only
+"""
+
+import argparse
+import ast
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind import pv_gap
+from tvind.candle_patterns import match_tickers, pine_rma
+from tvind.prices import load_panel
+from tvind.rs_ranks import ibd_scores, percentile_ranks
+from tvind.webhooks import DEFAULT_CONNECTIONS, deliver, pack_messages
+
+RULES = {
+    'RSI Overbought': {'type': 'rsi', 'length': 14, 'above': 70},
+    'RSI Oversold': {'type': 'rsi', 'length': 14, 'below': 30},
+    'PV Breakout': {'type': 'pv_breakout', 'direction': 'Both'},
+    'Gap': {'type': 'gap', 'threshold': 5.0},
+    'RS Rank Jump': {'type': 'rs_rank', 'lookback': 5, 'change': 20},
+}
+
+SENT_KEEP_DATES = 10
+
+
+def parse_rules(path):
+    """`Name = {'type': ..., ...}` lines; '#' lines and section headers are skipped."""
+    rules = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            name, _, value = line.partition('=')
+            try:
+                rule = ast.literal_eval(value.strip())
+            except (ValueError, SyntaxError) as e:
+                print(f"Error parsing rule {name.strip()}: {e}")
+                continue
+            rules[name.strip()] = rule
+    return rules
+
+
+def rsi(close, length=14):
+    """ta.rsi down axis 0: RMA of gains over RMA of losses."""
+    change = np.full_like(close, np.nan)
+    change[1:] = close[1:] - close[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        up = pine_rma(np.where(np.isnan(change), np.nan, np.maximum(change, 0)), length)
+        down = pine_rma(np.where(np.isnan(change), np.nan, np.maximum(-change, 0)), length)
+        value = np.where(down == 0, 100.0, np.where(up == 0, 0.0, 100 - 100 / (1 + up / down)))
+    return np.where(np.isnan(up) | np.isnan(down), np.nan, value)
+
+
+class _Context:
+    """Lazily computed per-panel arrays shared by the rules (RSI per length, PV events, RS ranks)."""
+
+    def __init__(self, panel, symbols, bar):
+        fields = ('Open', 'High', 'Low', 'Close', 'Volume')
+        frames = [panel[f].reindex(columns=symbols) if symbols is not None else panel[f] for f in fields]
+        self.symbols = frames[3].columns
+        self.dates = frames[3].index
+        self.arrays = dict(zip(fields, (f.to_numpy(dtype=np.float64) for f in frames)))
+        self.bar = bar % len(self.dates)
+        self._cache = {}
+
+    def get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+
+def _rule_rsi(ctx, rule):
+    length = rule.get('length', 14)
+    value = ctx.get(('rsi', length), lambda: rsi(ctx.arrays['Close'], length))[ctx.bar]
+    with np.errstate(invalid='ignore'):
+        if 'above' in rule:
+            return value > rule['above'], value, lambda v: f"RSI {length} > {rule['above']:g} ({v:.1f})"
+        return value < rule['below'], value, lambda v: f"RSI {length} < {rule['below']:g} ({v:.1f})"
+
+
+def _rule_pv(ctx, rule):
+    a = ctx.arrays
+    ev = ctx.get(('pv', rule.get('price_period', 60), rule.get('volume_period', 60), rule.get('sma_length', 200)),
+                 lambda: pv_gap.events(a['Open'], a['High'], a['Low'], a['Close'], a['Volume'],
+                                       rule.get('price_period', 60), rule.get('volume_period', 60),
+                                       rule.get('sma_length', 200)))
+    direction = rule.get('direction', 'Both')
+    long_ = ev['Long'][ctx.bar] & (direction in ('Long Only', 'Both'))
+    short = ev['Short'][ctx.bar] & (direction in ('Short Only', 'Both'))
+    strength = np.where(long_, ev['Long Strength %'][ctx.bar], -ev['Short Strength %'][ctx.bar])
+    return long_ | short, strength, lambda v: f"PV Breakout {'Long' if v > 0 else 'Short'} ({abs(v):.1f}%)"
+
+
+def _rule_gap(ctx, rule):
+    gap = ctx.get(('gap',), lambda: pv_gap.gap_pct(ctx.arrays['Open'], ctx.arrays['Close']))[ctx.bar]
+    with np.errstate(invalid='ignore'):
+        hit = np.abs(gap) >= rule.get('threshold', 5.0)
+        direction = rule.get('direction', 'Both')
+        if direction == 'Up Only':
+            hit &= gap > 0
+        elif direction == 'Down Only':
+            hit &= gap < 0
+    return hit, gap, lambda v: f"Gap {v:+.1f}%"
+
+
+def _rule_rs_rank(ctx, rule):
+    lookback, change = rule.get('lookback', 5), rule.get('change', 20)
+    ranks = ctx.get(('rs_rank',), lambda: percentile_ranks(
+        ibd_scores(pd.DataFrame(ctx.arrays['Close']))[0]))
+    if ctx.bar < lookback:
+        return np.zeros(len(ctx.symbols), dtype=bool), np.full(len(ctx.symbols), np.nan), str
+    now, before = ranks[ctx.bar], ranks[ctx.bar - lookback]
+    delta = now - before
+    with np.errstate(invalid='ignore'):
+        hit = delta >= change if change > 0 else delta <= change
+    return hit, delta, lambda v: f"RS Rank {v:+.0f} in {lookback} bars"
+
+
+RULE_TYPES = {'rsi': _rule_rsi, 'pv_breakout': _rule_pv, 'gap': _rule_gap, 'rs_rank': _rule_rs_rank}
+
+
+def evaluate(panel, rules=RULES, symbols=None, bar=-1):
+    """All rule hits on one bar (default: the latest) as a Symbol, Date, Rule, Value, Close, Condition frame."""
+    ctx = _Context(panel, symbols, bar)
+    close = ctx.arrays['Close'][ctx.bar]
+    date = ctx.dates[ctx.bar]
+    frames = []
+    for name, rule in rules.items():
+        kind = rule.get('type')
+        if kind not in RULE_TYPES:
+            print(f"Warning: rule {name!r} has unknown type {kind!r}, skipped")
+            continue
+        hit, value, describe = RULE_TYPES[kind](ctx, rule)
+        idx = np.flatnonzero(hit & ~np.isnan(close))
+        frames.append(pd.DataFrame({
+            'Symbol': ctx.symbols[idx], 'Date': date, 'Rule': name, 'Value': value[idx], 'Close': close[idx],
+            'Condition': [describe(v) for v in value[idx]],
+        }))
+    columns = ['Symbol', 'Date', 'Rule', 'Value', 'Close', 'Condition']
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def load_sent(path):
+    if path and os.path.exists(path):
+        return pd.read_csv(path, dtype=str)
+    return pd.DataFrame(columns=['Symbol', 'Date', 'Rule'])
+
+
+def drop_sent(hits, sent):
+    """Hits whose (Symbol, Date, Rule) key has not been sent yet."""
+    if hits.empty or sent.empty:
+        return hits
+    keys = pd.MultiIndex.from_frame(hits[['Symbol', 'Date', 'Rule']].astype(str))
+    done = pd.MultiIndex.from_frame(sent[['Symbol', 'Date', 'Rule']])
+    return hits[~keys.isin(done)]
+
+
+def save_sent(path, sent, delivered, keep_dates=SENT_KEEP_DATES):
+    sent = pd.concat([sent, delivered[['Symbol', 'Date', 'Rule']].astype(str)], ignore_index=True)
+    dates = sorted(sent['Date'].unique())[-keep_dates:]
+    sent[sent['Date'].isin(dates)].drop_duplicates().to_csv(path, index=False)
+
+
+def messages(hits):
+    """One webhook/json_webhook style message per symbol and bar, conditions joined."""
+    if hits.empty:
+        return [], []
+    groups = hits.groupby(['Symbol', 'Date'], sort=False)
+    texts, members = [], []
+    for (symbol, date), group in groups:
+        texts.append(f"🚨 **{symbol}** Alert!\nPrice: {group['Close'].iloc[0]:.2f}\n"
+                     f"Time: {pd.Timestamp(date):%Y-%m-%d}\nCondition: {'; '.join(group['Condition'])}")
+        members.append(group.index)
+    return texts, members
+
+
+def read_watchlist(path):
+    """Symbols from a CSV (Symbol or Ticker column) or a plain one-per-line file."""
+    if path.endswith('.csv'):
+        df = pd.read_csv(path, dtype=str)
+        column = 'Symbol' if 'Symbol' in df.columns else 'Ticker'
+        return df[column].dropna().str.strip().tolist()
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate alert rules for a whole watchlist and post to a webhook")
+    parser.add_argument('--prices', required=True, help="Daily OHLCV file or directory (see tvind.prices)")
+    parser.add_argument('--watchlist', help="Symbols to watch (CSV with Symbol/Ticker or one per line)")
+    parser.add_argument('--rules', help="Rule config file (Name = {...} per line); default: RULES")
+    parser.add_argument('--url', default=os.environ.get('DISCORD_WEBHOOK_URL'),
+                        help="Webhook URL (default: $DISCORD_WEBHOOK_URL)")
+    parser.add_argument('--sent', default='alerts_sent.csv', help="Keys of alerts already sent")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS)
+    parser.add_argument('--per-message', type=int, default=10, help="Alerts packed into one webhook payload")
+    parser.add_argument('--dry-run', action='store_true', help="Print the messages, send and record nothing")
+    args = parser.parse_args()
+
+    rules = parse_rules(args.rules) if args.rules else RULES
+    panel = load_panel(args.prices)
+    symbols, rename = None, {}
+    if args.watchlist:
+        mapping = match_tickers(read_watchlist(args.watchlist), panel['Close'].columns)
+        symbols = list(mapping.values())
+        rename = {v: k for k, v in mapping.items()}
+
+    start = time.perf_counter()
+    hits = evaluate(panel, rules, symbols)
+    hits['Symbol'] = hits['Symbol'].map(lambda s: rename.get(s, s))
+    sent = load_sent(args.sent)
+    new = drop_sent(hits, sent)
+    texts, members = messages(new)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Symbols: {len(symbols) if symbols else panel['Close'].shape[1]} | Rules: {len(rules)} | "
+          f"Hits: {len(hits)} | New: {len(new)} | Messages: {len(texts)} | {elapsed:.1f} ms")
+
+    if not texts:
+        return
+    packed = pack_messages(texts, per_payload=args.per_message)
+    if args.dry_run or not args.url:
+        if not args.dry_run:
+            print("Warning: no --url or DISCORD_WEBHOOK_URL, printing instead of sending")
+        for payload, _ in packed:
+            print(payload['content'], end='\n\n')
+        return
+
+    start = time.perf_counter()
+    statuses, stats = deliver(args.url, [p for p, _ in packed], args.connections)
+    elapsed = (time.perf_counter() - start) * 1000
+    ok = [i for (_, m), status in zip(packed, statuses) if 200 <= status < 300 for i in m]
+    delivered = new.loc[np.concatenate([members[i] for i in ok])] if ok else new.iloc[:0]
+    save_sent(args.sent, sent, delivered)
+    print(f"Payloads: {len(packed)} | Delivered alerts: {len(delivered)}/{len(new)} | "
+          f"Connections: {stats['connections']} | Rate limited: {stats['rate_limited']} | {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
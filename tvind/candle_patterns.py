@@ -0,0 +1,156 @@
+"""
+Batch Candle-Pattern Detector (Python version of the dashboard's combo_data)
+
+Evaluates the candle combos of indicators/dashboard (combo_data, _sling,
+_pdh/_pdl) for every symbol and every bar of a daily OHLC panel at once.
+Each pattern is one comparison of shifted (dates x symbols) arrays:
+
+    Kicker     close[1] < open[1] and open > open[1]
+    OEL / OEH  open == low / open == high
+    Oops Up    open < low[1] and close > low[1]
+    Oops Dn    open > high[1] and close <= high[1]
+    Inside     high <= high[1] and low >= low[1]
+    Engulf     high > high[1] and low < low[1]
+    3Bar Up    high[1] < high[3] and close > high[1], high[2], high[3]
+    3Bar Dn    low[1] > low[3] and close < low[1], low[2], low[3]
+    SlingShot  close > ema(high) after three closes below it (sling_ema_len = 4)
+
+The latest bar becomes a signal matrix (symbols x patterns) with a Score,
+bullish minus bearish combos, that gen_dashboard.py can rank the watchlist by
+before it fills its 20 slots.
+
+USAGE:
+    python3 -m tvind.candle_patterns --prices daily.csv [--watchlist indicators/dashboard/watchlist.csv] [--output signals.csv]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+
+DEFAULT_SLING_EMA_LEN = 4
+
+BULLISH = ['Kicker', 'Oops Up', 'OEL', '3Bar Up', 'SlingShot']
+BEARISH = ['Oops Dn', 'OEH', '3Bar Dn']
+PATTERNS = ['Kicker', 'Oops Up', 'Oops Dn', 'OEL', 'OEH', 'Inside', 'Engulf', '3Bar Up', '3Bar Dn', 'SlingShot']
+
+
+def shift(a, n):
+    """a[n] in Pine terms: the value n bars back, NaN before the first bar."""
+    out = np.full_like(a, np.nan)
+    out[n:] = a[:-n]
+    return out
+
+
+def _pine_smooth(a, length, alpha):
+    """Pine's recursive averages down axis 0: SMA seed over the first `length` valid bars, then alpha recursion."""
+    out = np.full_like(a, np.nan)
+    value = np.full(a.shape[1], np.nan)
+    count = np.zeros(a.shape[1], dtype=np.int64)
+    total = np.zeros(a.shape[1])
+    for t, row in enumerate(a):
+        valid = ~np.isnan(row)
+        count += valid
+        total = np.where(valid & (count <= length), total + np.nan_to_num(row), total)
+        value = np.where(valid & (count == length), total / length, value)
+        value = np.where(valid & (count > length), alpha * row + (1 - alpha) * value, value)
+        out[t] = value
+    return out
+
+
+def pine_ema(a, length):
+    """ta.ema: alpha = 2 / (length + 1)."""
+    return _pine_smooth(a, length, 2.0 / (length + 1.0))
+
+
+def pine_rma(a, length):
+    """ta.rma (Wilder's smoothing, used by ta.rsi): alpha = 1 / length."""
+    return _pine_smooth(a, length, 1.0 / length)
+
+
+def detect(o, h, l, c, sling_ema_len=DEFAULT_SLING_EMA_LEN):
+    """All combo_data patterns as {name: bool (dates x symbols)}, plus SlingShot, PDH, PDL."""
+    o1, h1, l1, c1 = shift(o, 1), shift(h, 1), shift(l, 1), shift(c, 1)
+    h2, l2, c2 = shift(h, 2), shift(l, 2), shift(c, 2)
+    h3, l3, c3 = shift(h, 3), shift(l, 3), shift(c, 3)
+
+    ema = pine_ema(h, sling_ema_len)
+    ema1, ema2, ema3 = shift(ema, 1), shift(ema, 2), shift(ema, 3)
+
+    with np.errstate(invalid='ignore'):
+        signals = {
+            'Kicker': (c1 < o1) & (o > o1),
+            'Oops Up': (o < l1) & (c > l1),
+            'Oops Dn': (o > h1) & (c <= h1),
+            'OEL': o == l,
+            'OEH': o == h,
+            'Inside': (h <= h1) & (l >= l1),
+            'Engulf': (h > h1) & (l < l1),
+            '3Bar Up': (h1 < h3) & (c > h1) & (c > h2) & (c > h3),
+            '3Bar Dn': (l1 > l3) & (c < l1) & (c < l2) & (c < l3),
+            'SlingShot': (c > ema) & (c1 < ema1) & (c2 < ema2) & (c3 < ema3),
+        }
+    levels = {'PDH': h1, 'PDL': l1, 'Sling Price': np.where(signals['SlingShot'], c, np.nan)}
+    return signals, levels
+
+
+def signal_matrix(panel, symbols=None, sling_ema_len=DEFAULT_SLING_EMA_LEN, bar=-1):
+    """Symbols x patterns (0/1) for one bar (default: the latest), with PDH/PDL and a Score."""
+    fields = [panel[f].reindex(columns=symbols) if symbols is not None else panel[f]
+              for f in ('Open', 'High', 'Low', 'Close')]
+    columns = fields[3].columns
+    o, h, l, c = (f.to_numpy(dtype=np.float64) for f in fields)
+
+    signals, levels = detect(o, h, l, c, sling_ema_len)
+    out = pd.DataFrame({name: signals[name][bar].astype(np.int8) for name in PATTERNS},
+                       index=pd.Index(columns, name='Symbol'))
+    for name, values in levels.items():
+        out[name] = values[bar]
+    out['Score'] = out[BULLISH].sum(axis=1) - out[BEARISH].sum(axis=1)
+    out['Signals'] = out[PATTERNS].sum(axis=1)
+    return out
+
+
+def match_tickers(tickers, columns):
+    """Watchlist ticker -> panel column, accepting 'EXCH:SYM' against a bare 'SYM'."""
+    available = set(columns)
+    return {t: t if t in available else t.split(':')[-1] for t in tickers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard candle combos for every symbol in one pass")
+    parser.add_argument('--prices', required=True, help="Daily OHLC file or directory (see tvind.prices)")
+    parser.add_argument('--watchlist', help="Dashboard watchlist CSV (Ticker column); default: all symbols")
+    parser.add_argument('--sling-ema-len', type=int, default=DEFAULT_SLING_EMA_LEN)
+    parser.add_argument('--output', help="Write the signal matrix to this CSV")
+    args = parser.parse_args()
+
+    panel = load_panel(args.prices)
+    symbols = None
+    rename = {}
+    if args.watchlist:
+        tickers = pd.read_csv(args.watchlist)['Ticker'].dropna().astype(str).str.strip().tolist()
+        mapping = match_tickers(tickers, panel['Close'].columns)
+        symbols = list(mapping.values())
+        rename = {v: k for k, v in mapping.items()}
+
+    start = time.perf_counter()
+    matrix = signal_matrix(panel, symbols, args.sling_ema_len).rename(index=rename)
+    elapsed = (time.perf_counter() - start) * 1000
+    matrix.index.name = 'Ticker'
+    matrix = matrix.sort_values(['Score', 'Signals'], ascending=False, kind='stable')
+    print(f"Symbols: {len(matrix)} | Bars: {len(panel['Close'])} | {elapsed:.1f} ms")
+
+    if args.output:
+        matrix.to_csv(args.output, float_format='%.4f')
+        print(f"Signals saved to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(matrix.head(50))
+
+
+if __name__ == "__main__":
+    main()
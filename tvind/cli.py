@@ -0,0 +1,139 @@
+"""
+tvind Command Line (one entry point with lazy subcommands)
+
+Every repo script pays for its imports before it parses a single argument:
+matplotlib.pyplot in both screener renderers, sklearn/plotly in
+cluster_etfs.py, bs4 in create_comprehensive_csv.py. This dispatcher imports
+only argparse; the chosen subcommand's script is loaded from its file (or its
+tvind module imported) after the command line has been read, and its main()
+runs with the remaining arguments - so `--help` of the dispatcher and of the
+light subcommands never touches pandas or matplotlib.
+
+    rs-tables          post-processing/perf-screener/generate_rs_tables.py
+    pv-screener        post-processing/PVscreener/generate_pv_screener.py
+    dashboard          indicators/dashboard/gen_dashboard.py
+    cluster            watchlists/thematic_watchlists/cluster_etfs.py
+    scrape-industries  indicators/strength_within_sectors/create_comprehensive_csv.py
+    indarr             indicators/strength_within_sectors/generate_indarr.py
+    watchlist          tvind.watchlists
+    (and every tvind engine: pv-gap, periods, sectors, alerts, ...)
+
+Paths are the subcommand's own arguments (config file, --work-dir,
+--output-dir, --html-dir, ...); the defaults resolve next to each script.
+
+USAGE:
+    python3 -m tvind --help
+    python3 -m tvind rs-tables run_sector_rotation.txt --work-dir csv --output-dir png
+    python3 -m tvind watchlist --contains NVDA
+    python3 -m tvind --bench-startup [--runs 5]
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+
+from tvind import REPO_DIR
+
+# name -> (script path below the repo or tvind module, description)
+COMMANDS = {
+    'rs-tables': ('post-processing/perf-screener/generate_rs_tables.py', "Perf screener tables and charts"),
+    'pv-screener': ('post-processing/PVscreener/generate_pv_screener.py', "PV breakout / gap charts and tables"),
+    'dashboard': ('indicators/dashboard/gen_dashboard.py', "Pine dashboard from a watchlist CSV"),
+    'cluster': ('watchlists/thematic_watchlists/cluster_etfs.py', "Semantic clustering of ETF descriptions"),
+    'scrape-industries': ('indicators/strength_within_sectors/create_comprehensive_csv.py',
+                          "Top 39 stocks per industry from saved TradingView pages"),
+    'indarr': ('indicators/strength_within_sectors/generate_indarr.py', "indArr block for strength_within_sectors.pine"),
+    'watchlist': ('tvind.watchlists', "Watchlist set algebra and TradingView export"),
+    'alerts': ('tvind.alerts', "Alert rules for a watchlist, posted to a webhook"),
+    'candles': ('tvind.candle_patterns', "Dashboard candle combos for every symbol"),
+    'clusters': ('tvind.correlation_clusters', "Thematic ETFs clustered by return correlation"),
+    'ema-tracker': ('tvind.ema_tracker', "9/21/50 EMA distances on D/W/M"),
+    'event-study': ('tvind.event_study', "Forward returns / hit rates / MAE-MFE of PV and gap signals"),
+    'nqusb': ('tvind.nqusb_hierarchy', "Build and validate the NQUSB hierarchy index"),
+    'nqusb-rollups': ('tvind.nqusb_rollups', "Full-tree NQUSB strength report"),
+    'nqusb-trie': ('tvind.nqusb_trie', "NQUSB code resolver"),
+    'pine-minify': ('tvind.pine_minify', "Minify a Pine script and report its size per section"),
+    'pipeline': ('tvind.pipeline', "Run the out-of-date weekly pipeline steps"),
+    'periods': ('tvind.periods', "Period returns (1W..1Y, WTD/MTD/QTD/YTD)"),
+    'pv-gap': ('tvind.pv_gap', "s-PV Gap Screener columns from OHLCV"),
+    'receiver': ('tvind.receiver', "Receive TradingView webhook alerts"),
+    'rotation': ('tvind.rotation', "Top-N RS rotation backtest vs SPY and VBINX"),
+    'rs-ranks': ('tvind.rs_ranks', "IBD-style RS percentile ranks"),
+    'sectors': ('tvind.sectors', "Sector rotation matrix and RRG quadrants"),
+    'screener-csv': ('tvind.screener_csv', "Typed screener export loading: memory / time report"),
+    'sessions': ('tvind.session_buckets', "Gap / session-period table from intraday bars"),
+    'sr-ratios': ('tvind.sr_ratios', "Gap-adjusted ratios for the SR watchlist pairs"),
+    'sweep': ('tvind.sweep', "PV / gap parameter grid on a process pool"),
+    'watch': ('tvind.watch', "Render new screener exports as they land"),
+    'webhooks': ('tvind.webhooks', "Discord webhook client / stand-in server"),
+}
+
+# Commands timed by --bench-startup (the heavy renderers for comparison)
+BENCH_COMMANDS = [[], ['watchlist'], ['indarr'], ['periods'], ['rs-tables'], ['cluster']]
+
+
+def load(name):
+    """Import the subcommand's module (script files by path, with their directory on sys.path)."""
+    target = COMMANDS[name][0]
+    if not target.endswith('.py'):
+        return importlib.import_module(target)
+    path = os.path.join(REPO_DIR, target)
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(f"tvind_cmd_{name.replace('-', '_')}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(name, argv):
+    """Run a subcommand's main() as if it had been started on its own with argv."""
+    module = load(name)
+    sys.argv = [f'tvind {name}'] + list(argv)
+    return module.main()
+
+
+def bench_startup(runs=5, commands=BENCH_COMMANDS):
+    """Wall time of `python3 -m tvind [cmd] --help` in fresh interpreters (best and median)."""
+    import statistics
+    import subprocess
+    import time
+
+    env = {**os.environ, 'PYTHONPATH': REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', '')}
+    print(f"Startup ({runs} runs each, fresh interpreter):")
+    for cmd in commands:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, '-m', 'tvind', *cmd, '--help'], env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            times.append((time.perf_counter() - start) * 1000)
+        label = ' '.join(['tvind', *cmd, '--help'])
+        status = '' if result.returncode == 0 else f"  (exit {result.returncode}: {result.stderr.decode().strip().splitlines()[-1:]})"
+        print(f"  {label:32} best {min(times):7.1f} ms | median {statistics.median(times):7.1f} ms{status}")
+
+
+def main(argv=None):
+    width = max(len(n) for n in COMMANDS)
+    parser = argparse.ArgumentParser(
+        prog='tvind', formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Repo scripts and tvind engines behind one command (imports load per subcommand)",
+        epilog="commands:\n" + '\n'.join(f"  {n:{width}}  {d}" for n, (_, d) in COMMANDS.items())
+               + "\n\n`tvind <command> --help` shows the command's own options.")
+    parser.add_argument('command', nargs='?', choices=list(COMMANDS), metavar='command')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments passed to the command")
+    parser.add_argument('--bench-startup', action='store_true', help="Time --help of the dispatcher and subcommands")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per command for --bench-startup")
+    args = parser.parse_args(argv)
+
+    if args.bench_startup:
+        bench_startup(args.runs)
+    elif args.command is None:
+        parser.print_help()
+    else:
+        return run(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Returns-Based Correlation Clustering for the Thematic ETF Watchlists
+
+Groups the ETFs of ETFs-industries.csv / ETFs-countries.txt by how they
+actually trade (rolling-window correlation of daily log returns) instead of by
+their description, and writes the same *-clustered.csv layout that
+generate_tv_watchlists.py turns into io-*.txt watchlists.
+
+The rolling window is kept as pairwise sums over the last W return rows,
+with V the 0/1 valid mask and X0 the returns with gaps set to 0:
+
+    n   = V' V        overlapping observations per pair
+    sx  = X0' V       sum of x_i where x_j is also present
+    sxx = (X0^2)' V
+    sxy = X0' X0
+
+Each is a single BLAS product for a full rebuild. Moving the window one day
+adds and removes one row (rank-1 outer products), so a daily update costs
+O(N^2) instead of O(W * N^2). The state is saved to an .npz file next to the
+output so the next run only applies the new days.
+
+Clustering is average-linkage on the distance sqrt((1 - rho) / 2); Dim1/Dim2
+are a classical MDS embedding of the same distances.
+
+USAGE:
+    python3 -m tvind.correlation_clusters --kind industries --prices closes.csv
+    python3 -m tvind.correlation_clusters --kind countries --download --window 126
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind import REPO_DIR
+from tvind.prices import download_panel, load_panel
+
+THEMATIC_DIR = os.path.join(REPO_DIR, 'watchlists', 'thematic_watchlists')
+
+KINDS = {
+    'industries': {
+        'input': os.path.join(THEMATIC_DIR, 'ETFs-industries.csv'),
+        'output': os.path.join(THEMATIC_DIR, 'ETFs-industries-clustered.csv'),
+        'label': 'Description',
+    },
+    'countries': {
+        'input': os.path.join(THEMATIC_DIR, 'ETFs-countries.txt'),
+        'output': os.path.join(THEMATIC_DIR, 'ETFs-countries-clustered.csv'),
+        'label': 'Country',
+    },
+}
+
+DEFAULT_WINDOW = 126
+DEFAULT_MIN_PERIODS = 40
+UNCLUSTERED = 'No Price Data'
+
+
+class RollingCorrelation:
+    """Pairwise correlation over the last `window` return rows, updated one row at a time."""
+
+    def __init__(self, symbols, window=DEFAULT_WINDOW, min_periods=DEFAULT_MIN_PERIODS):
+        self.symbols = list(symbols)
+        self.window = window
+        self.min_periods = min_periods
+        self.dates = []
+        self.buffer = np.empty((0, len(self.symbols)))
+        self._reset_sums()
+
+    def _reset_sums(self):
+        k = len(self.symbols)
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    @staticmethod
+    def _split(rows):
+        valid = ~np.isnan(rows)
+        return np.where(valid, rows, 0.0), valid.astype(np.float64)
+
+    def rebuild(self):
+        """Recompute the sums from the buffer (four gemm calls)."""
+        X0, V = self._split(self.buffer)
+        self.n = V.T @ V
+        self.sx = X0.T @ V
+        self.sxx = (X0 * X0).T @ V
+        self.sxy = X0.T @ X0
+
+    def _apply(self, row, sign):
+        x0, v = self._split(row)
+        self.n += sign * np.outer(v, v)
+        self.sx += sign * np.outer(x0, v)
+        self.sxx += sign * np.outer(x0 * x0, v)
+        self.sxy += sign * np.outer(x0, x0)
+
+    def update(self, returns):
+        """Push new rows (DataFrame dates x symbols); only dates after the last one are applied."""
+        returns = returns.reindex(columns=self.symbols)
+        if self.dates:
+            returns = returns[returns.index > self.dates[-1]]
+
+        rows = returns.to_numpy(dtype=np.float64)
+        if len(rows) >= self.window:
+            # Whole window replaced - a rebuild is cheaper than 2 * window rank-1 updates
+            self.buffer = rows[-self.window:]
+            self.dates = list(returns.index[-self.window:])
+            self.rebuild()
+            return len(rows)
+
+        for date, row in zip(returns.index, rows):
+            self._apply(row, 1.0)
+            self.buffer = np.vstack([self.buffer, row])
+            self.dates.append(date)
+            if len(self.buffer) > self.window:
+                self._apply(self.buffer[0], -1.0)
+                self.buffer = self.buffer[1:]
+                self.dates.pop(0)
+        return len(rows)
+
+    def correlation(self):
+        """Correlation matrix; pairs with fewer than min_periods overlapping days are NaN."""
+        n, sx, sxx, sxy = self.n, self.sx, self.sxx, self.sxy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * sxy - sx * sx.T
+            var_i = n * sxx - sx * sx
+            var_j = var_i.T
+            rho = cov / np.sqrt(var_i * var_j)
+        rho[n < self.min_periods] = np.nan
+        rho = np.clip(rho, -1.0, 1.0)
+        np.fill_diagonal(rho, np.where(np.diag(n) >= self.min_periods, 1.0, np.nan))
+        return pd.DataFrame(rho, index=self.symbols, columns=self.symbols)
+
+    def save(self, path):
+        np.savez_compressed(path, symbols=np.array(self.symbols), window=self.window,
+                            min_periods=self.min_periods, buffer=self.buffer,
+                            dates=np.array([pd.Timestamp(d).value for d in self.dates], dtype=np.int64),
+                            n=self.n, sx=self.sx, sxx=self.sxx, sxy=self.sxy)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        state = cls(data['symbols'].tolist(), int(data['window']), int(data['min_periods']))
+        state.buffer = data['buffer']
+        state.dates = list(pd.to_datetime(data['dates']))
+        for name in ('n', 'sx', 'sxx', 'sxy'):
+            setattr(state, name, data[name])
+        return state
+
+
+def log_returns(closes):
+    """Daily log returns; a missing close leaves a NaN rather than bridging the gap."""
+    closes = closes.where(closes > 0)
+    return np.log(closes).diff().iloc[1:]
+
+
+def load_state(path, symbols, window, min_periods):
+    """Reuse a saved state if it covers the same universe and window, else start fresh."""
+    if path and os.path.exists(path):
+        state = RollingCorrelation.load(path)
+        if state.symbols == list(symbols) and state.window == window and state.min_periods == min_periods:
+            return state, True
+    return RollingCorrelation(symbols, window, min_periods), False
+
+
+def correlation_distance(rho):
+    """sqrt((1 - rho) / 2) in [0, 1]; pairs without enough overlap count as uncorrelated."""
+    rho = np.nan_to_num(rho, nan=0.0)
+    np.fill_diagonal(rho, 1.0)
+    return np.sqrt(np.clip((1.0 - rho) / 2.0, 0.0, 1.0))
+
+
+def mds_2d(D):
+    """Classical MDS: the top two eigenvectors of the double-centred squared distances."""
+    k = len(D)
+    J = np.eye(k) - np.ones((k, k)) / k
+    B = -0.5 * J @ (D ** 2) @ J
+    values, vectors = np.linalg.eigh(B)
+    top = np.argsort(values)[::-1][:2]
+    coords = vectors[:, top] * np.sqrt(np.clip(values[top], 0.0, None))
+    if coords.shape[1] < 2:
+        coords = np.column_stack([coords, np.zeros(k)])
+    return coords
+
+
+def hierarchical_clusters(D, n_clusters=None, threshold=None):
+    """Average-linkage labels (0-based) from a square distance matrix."""
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+
+    if len(D) < 2:
+        return np.zeros(len(D), dtype=int)
+    Z = linkage(squareform(D, checks=False), method='average')
+    if threshold is not None:
+        labels = fcluster(Z, t=threshold, criterion='distance')
+    else:
+        labels = fcluster(Z, t=min(n_clusters, len(D)), criterion='maxclust')
+    return labels - 1
+
+
+def name_clusters(df, labels, D, label_col, group_col=None):
+    """
+    Name each cluster after its members: the most common group (the sector
+    keyword 'Cluster' of the industries file) when there is one, plus the
+    medoid's label.
+    """
+    names = {}
+    for cid in np.unique(labels):
+        idx = np.flatnonzero(labels == cid)
+        medoid = idx[np.argmin(D[np.ix_(idx, idx)].sum(axis=1))]
+        name = str(df[label_col].iloc[medoid])
+        if group_col and group_col in df.columns:
+            group = df[group_col].iloc[idx].mode()
+            if len(group) and group.iloc[0] not in ('Other', 'Unknown') and group.iloc[0] != name:
+                name = f"{group.iloc[0]}: {name}"
+        if len(idx) > 1:
+            name = f"{name} (+{len(idx) - 1})"
+        # Keep names unique so each cluster stays its own ### section
+        while name in names.values():
+            name = f"{name} [{df['Symbol'].iloc[medoid]}]"
+        names[cid] = name
+    return names
+
+
+def load_universe(kind, input_path):
+    """Symbol list with its label column, same cleaning as the description-based scripts."""
+    df = pd.read_csv(input_path, dtype={'Symbol': str}).drop_duplicates()
+    df['Symbol'] = df['Symbol'].str.strip()
+    label = KINDS[kind]['label']
+    df[label] = df[label].astype(str).str.strip()
+    return df.drop_duplicates('Symbol').reset_index(drop=True)
+
+
+def cluster_universe(df, rho, kind, n_clusters=None, threshold=None):
+    """Attach cluster ids/names and MDS coordinates in the *-clustered.csv layout."""
+    label = KINDS[kind]['label']
+    rho = rho.reindex(index=df['Symbol'], columns=df['Symbol']).to_numpy()
+    has_data = ~np.isnan(np.diag(rho))
+
+    priced = df[has_data].reset_index(drop=True)
+    D = correlation_distance(rho[np.ix_(has_data, has_data)])
+    labels = hierarchical_clusters(D, n_clusters, threshold)
+    coords = mds_2d(D) if len(D) else np.empty((0, 2))
+
+    names = name_clusters(priced, labels, D, label, 'Cluster' if kind == 'industries' else None)
+
+    out = df.copy()
+    out['Dim1'] = 0.0
+    out['Dim2'] = 0.0
+    out['Cluster_ID'] = labels.max() + 1 if len(labels) else 0
+    out['Cluster_Name'] = UNCLUSTERED
+    out.loc[has_data, 'Dim1'] = coords[:, 0]
+    out.loc[has_data, 'Dim2'] = coords[:, 1]
+    out.loc[has_data, 'Cluster_ID'] = labels
+    out.loc[has_data, 'Cluster_Name'] = [names[c] for c in labels]
+
+    if kind == 'countries':
+        # generate_tv_watchlists.py groups countries by Region_Code / Region
+        out['Region'] = out['Cluster_Name']
+        out['Region_Code'] = out['Cluster_ID']
+        return out[['Symbol', 'Country', 'Region', 'Region_Code', 'Dim1', 'Dim2']]
+    if 'Cluster' not in out.columns:
+        out['Cluster'] = 'Other'
+    return out[['Symbol', 'Description', 'Cluster', 'Dim1', 'Dim2', 'Cluster_ID', 'Cluster_Name']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster thematic ETFs by rolling return correlation")
+    parser.add_argument('--kind', choices=sorted(KINDS), default='industries')
+    parser.add_argument('--input', help="Universe file (default: ETFs-industries.csv / ETFs-countries.txt)")
+    parser.add_argument('--output', help="Clustered CSV (default: the matching *-clustered.csv)")
+    parser.add_argument('--prices', help="Price file or directory (see tvind.prices.load_panel)")
+    parser.add_argument('--download', action='store_true', help="Download closes with yfinance instead")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="Rolling window in trading days")
+    parser.add_argument('--min-periods', type=int, default=DEFAULT_MIN_PERIODS)
+    parser.add_argument('--clusters', type=int, default=8, help="Number of clusters")
+    parser.add_argument('--threshold', type=float, help="Cut the dendrogram at this distance instead")
+    parser.add_argument('--state', help="Incremental state file (default: <output>.corr.npz)")
+    parser.add_argument('--full', action='store_true', help="Ignore the saved state and rebuild")
+    args = parser.parse_args()
+
+    if not args.prices and not args.download:
+        parser.error("one of --prices or --download is required")
+
+    input_path = args.input or KINDS[args.kind]['input']
+    output_path = args.output or KINDS[args.kind]['output']
+    state_path = args.state or os.path.splitext(output_path)[0] + '.corr.npz'
+
+    if not os.path.exists(input_path):
+        print(f"Error: {input_path} not found.")
+        return
+
+    df = load_universe(args.kind, input_path)
+    symbols = df['Symbol'].tolist()
+    print(f"Loaded {len(df)} {args.kind} ETFs.")
+
+    panel = download_panel(symbols) if args.download else load_panel(args.prices)
+    returns = log_returns(panel['Close'].reindex(columns=symbols))
+
+    start = time.perf_counter()
+    state, resumed = load_state(None if args.full else state_path, symbols, args.window, args.min_periods)
+    applied = state.update(returns)
+    rho = state.correlation()
+    elapsed = (time.perf_counter() - start) * 1000
+    mode = 'incremental' if resumed else 'full'
+    print(f"Correlation ({mode}): {applied} new days, window {len(state.buffer)}/{args.window} | {elapsed:.1f} ms")
+
+    out = cluster_universe(df, rho, args.kind, args.clusters, args.threshold)
+    name_col = 'Region' if args.kind == 'countries' else 'Cluster_Name'
+    missing = int((out[name_col] == UNCLUSTERED).sum())
+    if missing:
+        print(f"Warning: {missing} symbols without enough price history -> '{UNCLUSTERED}'")
+
+    state.save(state_path)
+    out.to_csv(output_path, index=False)
+    print(f"CSV saved to {output_path}")
+    print(f"State saved to {state_path}")
+
+
+if __name__ == "__main__":
+    main()
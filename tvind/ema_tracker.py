@@ -0,0 +1,201 @@
+"""
+Multi-Timeframe EMA Distance Engine (Python version of EMA_tracker_table)
+
+Computes the 9/21/50 EMAs on daily, weekly and monthly bars for a whole
+watchlist and the % distance of the latest close from each of them:
+
+    distance = (close - ema) / ema * 100     (positive = price above the EMA)
+
+The EMAs follow Pine's ta.ema: seeded with the SMA of the first `length` bars,
+then ema = alpha * close + (1 - alpha) * ema[1] with alpha = 2 / (length + 1).
+Weekly and monthly values are the developing bar, like request.security on
+"W" / "M": the EMA of completed periods combined with the current close.
+
+State (last committed EMA per timeframe x length x symbol, the open period and
+its latest close) is saved to an .npz file, so a new daily bar is an O(1)
+update per symbol instead of a recompute over the full history. The first run
+resamples the history once per timeframe and walks the periods.
+
+USAGE:
+    python3 -m tvind.ema_tracker --prices daily.csv [--state ema_state.npz] [--output ema_distances.csv]
+
+The output has Symbol plus 'D EMA 9 %' ... 'M EMA 50 %' columns, so the
+screener renderers (generate_rs_tables.py) can sort and tabulate it.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+
+DEFAULT_LENGTHS = (9, 21, 50)
+TIMEFRAMES = {'D': 'D', 'W': 'W-FRI', 'M': 'M'}
+
+
+class EMAState:
+    """Per timeframe: committed EMA, bar count and seed sum (lengths x symbols) plus the open period."""
+
+    def __init__(self, symbols, lengths=DEFAULT_LENGTHS):
+        self.symbols = list(symbols)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.alpha = (2.0 / (self.lengths + 1.0))[:, None]
+        self.last_date = None
+        shape = (len(self.lengths), len(self.symbols))
+        self.tf = {}
+        for tf in TIMEFRAMES:
+            self.tf[tf] = {
+                'period': None,
+                'pending': np.full(len(self.symbols), np.nan),
+                'ema': np.full(shape, np.nan),
+                'count': np.zeros(shape, dtype=np.int64),
+                'seed': np.zeros(shape),
+            }
+
+    def _commit(self, s, x):
+        """Fold one completed bar (vector over symbols; NaN = no bar) into the EMAs."""
+        valid = ~np.isnan(x)[None, :] & np.ones_like(s['count'], dtype=bool)
+        x = np.broadcast_to(x, s['ema'].shape)
+        L = self.lengths[:, None]
+
+        s['count'] += valid
+        seeding = valid & (s['count'] <= L)
+        s['seed'] = np.where(seeding, s['seed'] + np.nan_to_num(x), s['seed'])
+        seeded = valid & (s['count'] == L)
+        s['ema'] = np.where(seeded, s['seed'] / L, s['ema'])
+        rolling = valid & (s['count'] > L)
+        s['ema'] = np.where(rolling, self.alpha * x + (1 - self.alpha) * s['ema'], s['ema'])
+
+    def update(self, date, closes):
+        """Apply one bar (date, close vector in self.symbols order)."""
+        date = pd.Timestamp(date)
+        closes = np.asarray(closes, dtype=np.float64)
+        for tf, freq in TIMEFRAMES.items():
+            s = self.tf[tf]
+            period = str(date.to_period(freq))
+            if period != s['period']:
+                if s['period'] is not None:
+                    self._commit(s, s['pending'])
+                s['period'] = period
+                s['pending'] = closes.copy()
+            else:
+                s['pending'] = np.where(np.isnan(closes), s['pending'], closes)
+        self.last_date = date
+
+    def bootstrap(self, closes):
+        """Full history: resample once per timeframe, commit every completed period."""
+        closes = closes.reindex(columns=self.symbols).sort_index()
+        for tf, freq in TIMEFRAMES.items():
+            s = self.tf[tf]
+            periods = closes.index.to_period(freq)
+            bars = closes.groupby(periods).last()
+            values = bars.to_numpy(dtype=np.float64)
+            for row in values[:-1]:
+                self._commit(s, row)
+            s['period'] = str(bars.index[-1])
+            s['pending'] = values[-1].copy()
+        self.last_date = closes.index[-1]
+
+    def current(self, tf):
+        """Developing EMA (lengths x symbols) including the open period's latest close."""
+        s = self.tf[tf]
+        L = self.lengths[:, None]
+        x = s['pending'][None, :]
+        n = s['count'] + ~np.isnan(x)
+        with np.errstate(invalid='ignore'):
+            value = np.where(n == L, (s['seed'] + x) / L, self.alpha * x + (1 - self.alpha) * s['ema'])
+        # No bar yet in the open period: the last committed EMA stands
+        value = np.where(np.isnan(x), s['ema'], value)
+        return np.where(n >= L, value, np.nan)
+
+    def distances(self, close=None):
+        """Symbol x '<TF> EMA <n> %' distance table."""
+        close = self.tf['D']['pending'] if close is None else close
+        out = pd.DataFrame({'Close': close}, index=pd.Index(self.symbols, name='Symbol'))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for tf in TIMEFRAMES:
+                ema = self.current(tf)
+                for i, length in enumerate(self.lengths):
+                    out[f'{tf} EMA {length} %'] = (close - ema[i]) / ema[i] * 100
+        dist_cols = [c for c in out.columns if c.endswith(' %')]
+        out['EMAs Above'] = (out[dist_cols] > 0).sum(axis=1)
+        return out
+
+    def save(self, path):
+        arrays = {'symbols': np.array(self.symbols), 'lengths': self.lengths,
+                  'last_date': np.int64(pd.Timestamp(self.last_date).value)}
+        for tf, s in self.tf.items():
+            arrays[f'{tf}_period'] = np.array(s['period'])
+            for key in ('pending', 'ema', 'count', 'seed'):
+                arrays[f'{tf}_{key}'] = s[key]
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        state = cls(data['symbols'].tolist(), data['lengths'].tolist())
+        state.last_date = pd.Timestamp(int(data['last_date']))
+        for tf, s in state.tf.items():
+            s['period'] = str(data[f'{tf}_period'])
+            for key in ('pending', 'ema', 'count', 'seed'):
+                s[key] = data[f'{tf}_{key}']
+        return state
+
+
+def run(closes, state_path=None, lengths=DEFAULT_LENGTHS, full=False):
+    """Load or rebuild the state, apply bars after its last date, return (state, mode, new bars)."""
+    symbols = list(closes.columns)
+    if state_path and os.path.exists(state_path) and not full:
+        state = EMAState.load(state_path)
+        if state.symbols == symbols and list(state.lengths) == list(lengths):
+            new = closes[closes.index > state.last_date]
+            for date, row in zip(new.index, new.to_numpy(dtype=np.float64)):
+                state.update(date, row)
+            return state, 'incremental', len(new)
+
+    state = EMAState(symbols, lengths)
+    state.bootstrap(closes)
+    return state, 'full', len(closes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="9/21/50 EMA distances on D/W/M for a whole watchlist")
+    parser.add_argument('--prices', required=True, help="Daily price file or directory (see tvind.prices)")
+    parser.add_argument('--symbols', help="Restrict to the symbols in this file (one per line or a CSV with Symbol)")
+    parser.add_argument('--lengths', type=int, nargs='+', default=list(DEFAULT_LENGTHS))
+    parser.add_argument('--state', default='ema_state.npz', help="Incremental state file")
+    parser.add_argument('--full', action='store_true', help="Ignore the saved state and rebuild")
+    parser.add_argument('--sort', default='D EMA 21 %', help="Column to sort by")
+    parser.add_argument('--output', help="Write the distance table to this CSV")
+    args = parser.parse_args()
+
+    closes = load_panel(args.prices)['Close'].sort_index()
+    if args.symbols:
+        if args.symbols.endswith('.csv'):
+            symbols = pd.read_csv(args.symbols, dtype={'Symbol': str})['Symbol'].tolist()
+        else:
+            with open(args.symbols, 'r') as f:
+                symbols = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        closes = closes.reindex(columns=symbols)
+
+    start = time.perf_counter()
+    state, mode, bars = run(closes, args.state, args.lengths, args.full)
+    table = state.distances()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Symbols: {len(state.symbols)} | {mode} update over {bars} bars | {elapsed:.1f} ms")
+
+    state.save(args.state)
+    table = table.sort_values(args.sort, ascending=False) if args.sort in table.columns else table
+    if args.output:
+        table.to_csv(args.output, float_format='%.2f')
+        print(f"Table saved to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(table.round(2).head(50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+PV Breakout / Gap Event Study (forward returns of every signal at once)
+
+The PV screener shows PV Days Ago, PV Strength %, Gap1 Size % and a Combined
+Score, but not whether those signals were followed by anything. This engine
+takes signal events - every breakout and gap tvind.pv_gap finds in an OHLCV
+panel, or the ones listed in screener exports - and measures what came next:
+
+    entry        close of the signal bar (a breakout is only known at the close)
+    forward      close[t + h] / entry - 1            h = 1, 5, 10, 20, 60 bars
+    excess       forward - the benchmark's (SPY) forward return over the same bars
+    hit          side * forward > 0                  (side -1 for Short PV / Gap Down)
+    MAE / MFE    worst / best low-high excursion against / with the side within h bars
+
+Every event is one (row, column) pair of the (dates x symbols) matrices, so
+forward closes are one gather close[rows + h, cols] and the excursions one
+(events x max h) gather of highs and lows with a running min / max - no loop
+over events. Results are bucketed by event type and gap size, and by event
+type and PV strength.
+
+USAGE:
+    python3 -m tvind.event_study --prices daily.parquet [--benchmark SPY] [--output events.csv]
+    python3 -m tvind.event_study --prices daily.parquet --exports post-processing/PVscreener/csv/*PV_Gap*.csv
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+from tvind.pv_gap import DEFAULTS, events, yyyymmdd
+
+HORIZONS = [1, 5, 10, 20, 60]
+GAP_BINS = [0, 5, 7.5, 10, 15, 20, np.inf]
+STRENGTH_BINS = [0, 1, 2, 5, 10, 20, np.inf]
+
+# Event type -> side (+1 long, -1 short)
+SIDES = {'PV Long': 1, 'PV Short': -1, 'Gap Up': 1, 'Gap Down': -1}
+
+
+def panel_events(o, h, l, c, v, gap_threshold=DEFAULTS['gap_threshold_1'], **params):
+    """
+    Every PV breakout and every gap of at least gap_threshold % on every bar:
+    DataFrame of row, col, Type, Side, 'Gap %' and 'PV Strength %'.
+    """
+    ev = events(o, h, l, c, v, **params)
+    gap = ev['Gap %']
+    with np.errstate(invalid='ignore'):
+        masks = {
+            'PV Long': ev['Long'],
+            'PV Short': ev['Short'],
+            'Gap Up': gap >= gap_threshold,
+            'Gap Down': gap <= -gap_threshold,
+        }
+    strength = {'PV Long': ev['Long Strength %'], 'PV Short': ev['Short Strength %']}
+    frames = []
+    for name, mask in masks.items():
+        rows, cols = np.nonzero(mask)
+        frames.append(pd.DataFrame({
+            'row': rows, 'col': cols, 'Type': name, 'Side': np.int8(SIDES[name]),
+            'Gap %': gap[rows, cols],
+            'PV Strength %': strength[name][rows, cols] if name in strength else np.nan,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_events(paths, index, symbols):
+    """
+    Events listed in s-PV Gap Screener exports (PV breakout and Gap1 of each
+    row), placed on the panel's dates and symbols. Rows whose symbol or date
+    is not in the panel are dropped.
+    """
+    from tvind.screener_csv import read_export
+
+    columns = {s: k for k, s in enumerate(symbols)}
+    dates = yyyymmdd(index).astype(np.int64)
+    frames = []
+    for path in paths:
+        df = read_export(path, profile='pv-gap')
+        col = df['Symbol'].map(columns)
+        pv = df['PV Breakout Flag'] == 1
+        frames.append(pd.DataFrame({
+            'date': df['PV Breakout Date'][pv], 'col': col[pv],
+            'Type': np.where(df['PV Type'][pv] < 0, 'PV Short', 'PV Long'),
+            'Gap %': np.nan, 'PV Strength %': df['PV Strength %'][pv]}))
+        gap = df['Gap1 Flag'] == 1
+        frames.append(pd.DataFrame({
+            'date': df['Gap1 Date'][gap], 'col': col[gap],
+            'Type': np.where(df['Gap1 Direction'][gap] < 0, 'Gap Down', 'Gap Up'),
+            'Gap %': df['Gap1 Size %'][gap], 'PV Strength %': np.nan}))
+    out = pd.concat(frames, ignore_index=True).dropna(subset=['col'])
+    pos = np.searchsorted(dates, out['date'].to_numpy())
+    found = (pos < len(dates)) & (dates[np.minimum(pos, len(dates) - 1)] == out['date'].to_numpy())
+    out = out[found].assign(row=pos[found], col=lambda d: d['col'].astype(np.int64))
+    out['Side'] = out['Type'].map(SIDES).astype(np.int8)
+    return out.drop(columns='date').drop_duplicates(['row', 'col', 'Type'])[
+        ['row', 'col', 'Type', 'Side', 'Gap %', 'PV Strength %']].reset_index(drop=True)
+
+
+def forward_outcomes(c, h, l, rows, cols, sides, horizons=HORIZONS, benchmark=None, chunk=50000):
+    """
+    {name: (events x horizons) array} of 'Return %', 'Excess %', 'Hit', 'MAE %'
+    and 'MFE %' for events at (rows, cols), entering at the signal close.
+    benchmark is a close vector on the same dates (None: no excess returns).
+    """
+    n = len(c)
+    horizons = np.asarray(horizons)
+    span = np.arange(1, horizons.max() + 1)
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    side = np.asarray(sides, dtype=np.float64)[:, None]
+    out = {k: np.full((len(rows), len(horizons)), np.nan)
+           for k in ('Return %', 'Excess %', 'Hit', 'MAE %', 'MFE %')}
+
+    # Chunks only bound the (events x max h) excursion arrays; each is one gather
+    for lo in range(0, len(rows), chunk):
+        r, k, s = rows[lo:lo + chunk], cols[lo:lo + chunk, None], side[lo:lo + chunk]
+        entry = c[r, k[:, 0]][:, None]
+        at = r[:, None] + horizons
+        valid = at < n
+        at = np.minimum(at, n - 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ret = np.where(valid, c[at, k] / entry - 1, np.nan) * 100
+            if benchmark is not None:
+                bench = np.where(valid, benchmark[at] / benchmark[r][:, None] - 1, np.nan) * 100
+                out['Excess %'][lo:lo + chunk] = ret - bench
+            out['Return %'][lo:lo + chunk] = ret
+            out['Hit'][lo:lo + chunk] = np.where(np.isnan(ret), np.nan, s * ret > 0)
+
+            path = np.minimum(r[:, None] + span, n - 1)
+            beyond = (r[:, None] + span) >= n
+            highs = np.where(beyond, np.nan, h[path, k] / entry - 1) * 100
+            lows = np.where(beyond, np.nan, l[path, k] / entry - 1) * 100
+        # running extremes up to each bar, read at the horizons (fmax/fmin skip NaN)
+        top = np.fmax.accumulate(highs, axis=1)[:, horizons - 1]
+        bottom = np.fmin.accumulate(lows, axis=1)[:, horizons - 1]
+        long_side = s > 0
+        out['MFE %'][lo:lo + chunk] = np.where(valid, np.where(long_side, top, -bottom), np.nan)
+        out['MAE %'][lo:lo + chunk] = np.where(valid, np.where(long_side, bottom, -top), np.nan)
+    return out
+
+
+def event_table(evts, outcomes, index, symbols, horizons=HORIZONS):
+    """One row per event with its features and every outcome column ('Return 5 %', 'MFE 20 %', ...)."""
+    table = evts.assign(Date=pd.DatetimeIndex(index)[evts['row'].to_numpy()],
+                        Symbol=np.asarray(symbols)[evts['col'].to_numpy()])
+    for name, values in outcomes.items():
+        label, _, unit = name.partition(' ')
+        for j, hz in enumerate(horizons):
+            table[f'{label} {hz} {unit}'.strip()] = values[:, j]
+    return table.drop(columns=['row', 'col'])
+
+
+def summarize(table, by, bins, horizons=HORIZONS, excursion=20):
+    """
+    Per event type and |by| bucket: event count, mean return / excess and hit
+    rate per horizon, and mean MAE / MFE at the excursion horizon.
+    """
+    values = table[by].abs()
+    data = table[values.notna()]
+    bucket = pd.cut(values[values.notna()], bins, right=False)
+    grouped = data.groupby([data['Type'], bucket], observed=True)
+    columns = {'Events': grouped.size()}
+    for hz in horizons:
+        columns[f'Ret {hz}'] = grouped[f'Return {hz} %'].mean()
+        columns[f'Exc {hz}'] = grouped[f'Excess {hz} %'].mean()
+        columns[f'Hit {hz}'] = grouped[f'Hit {hz}'].mean() * 100
+    columns[f'MAE {excursion}'] = grouped[f'MAE {excursion} %'].mean()
+    columns[f'MFE {excursion}'] = grouped[f'MFE {excursion} %'].mean()
+    out = pd.DataFrame(columns)
+    out.index.names = ['Type', f'|{by}|']
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forward returns, hit rates and MAE/MFE of PV breakouts and gaps")
+    parser.add_argument('--prices', required=True, help="Daily OHLCV file or directory (see tvind.prices)")
+    parser.add_argument('--exports', nargs='+', help="Take the events from these s-PV Gap Screener exports")
+    parser.add_argument('--benchmark', default='SPY', help="Symbol for the excess returns")
+    parser.add_argument('--horizons', type=int, nargs='+', default=HORIZONS, help="Forward bars")
+    parser.add_argument('--excursion', type=int, default=20, help="Horizon of the MAE / MFE in the summary")
+    parser.add_argument('--gap-threshold', type=float, default=DEFAULTS['gap_threshold_1'],
+                        help="Smallest |gap| %% counted as an event")
+    parser.add_argument('--price-period', type=int, default=DEFAULTS['price_period'])
+    parser.add_argument('--volume-period', type=int, default=DEFAULTS['volume_period'])
+    parser.add_argument('--sma-length', type=int, default=DEFAULTS['sma_length'])
+    parser.add_argument('--output', help="Write every event with its outcomes to this CSV")
+    args = parser.parse_args()
+
+    horizons = sorted(set(args.horizons))
+    if args.excursion not in horizons:
+        print(f"Error: --excursion {args.excursion} must be one of the horizons {horizons}")
+        return
+
+    panel = load_panel(args.prices)
+    closes = panel['Close'].sort_index()
+    index, symbols = closes.index, list(closes.columns)
+    o, h, l, c, v = (panel[f].reindex(index=index, columns=symbols).to_numpy(dtype=np.float64)
+                     for f in ('Open', 'High', 'Low', 'Close', 'Volume'))
+
+    benchmark = None
+    if args.benchmark in symbols:
+        benchmark = c[:, symbols.index(args.benchmark)]
+    else:
+        print(f"Warning: benchmark {args.benchmark} not in the price data, no excess returns")
+
+    start = time.perf_counter()
+    if args.exports:
+        paths = [p for p in args.exports if os.path.exists(p)]
+        for p in sorted(set(args.exports) - set(paths)):
+            print(f"Warning: {p} not found")
+        evts = export_events(paths, index, symbols)
+    else:
+        evts = panel_events(o, h, l, c, v, args.gap_threshold, price_period=args.price_period,
+                            volume_period=args.volume_period, sma_length=args.sma_length)
+    found = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    outcomes = forward_outcomes(c, h, l, evts['row'], evts['col'], evts['Side'], horizons, benchmark)
+    measured = (time.perf_counter() - start) * 1000
+    table = event_table(evts, outcomes, index, symbols, horizons)
+
+    print(f"Symbols: {len(symbols)} | Bars: {len(index)} | Events: {len(table)} "
+          f"| found in {found:.0f} ms | outcomes in {measured:.0f} ms")
+    counts = table['Type'].value_counts()
+    print('  ' + ' | '.join(f"{t}: {counts.get(t, 0)}" for t in SIDES))
+
+    with pd.option_context('display.max_rows', 100, 'display.width', 250, 'display.max_columns', 40):
+        print("\nBy gap size (%):")
+        print(summarize(table, 'Gap %', GAP_BINS, horizons, args.excursion).round(2))
+        print("\nBy PV strength (%):")
+        print(summarize(table, 'PV Strength %', STRENGTH_BINS, horizons, args.excursion).round(2))
+
+    if args.output:
+        table.to_csv(args.output, index=False, float_format='%.4f')
+        print(f"\nEvents saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+NQUSB Hierarchy Index
+
+Loads NQUSB_filtered_no_TR_grouping_v4.csv once into an adjacency index
+(parent -> children, child -> parent, leaf set) with O(1) lookups, validates
+it (cycles, orphans, dangling children) and generates the Pine lookup tables
+used by strength_within_sectors.pine:
+
+    initSymbolToName()      symbolToName.put(code, Key_Name)
+    initChildrenMap()       childrenMap.put(code, 'child1,child2,...')
+    initIndustryToCode()    industryToCode.put(TradingView industry, code)
+
+Screeners import it for sector and industry rollups:
+
+    from tvind.nqusb_hierarchy import load_hierarchy
+    h = load_hierarchy()
+    h.parent('NQUSB10102010')      # 'NQUSB101020'
+    h.ancestors('NQUSB10102010')   # ['NQUSB', 'NQUSB10', 'NQUSB101020']
+
+USAGE:
+    python3 -m tvind.nqusb_hierarchy [--csv FILE] [--validate] [--pine FILE [--in-place]]
+"""
+
+import argparse
+import csv
+import os
+import re
+from functools import lru_cache
+
+from tvind import REPO_DIR
+
+NQUSB_CSV = os.path.join(REPO_DIR, 'indicators', 'stock_vs_industry_strentgh', 'NQUSB_filtered_no_TR_grouping_v4.csv')
+TW_MAPPING_CSV = os.path.join(REPO_DIR, 'indicators', 'stock_vs_industry_strentgh', 'NQUSB_TW_mapping.csv')
+
+ROOT = 'NQUSB'
+ROOT_NAME = 'All Sectors'
+# Large/Mid cap variants (NQUSB10LM) mirror their base index and are not in any children list
+VARIANT_SUFFIX = 'LM'
+# getIndustrySectorV12 fallback when syminfo.industry is unknown
+DEFAULT_INDUSTRY_CODE = 'NQUSB10'
+
+
+class NQUSBHierarchy:
+    """Adjacency index over the NQUSB sector/industry tree."""
+
+    def __init__(self, rows, industry_map=None):
+        self.names = {}
+        self.full_names = {}
+        self.included_in = {}
+        self._children = {}
+        self._parent = {}
+        self.variant_of = {}
+        self.dangling = []
+        self.multi_parent = []
+
+        for row in rows:
+            code = row['Symbol'].strip()
+            self.names[code] = row.get('Key_Name', '').strip()
+            self.full_names[code] = row.get('Name', '').strip()
+            self.included_in[code] = [c.strip() for c in row.get('included_in_industries', '').split(',') if c.strip()]
+            self._children[code] = tuple(c.strip() for c in row.get('children', '').split(',') if c.strip())
+
+        self.names[ROOT] = self.names.get(ROOT) or ROOT_NAME
+
+        for code, children in self._children.items():
+            for child in children:
+                if child not in self.names:
+                    self.dangling.append((code, child))
+                elif child in self._parent and self._parent[child] != code:
+                    self.multi_parent.append((child, self._parent[child], code))
+                else:
+                    self._parent[child] = code
+
+        for code in self.names:
+            base = code[:-len(VARIANT_SUFFIX)]
+            if code.endswith(VARIANT_SUFFIX) and code not in self._parent and base in self.names:
+                self.variant_of[code] = base
+
+        self.leaves = frozenset(c for c in self.names
+                                if not self._children.get(c) and c not in self.variant_of)
+        self.industry_map = dict(industry_map or {})
+
+    @classmethod
+    def from_csv(cls, csv_path=NQUSB_CSV, tw_mapping_csv=TW_MAPPING_CSV):
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        industry_map = {}
+        if tw_mapping_csv and os.path.exists(tw_mapping_csv):
+            with open(tw_mapping_csv, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    industry_map[row['TW_Industry'].strip()] = row['NQUSB_Code'].strip()
+        return cls(rows, industry_map)
+
+    def __contains__(self, code):
+        return code in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def base(self, code):
+        """Resolve a Large/Mid cap variant to its base index."""
+        return self.variant_of.get(code, code)
+
+    def parent(self, code):
+        return self._parent.get(self.base(code))
+
+    def children(self, code):
+        return self._children.get(self.base(code), ())
+
+    def is_leaf(self, code):
+        return self.base(code) in self.leaves
+
+    def name(self, code):
+        return self.names.get(code) or self.names.get(self.base(code)) or code
+
+    def ancestors(self, code):
+        """Ancestors from the root down to the direct parent."""
+        chain = []
+        node = self.parent(code)
+        while node is not None and len(chain) <= len(self.names):
+            chain.append(node)
+            node = self._parent.get(node)
+        return chain[::-1]
+
+    def depth(self, code):
+        return len(self.ancestors(code))
+
+    def sector(self, code):
+        """Top-level sector (NQUSB10, NQUSB15, ...) a code belongs to."""
+        path = self.ancestors(code) + [self.base(code)]
+        return path[1] if len(path) > 1 else None
+
+    def descendants(self, code):
+        out = []
+        seen = {self.base(code)}
+        stack = list(reversed(self.children(code)))
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue  # cycle - reported by validate()
+            seen.add(node)
+            out.append(node)
+            stack.extend(reversed(self._children.get(node, ())))
+        return out
+
+    def leaves_under(self, code):
+        code = self.base(code)
+        if code in self.leaves:
+            return [code]
+        return [c for c in self.descendants(code) if c in self.leaves]
+
+    def nodes(self):
+        """All tree nodes (variants excluded) in depth-first order from the root."""
+        return [ROOT] + self.descendants(ROOT)
+
+    def industry_code(self, tv_industry):
+        """NQUSB code for a TradingView industry (getIndustrySectorV12)."""
+        return self.industry_map.get(tv_industry, DEFAULT_INDUSTRY_CODE)
+
+    def find_cycles(self):
+        """Return every cycle in the children graph as a list of codes."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = dict.fromkeys(self._children, WHITE)
+        cycles = []
+        for start in self._children:
+            if color[start] != WHITE:
+                continue
+            color[start] = GREY
+            path = [start]
+            stack = [iter(self._children[start])]
+            while stack:
+                child = next(stack[-1], None)
+                if child is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif child not in color:
+                    continue
+                elif color[child] == GREY:
+                    cycles.append(path[path.index(child):] + [child])
+                elif color[child] == WHITE:
+                    color[child] = GREY
+                    path.append(child)
+                    stack.append(iter(self._children[child]))
+        return cycles
+
+    def validate(self):
+        """List of problems found in the tree (empty when consistent)."""
+        problems = []
+        for path in self.find_cycles():
+            problems.append(f"cycle: {' -> '.join(path)}")
+        for parent, child in self.dangling:
+            problems.append(f"dangling child: {parent} lists unknown {child}")
+        for child, first, second in self.multi_parent:
+            problems.append(f"multiple parents: {child} under {first} and {second}")
+
+        reachable = set(self.nodes())
+        for code in self.names:
+            if code == ROOT or code in self.variant_of:
+                continue
+            if code not in self._parent:
+                problems.append(f"orphan: {code} has no parent")
+            elif code not in reachable:
+                problems.append(f"unreachable: {code} is not under {ROOT}")
+            elif self.included_in.get(code) and not set(self.included_in[code][:-1]) <= set(self.ancestors(code)):
+                problems.append(f"path mismatch: {code} included_in_industries {self.included_in[code]}")
+
+        for industry, code in self.industry_map.items():
+            if code not in self.names:
+                problems.append(f"unknown code: TradingView industry '{industry}' -> {code}")
+        return problems
+
+    def pine_symbol_to_name(self):
+        lines = [f'    symbolToName.put("{code}", "{_pine_escape(self.names[code])}")'
+                 for code in sorted(self.names)]
+        return "initSymbolToName() =>\n" + "\n".join(lines) + "\n"
+
+    def pine_children_map(self):
+        lines = [f'    childrenMap.put("{code}", "{",".join(children)}")'
+                 for code, children in self._children.items() if children]
+        return "initChildrenMap() =>\n" + "\n".join(lines) + "\n"
+
+    def pine_industry_to_code(self):
+        lines = [f'    industryToCode.put("{_pine_escape(industry)}", "{code}")'
+                 for industry, code in self.industry_map.items()]
+        return "initIndustryToCode() =>\n" + "\n".join(lines) + "\n"
+
+    def pine_industry_lookup(self):
+        return ("getIndustrySectorV12(industry) =>\n"
+                "    code=industryToCode.get(industry)\n"
+                f"    na(code) ? '{DEFAULT_INDUSTRY_CODE}' : code // Default to Technology\n")
+
+
+def _pine_escape(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+@lru_cache(maxsize=None)
+def load_hierarchy(csv_path=NQUSB_CSV, tw_mapping_csv=TW_MAPPING_CSV):
+    """Load (once per path) and return the shared hierarchy index."""
+    return NQUSBHierarchy.from_csv(csv_path, tw_mapping_csv)
+
+
+# Function blocks replaced by update_pine(): body runs until the next unindented line
+_PINE_FUNC_RE = r"^{name}\(\w*\) =>\n(?:(?:[ \t]+.*)?\n)*?(?=\S)"
+
+
+def update_pine(source, hierarchy):
+    """Regenerate the lookup tables inside a Pine script."""
+    source = _replace_func(source, 'initSymbolToName', hierarchy.pine_symbol_to_name())
+    source = _replace_func(source, 'getIndustrySectorV12', hierarchy.pine_industry_lookup())
+
+    if re.search(r"^initIndustryToCode\(\) =>", source, re.M):
+        source = _replace_func(source, 'initChildrenMap', hierarchy.pine_children_map())
+        source = _replace_func(source, 'initIndustryToCode', hierarchy.pine_industry_to_code())
+    else:
+        # First run: the map and its init function must be declared before the barstate.isfirst call
+        source = _replace_func(source, 'initChildrenMap',
+                               hierarchy.pine_children_map() + "\n" + hierarchy.pine_industry_to_code())
+        source = source.replace("var childrenMap=map.new<string, string>()\n",
+                                "var childrenMap=map.new<string, string>()\n"
+                                "var industryToCode=map.new<string, string>()\n", 1)
+        source = source.replace("    initChildrenMap()\n",
+                                "    initChildrenMap()\n    initIndustryToCode()\n", 1)
+    return source
+
+
+def _replace_func(source, name, block):
+    pattern = re.compile(_PINE_FUNC_RE.format(name=name), re.M)
+    if not pattern.search(source):
+        raise ValueError(f"{name}() not found in Pine script")
+    if not block.endswith("\n\n"):
+        block += "\n"
+    return pattern.sub(lambda _: block, source, count=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and validate the NQUSB hierarchy index")
+    parser.add_argument('--csv', default=NQUSB_CSV)
+    parser.add_argument('--tw-mapping', default=TW_MAPPING_CSV)
+    parser.add_argument('--pine', help="Print (or with --in-place, rewrite) the lookup tables of this Pine script")
+    parser.add_argument('--in-place', action='store_true')
+    parser.add_argument('--validate', action='store_true', help="Exit non-zero when problems are found")
+    args = parser.parse_args()
+
+    hierarchy = NQUSBHierarchy.from_csv(args.csv, args.tw_mapping)
+    problems = hierarchy.validate()
+
+    print(f"Loaded {len(hierarchy)} codes from {args.csv}")
+    print(f"  Tree nodes: {len(hierarchy.nodes())}")
+    print(f"  Leaves: {len(hierarchy.leaves)}")
+    print(f"  LM variants: {len(hierarchy.variant_of)}")
+    print(f"  TradingView industries mapped: {len(hierarchy.industry_map)}")
+    if problems:
+        print(f"\n⚠️ {len(problems)} problem(s):")
+        for problem in problems:
+            print(f"  {problem}")
+    else:
+        print("\n✅ No cycles, orphans or dangling children")
+
+    if args.pine:
+        with open(args.pine, 'r', encoding='utf-8') as f:
+            source = f.read()
+        updated = update_pine(source, hierarchy)
+        if args.in_place:
+            with open(args.pine, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            print(f"\n✓ Updated lookup tables in {args.pine} ({len(source):,} -> {len(updated):,} characters)")
+        else:
+            print()
+            print(hierarchy.pine_symbol_to_name())
+            print(hierarchy.pine_children_map())
+            print(hierarchy.pine_industry_to_code())
+            print(hierarchy.pine_industry_lookup())
+
+    if args.validate and problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+NQUSB Sector/Industry Rollups
+
+Computes every NQUSB sector, industry and sub-industry aggregate in one pass
+from a returns matrix of all constituents (symbols x periods, e.g. the
+'1W Return %', '1M Return %', ... columns of a perf screener export).
+
+A sparse membership matrix M (nodes x symbols) assigns each stock to its
+NQUSB code and every ancestor of it, so the aggregates are matrix products:
+
+    EW Return          (M @ R) / (M @ valid)
+    CW Return          (M @ (w * R)) / (M @ (w * valid))
+    RS vs Parent       (1 + node) / (1 + parent) - 1, same as 'Rel Return' in the exports
+    % Beating Parent   members whose own return beats the parent's EW return
+
+USAGE:
+    python3 -m tvind.nqusb_rollups --returns perf_export.csv --members members.csv [--output rollup.csv]
+
+The members CSV needs 'Symbol' plus either 'NQUSB_Code' or a TradingView
+'Industry' column (mapped through NQUSB_TW_mapping.csv), and optionally
+'Market Cap' for cap-weighted returns.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from tvind.nqusb_hierarchy import load_hierarchy
+
+
+def default_return_columns(df):
+    """Absolute return columns of a perf export ('1M Return %', not 'Rel Return 1M %')."""
+    return [c for c in df.columns
+            if c.endswith('Return %') and not c.startswith('Rel ') and df[c].notna().any()]
+
+
+def resolve_codes(members, hierarchy):
+    """Series Symbol -> NQUSB code, from 'NQUSB_Code' or the TradingView 'Industry'."""
+    if 'NQUSB_Code' in members.columns:
+        codes = members['NQUSB_Code']
+    elif 'Industry' in members.columns:
+        # Unmapped industries stay out of the tree instead of defaulting to Technology
+        codes = members['Industry'].map(hierarchy.industry_map)
+    else:
+        raise KeyError("members need an 'NQUSB_Code' or 'Industry' column")
+    return pd.Series(codes.values, index=members['Symbol'].astype(str)).map(hierarchy.base)
+
+
+def membership_matrix(codes, hierarchy):
+    """Sparse (nodes x symbols) 0/1 matrix: each symbol counts in its code and all ancestors."""
+    nodes = hierarchy.nodes()
+    node_idx = {code: i for i, code in enumerate(nodes)}
+
+    rows, cols = [], []
+    for j, code in enumerate(codes.values):
+        if code not in node_idx:
+            continue
+        for node in hierarchy.ancestors(code) + [code]:
+            rows.append(node_idx[node])
+            cols.append(j)
+
+    data = np.ones(len(rows), dtype=np.float64)
+    M = sparse.csr_matrix((data, (rows, cols)), shape=(len(nodes), len(codes)))
+    return M, nodes
+
+
+def parent_matrix(nodes, hierarchy):
+    """Sparse (nodes x nodes) selector: row i picks the parent of node i."""
+    node_idx = {code: i for i, code in enumerate(nodes)}
+    pairs = [(i, node_idx[hierarchy.parent(code)]) for i, code in enumerate(nodes)
+             if hierarchy.parent(code) in node_idx]
+    rows = [r for r, _ in pairs]
+    cols = [c for _, c in pairs]
+    return sparse.csr_matrix((np.ones(len(pairs)), (rows, cols)), shape=(len(nodes), len(nodes)))
+
+
+def compute_rollups(returns, codes, hierarchy=None, market_caps=None):
+    """
+    Aggregate a (symbols x periods) returns frame over the whole NQUSB tree.
+
+    returns      DataFrame indexed by Symbol, one column per period, values in %
+    codes        Series Symbol -> NQUSB code (see resolve_codes)
+    market_caps  optional Series Symbol -> market cap for cap-weighted returns
+    """
+    hierarchy = hierarchy or load_hierarchy()
+    codes = codes.reindex(returns.index)
+    periods = list(returns.columns)
+
+    R = returns.to_numpy(dtype=np.float64) / 100.0
+    valid = ~np.isnan(R)
+    R0 = np.where(valid, R, 0.0)
+
+    M, nodes = membership_matrix(codes, hierarchy)
+    P = parent_matrix(nodes, hierarchy)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        counts = M @ valid.astype(np.float64)
+        ew = (M @ R0) / counts
+
+        if market_caps is not None:
+            w = market_caps.reindex(returns.index).to_numpy(dtype=np.float64)
+            w = np.where(np.isnan(w), 0.0, w)[:, None] * valid
+            cw = (M @ (w * R0)) / (M @ w)
+        else:
+            cw = np.full_like(ew, np.nan)
+
+        has_parent = np.asarray(P.sum(axis=1)).ravel() > 0
+        parent_ew = P @ ew
+        parent_ew[~has_parent] = np.nan
+        rs = (1.0 + ew) / (1.0 + parent_ew) - 1.0
+
+        # Member-vs-parent comparison over the nonzeros of M: one row per (node, symbol)
+        coo = M.tocoo()
+        beat = (R[coo.col] > parent_ew[coo.row]) & valid[coo.col]
+        agg = sparse.csr_matrix((np.ones(coo.nnz), (coo.row, np.arange(coo.nnz))),
+                                shape=(len(nodes), coo.nnz))
+        pct_beat = (agg @ beat.astype(np.float64)) / counts
+        pct_beat[~has_parent] = np.nan
+
+    out = pd.DataFrame({
+        'Name': [hierarchy.name(c) for c in nodes],
+        'Parent': [hierarchy.parent(c) or '' for c in nodes],
+        'Level': [hierarchy.depth(c) for c in nodes],
+        'Members': np.asarray(M.sum(axis=1)).ravel().astype(int),
+    }, index=pd.Index(nodes, name='Symbol'))
+
+    for k, period in enumerate(periods):
+        out[f'EW {period}'] = ew[:, k] * 100.0
+        out[f'CW {period}'] = cw[:, k] * 100.0
+        out[f'RS vs Parent {period}'] = rs[:, k] * 100.0
+        out[f'% Beating Parent {period}'] = pct_beat[:, k] * 100.0
+
+    return out[out['Members'] > 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-tree NQUSB strength report from constituent returns")
+    parser.add_argument('--returns', required=True, help="CSV with Symbol and period return columns (perf export)")
+    parser.add_argument('--members', required=True, help="CSV with Symbol, NQUSB_Code or Industry, optional Market Cap")
+    parser.add_argument('--columns', nargs='*', help="Return columns to aggregate (default: all '... Return %%')")
+    parser.add_argument('--sort', help="Column to sort the report by (default: first RS vs Parent column)")
+    parser.add_argument('--output', help="Write the report to this CSV")
+    args = parser.parse_args()
+
+    returns = pd.read_csv(args.returns, dtype={'Symbol': str}).drop_duplicates('Symbol').set_index('Symbol')
+    members = pd.read_csv(args.members, dtype={'Symbol': str}).drop_duplicates('Symbol')
+    columns = args.columns or default_return_columns(returns)
+    if not columns:
+        print("Error: No return columns found.")
+        return
+
+    hierarchy = load_hierarchy()
+    codes = resolve_codes(members, hierarchy)
+    caps = members.set_index('Symbol')['Market Cap'] if 'Market Cap' in members.columns else None
+
+    start = time.perf_counter()
+    report = compute_rollups(returns[columns], codes, hierarchy, caps)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Symbols: {len(returns)} | Periods: {len(columns)} | Nodes: {len(report)} | {elapsed:.1f} ms")
+
+    sort_col = args.sort or f'RS vs Parent {columns[0]}'
+    report = report.sort_values(sort_col, ascending=False)
+    if args.output:
+        report.to_csv(args.output, float_format='%.4f')
+        print(f"Report saved to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(report[['Name', 'Level', 'Members', sort_col]].head(50))
+
+
+if __name__ == "__main__":
+    main()
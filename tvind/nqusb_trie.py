@@ -0,0 +1,257 @@
+"""
+NQUSB Code Resolver (prefix trie for stock_vs_industry_strength.pine)
+
+NQUSB codes are hierarchical by construction - two digits per level:
+
+    NQUSB40            sector          (level 1, "Quaternary" in the Pine script)
+    NQUSB4040          supersector     (level 2)
+    NQUSB404010        industry        (level 3)
+    NQUSB40401020      subsector       (level 4, "Primary")
+
+stock_vs_industry_strength.pine keeps a hand-written "broadest,...,most
+specific" string per TradingView industry and selectIndex() slices it. Here
+every code of the GIDS directory and NQUSB_filtered_no_TR_grouping_v4.csv is
+inserted into a trie keyed by its digits; suffixed variants (LM, T, N, LMT,
+JPY, ...) hang off the node of their base code. A walk down the trie gives,
+in O(code length):
+
+    chain(code)          existing indices from the sector down to the code
+    ancestors(code)      chain(code) without the code itself
+    descendants(code)    every existing code below it
+    nearest(code, k)     deepest existing index at level <= k on the path
+    select(code, choice) selectIndex(): Primary / Secondary / Tertiary / Quaternary
+
+resolve_universe() maps a whole universe (TradingView industry or NQUSB code
+per stock) to its four benchmark indices, resolving each distinct code once.
+
+USAGE:
+    python3 -m tvind.nqusb_trie --code NQUSB40401020
+    python3 -m tvind.nqusb_trie --universe stocks.csv [--industry-col Industry] [--lm] [--output benchmarks.csv]
+    python3 -m tvind.nqusb_trie --verify-pine      # compare the trie with the Pine industryIndexBenchmark strings
+"""
+
+import argparse
+import csv
+import os
+import re
+import time
+
+import pandas as pd
+
+from tvind import REPO_DIR
+from tvind.nqusb_hierarchy import NQUSB_CSV, ROOT, load_hierarchy
+
+GIDS_CSV = os.path.join(REPO_DIR, 'indicators', 'stock_vs_industry_strentgh', 'GIDS_Directory_20251121.csv')
+PINE_FILE = os.path.join(REPO_DIR, 'indicators', 'stock_vs_industry_strentgh', 'stock_vs_industry_strength.pine')
+
+DIGITS_PER_LEVEL = 2
+LEVELS = 4
+CHOICES = ['Primary', 'Secondary', 'Tertiary', 'Quaternary']
+
+_CODE_RE = re.compile(rf'^{ROOT}(\d*)([A-Z]*)$')
+
+
+class _Node:
+    __slots__ = ('children', 'code', 'variants')
+
+    def __init__(self):
+        self.children = {}
+        self.code = None       # the code itself when it is an existing index
+        self.variants = {}     # suffix -> code (NQUSB40LM, NQUSB40T, ...)
+
+
+def split_code(code):
+    """'NQUSB4040LM' -> ('4040', 'LM'); None for anything that is not an NQUSB code."""
+    match = _CODE_RE.match(code.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+
+class CodeTrie:
+    """Digit trie over NQUSB codes."""
+
+    def __init__(self, codes=()):
+        self.root = _Node()
+        self.size = 0
+        for code in codes:
+            self.insert(code)
+
+    def insert(self, code):
+        parts = split_code(code)
+        if parts is None:
+            return
+        digits, suffix = parts
+        node = self.root
+        for ch in digits:
+            node = node.children.setdefault(ch, _Node())
+        if suffix:
+            node.variants.setdefault(suffix, code.strip())
+        elif node.code is None:
+            node.code = code.strip()
+            self.size += 1
+
+    @classmethod
+    def from_sources(cls, gids_csv=GIDS_CSV, nqusb_csv=NQUSB_CSV):
+        """Every NQUSB code of the GIDS directory plus the hierarchy CSV."""
+        codes = []
+        for path in (gids_csv, nqusb_csv):
+            if path and os.path.exists(path):
+                with open(path, 'r', newline='', encoding='utf-8') as f:
+                    codes.extend(row['Symbol'] for row in csv.DictReader(f) if row.get('Symbol', '').startswith(ROOT))
+        return cls(codes)
+
+    def __contains__(self, code):
+        node = self._node(code)
+        return node is not None and node.code is not None
+
+    def __len__(self):
+        return self.size
+
+    def _path(self, code):
+        """Nodes along the code's digits (as far as they exist) and the digit string."""
+        parts = split_code(code)
+        if parts is None:
+            return [], ''
+        digits = parts[0]
+        nodes = [self.root]
+        for ch in digits:
+            nxt = nodes[-1].children.get(ch)
+            if nxt is None:
+                break
+            nodes.append(nxt)
+        return nodes, digits
+
+    def _node(self, code):
+        nodes, digits = self._path(code)
+        return nodes[-1] if nodes and len(nodes) == len(digits) + 1 else None
+
+    def chain(self, code):
+        """Existing indices on the path at level boundaries, broadest first (root excluded)."""
+        nodes, _ = self._path(code)
+        return [n.code for depth, n in enumerate(nodes)
+                if depth and depth % DIGITS_PER_LEVEL == 0 and n.code is not None]
+
+    def ancestors(self, code):
+        chain = self.chain(code)
+        return chain[:-1] if chain and chain[-1] == code.strip() else chain
+
+    def descendants(self, code):
+        node = self._node(code)
+        if node is None:
+            return []
+        out, stack = [], [node]
+        while stack:
+            current = stack.pop()
+            for ch in sorted(current.children, reverse=True):
+                child = current.children[ch]
+                if child.code is not None:
+                    out.append(child.code)
+                stack.append(child)
+        return sorted(out)
+
+    def nearest(self, code, level):
+        """Deepest existing index at level <= `level` on the code's path (None if there is none)."""
+        nodes, _ = self._path(code)
+        for depth in range(min(level * DIGITS_PER_LEVEL, len(nodes) - 1), 0, -1):
+            if depth % DIGITS_PER_LEVEL == 0 and nodes[depth].code is not None:
+                return nodes[depth].code
+        return None
+
+    def variant(self, code, suffix):
+        """Suffixed variant of an index (e.g. 'LM'), the code itself when the variant does not exist."""
+        node = self._node(code)
+        return node.variants.get(suffix, code) if node is not None else code
+
+    def select(self, code, choice='Primary'):
+        """selectIndex(): Primary = most specific ... Quaternary = broadest, with the same fallbacks."""
+        chain = self.chain(code)
+        if not chain:
+            return ''
+        position = {'Primary': len(chain) - 1, 'Secondary': max(0, len(chain) - 2),
+                    'Tertiary': max(0, len(chain) - 3), 'Quaternary': 0}.get(choice, len(chain) - 1)
+        return chain[position]
+
+
+def resolve_universe(df, trie, code_col=None, industry_col='Industry', lm=False):
+    """
+    Add Index Code and Primary..Quaternary benchmark columns to a universe.
+    Stocks give either an NQUSB code (code_col) or a TradingView industry
+    (mapped with NQUSB_TW_mapping.csv). Each distinct code is resolved once.
+    """
+    if code_col:
+        codes = df[code_col].fillna('').astype(str).str.strip()
+    else:
+        industry_map = load_hierarchy().industry_map
+        codes = df[industry_col].map(industry_map).fillna('')
+
+    # factorize: one trie walk per distinct code, then a take() per column
+    labels, uniques = pd.factorize(codes)
+    resolved = {choice: [] for choice in CHOICES}
+    for code in uniques:
+        for choice in CHOICES:
+            index = trie.select(code, choice) if code else ''
+            resolved[choice].append(trie.variant(index, 'LM') if lm and index else index)
+
+    out = df.copy()
+    out['Index Code'] = codes.to_numpy()
+    for choice in CHOICES:
+        out[choice] = pd.Series(resolved[choice], dtype=object).to_numpy()[labels] if len(uniques) else ''
+    return out
+
+
+def pine_hierarchies(pine_file=PINE_FILE):
+    """industry -> hierarchy string from the industryIndexBenchmark switch."""
+    with open(pine_file, 'r', encoding='utf-8') as f:
+        return dict(re.findall(r'^\s*"([^"]+)"\s*=>\s*"(NQUSB[^"]*)"', f.read(), re.M))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve NQUSB codes to their benchmark indices with a prefix trie")
+    parser.add_argument('--code', nargs='+', help="Show chain, descendants and levels of these codes")
+    parser.add_argument('--universe', help="CSV of stocks to resolve to Primary..Quaternary indices")
+    parser.add_argument('--code-col', help="Column with NQUSB codes (default: map --industry-col)")
+    parser.add_argument('--industry-col', default='Industry', help="TradingView industry column")
+    parser.add_argument('--lm', action='store_true', help="Use the Large/Mid cap (LM) variants where they exist")
+    parser.add_argument('--output', help="Write the resolved universe to this CSV")
+    parser.add_argument('--verify-pine', action='store_true', help="Compare with the Pine industryIndexBenchmark strings")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    trie = CodeTrie.from_sources()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Trie: {len(trie)} index codes | built in {elapsed:.1f} ms")
+
+    for code in args.code or []:
+        print(f"\n{code}")
+        print(f"  Chain:       {' -> '.join(trie.chain(code)) or '(none)'}")
+        print(f"  Levels:      " + ', '.join(f"{k}={trie.nearest(code, k)}" for k in range(1, LEVELS + 1)))
+        print(f"  Select:      " + ', '.join(f"{c}={trie.select(code, c)}" for c in CHOICES))
+        descendants = trie.descendants(code)
+        print(f"  Descendants: {len(descendants)} {descendants[:10]}{' ...' if len(descendants) > 10 else ''}")
+
+    if args.verify_pine:
+        mismatches = 0
+        for industry, hierarchy in pine_hierarchies().items():
+            listed = [c.strip() for c in hierarchy.split(',')]
+            chain = trie.chain(listed[-1])
+            if chain != listed:
+                mismatches += 1
+                print(f"  {industry}: Pine {listed} | trie {chain}")
+        print(f"Pine hierarchies checked: {len(pine_hierarchies())} | mismatches: {mismatches}")
+
+    if args.universe:
+        df = pd.read_csv(args.universe, dtype=str)
+        start = time.perf_counter()
+        out = resolve_universe(df, trie, args.code_col, args.industry_col, args.lm)
+        elapsed = (time.perf_counter() - start) * 1000
+        unresolved = (out['Primary'] == '').sum()
+        print(f"Resolved {len(out)} stocks ({out['Index Code'].nunique()} distinct codes, "
+              f"{unresolved} unresolved) in {elapsed:.1f} ms")
+        if args.output:
+            out.to_csv(args.output, index=False)
+            print(f"Saved to {args.output}")
+        else:
+            print(out.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
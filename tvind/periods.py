@@ -0,0 +1,177 @@
+"""
+Shared Period-Return Calculator (YTD/MTD/QTD and N-bar returns)
+
+industry_group_strength_improved.pine (f_ytd_change, f_mtd_change,
+f_qtd_change, getDays), s-performance_vs_SPY_display.pine (_get_bars_back)
+and group_return_dashboard.pine each work out "where did this period start"
+on every bar for every symbol. Offline, the answer only depends on the
+trading calendar, so it is computed once per date index:
+
+    N-bar periods   base row = t - N                       (1W=5 ... 1Y=252)
+    calendar        base row = last bar before the period   (WTD, MTD, QTD, YTD)
+                    or, with base='open', the first bar of it (Pine f_ytd_change)
+
+Anchors holds those base rows as one (periods x dates) int array. The returns
+of every symbol for every period are then a single fancy-indexed gather of the
+(dates x symbols) close matrix:
+
+    return % = (close[t] / close[anchor[p, t]] - 1) * 100
+
+Column names follow the perf screener export ('1M Return %', 'YTD Return %',
+'Rel Return 1M %'), so the output feeds rs_ranks --export and the renderers.
+
+USAGE:
+    python3 -m tvind.periods --prices daily.csv [--benchmark SPY] [--base open] [--output returns.csv]
+"""
+
+import argparse
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+
+# Trading-day lookbacks of getDays / _get_bars_back
+LOOKBACKS = {'1W': 5, '2W': 10, '1M': 21, '2M': 42, '3M': 63, '6M': 126, '9M': 189, '1Y': 252}
+# Calendar periods -> pandas period frequency
+CALENDAR = {'WTD': 'W-FRI', 'MTD': 'M', 'QTD': 'Q', 'YTD': 'Y'}
+
+DEFAULT_PERIODS = ['1W', '1M', '3M', '6M', '1Y', 'WTD', 'MTD', 'QTD', 'YTD']
+
+# Most recently used Anchors: long-running callers (watch, alerts) see a new
+# calendar every day, so old ones are evicted instead of kept for good
+CACHE_SIZE = 8
+_CACHE = OrderedDict()
+
+
+class Anchors:
+    """Base row of every period for every date of one trading calendar (-1 = not available)."""
+
+    def __init__(self, index, periods=None, base='close', lookbacks=LOOKBACKS):
+        self.index = pd.DatetimeIndex(index)
+        self.periods = list(periods or list(lookbacks) + list(CALENDAR))
+        self.base = base
+        n = len(self.index)
+        t = np.arange(n)
+        rows = np.empty((len(self.periods), n), dtype=np.int64)
+        # True where the base is the open of the period's first bar instead of a close
+        self.uses_open = np.zeros(len(self.periods), dtype=bool)
+
+        for k, name in enumerate(self.periods):
+            if name in lookbacks:
+                rows[k] = t - lookbacks[name]
+            elif name in CALENDAR:
+                labels = self.index.to_period(CALENDAR[name]).asi8
+                new = np.r_[True, labels[1:] != labels[:-1]]
+                first = np.maximum.accumulate(np.where(new, t, 0))
+                if base == 'open':
+                    rows[k] = first
+                    self.uses_open[k] = True
+                else:
+                    rows[k] = first - 1
+            else:
+                raise KeyError(f"unknown period {name!r} (use {list(lookbacks) + list(CALENDAR)})")
+        rows[rows < 0] = -1
+        self.rows = rows
+
+    @classmethod
+    def for_index(cls, index, periods=None, base='close', lookbacks=LOOKBACKS):
+        """
+        Cached Anchors per trading calendar: every caller on the same dates
+        shares one instance (the CACHE_SIZE most recently used are kept).
+        """
+        index = pd.DatetimeIndex(index)
+        key = (hash(index.asi8.tobytes()), len(index), tuple(periods or ()), base, tuple(lookbacks.items()))
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+        else:
+            _CACHE[key] = cls(index, periods, base, lookbacks)
+            while len(_CACHE) > CACHE_SIZE:
+                _CACHE.popitem(last=False)
+        return _CACHE[key]
+
+    def row(self, period):
+        return self.rows[self.periods.index(period)]
+
+
+def gather_returns(values, anchors, at=None, opens=None):
+    """
+    (periods x len(at) x symbols) % returns of a (dates x symbols) array in one gather.
+    at: row positions to evaluate (default: every date). opens is needed for base='open'.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    at = np.arange(len(values)) if at is None else np.atleast_1d(at) % len(values)
+    rows = anchors.rows[:, at]
+    valid = rows >= 0
+    base = values[np.where(valid, rows, 0)]
+    if anchors.uses_open.any():
+        if opens is None:
+            raise ValueError("base='open' anchors need the open prices")
+        from_open = np.asarray(opens, dtype=np.float64)[np.where(valid, rows, 0)]
+        base = np.where(anchors.uses_open[:, None, None], from_open, base)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = (values[at][None, :, :] / base - 1) * 100
+    return np.where(valid[:, :, None] & (base != 0), out, np.nan)
+
+
+def period_returns(closes, periods=DEFAULT_PERIODS, at=-1, benchmark=None, opens=None, base='close'):
+    """
+    Symbol x '<period> Return %' table for one date (default the latest), plus
+    'Rel Return <period> %' (returns of close / benchmark close) when a
+    benchmark column name is given.
+    """
+    anchors = Anchors.for_index(closes.index, periods, base)
+    C = closes.to_numpy(dtype=np.float64)
+    O = opens.reindex_like(closes).to_numpy(dtype=np.float64) if opens is not None else None
+    table = gather_returns(C, anchors, at, O)[:, 0, :]
+    out = pd.DataFrame(table.T, index=pd.Index(closes.columns, name='Symbol'),
+                       columns=[f'{p} Return %' for p in anchors.periods])
+    if benchmark is not None:
+        bench = closes[benchmark].to_numpy(dtype=np.float64)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = C / bench
+        # The relative series has no open: calendar anchors always use the prior close
+        rel_anchors = Anchors.for_index(closes.index, periods, 'close')
+        rel = gather_returns(ratio, rel_anchors, at)[:, 0, :]
+        for k, p in enumerate(rel_anchors.periods):
+            out[f'Rel Return {p} %'] = rel[k]
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Period returns (1W..1Y, WTD/MTD/QTD/YTD) for every symbol")
+    parser.add_argument('--prices', required=True, help="Daily price file or directory (see tvind.prices)")
+    parser.add_argument('--periods', nargs='+', default=DEFAULT_PERIODS,
+                        help=f"Any of {list(LOOKBACKS) + list(CALENDAR)}")
+    parser.add_argument('--benchmark', help="Symbol for the 'Rel Return' columns (e.g. SPY)")
+    parser.add_argument('--base', choices=['close', 'open'], default='close',
+                        help="Calendar periods from the prior close or the period's first open (Pine f_ytd_change)")
+    parser.add_argument('--date', help="Evaluate on this date instead of the latest bar")
+    parser.add_argument('--output', help="Write the return table to this CSV")
+    args = parser.parse_args()
+
+    panel = load_panel(args.prices)
+    closes = panel['Close'].sort_index()
+    if args.benchmark and args.benchmark not in closes.columns:
+        print(f"Error: benchmark {args.benchmark} not in the price data")
+        return
+    at = -1 if not args.date else closes.index.searchsorted(pd.Timestamp(args.date), side='right') - 1
+
+    start = time.perf_counter()
+    table = period_returns(closes, args.periods, at, args.benchmark,
+                           panel['Open'].sort_index() if args.base == 'open' else None, args.base)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Symbols: {len(table)} | Periods: {len(args.periods)} | Date: {closes.index[at]:%Y-%m-%d} | {elapsed:.1f} ms")
+
+    if args.output:
+        table.to_csv(args.output, float_format='%.2f')
+        print(f"Returns saved to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(table.round(2).head(50))
+
+
+if __name__ == "__main__":
+    main()
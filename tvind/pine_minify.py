@@ -0,0 +1,479 @@
+"""
+Pine Script Minifier (size report per section against the 80,000 limit)
+
+strength_within_sectors.pine and the generated dashboards sit close to
+TradingView's 80,000 character limit, and calculate_v27_60percent.py only
+estimates whether a script will fit. This minifier works on Pine tokens
+rather than text:
+
+    comments / blank lines   dropped (the //@version line is kept)
+    layout                   continuation lines joined, one tab per block
+                             level, spaces only where two tokens would merge
+    local identifiers        names the script declares (variables, tuple and
+                             loop variables, functions, parameters) get the
+                             shortest free names, most frequent first
+    repeated strings         a literal that repeats enough to pay for it is
+                             declared once as a global after indicator()
+
+Names after '.', named arguments, type fields, builtins and exported /
+method names are never renamed, and no literal inside indicator(),
+strategy(), library(), input.*(), plot*(), hline(), fill(), bgcolor(),
+barcolor() or alertcondition() is touched - those arguments must stay
+const, and the titles / metadata show up in TradingView exactly as written.
+verify() re-tokenizes the output, undoes the renames and folds and checks
+that the token stream equals the original.
+
+USAGE:
+    python3 -m tvind.pine_minify indicators/strength_within_sectors/strength_within_sectors.pine
+    python3 -m tvind.pine_minify dashboard.pine --output dashboard.min.pine [--spaces] [--no-fold]
+"""
+
+import argparse
+import itertools
+import os
+import re
+import string
+
+PINE_CHAR_LIMIT = 80000
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r]+)
+  | (?P<comment>//.*)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<color>\#[0-9A-Fa-f]{3,8}\b)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>:=|==|!=|<=|>=|=>|\+=|-=|\*=|/=|%=|.)
+""", re.X)
+
+# Two operators written back to back that would read as one (or as a comment)
+_MERGING = {'==', '!=', '<=', '>=', ':=', '=>', '+=', '-=', '*=', '/=', '%=', '//', '++', '--', '/*'}
+
+KEYWORDS = {
+    'and', 'or', 'not', 'if', 'else', 'for', 'to', 'by', 'in', 'while', 'switch', 'break', 'continue',
+    'var', 'varip', 'const', 'simple', 'series', 'import', 'export', 'method', 'type', 'enum', 'as',
+    'true', 'false', 'na', 'int', 'float', 'bool', 'string', 'color', 'line', 'label', 'box', 'table',
+    'linefill', 'polyline', 'array', 'matrix', 'map', 'void',
+}
+# Builtin variables and namespaces; a declared name matching one stays as is
+BUILTINS = {
+    'open', 'high', 'low', 'close', 'volume', 'time', 'time_close', 'time_tradingday', 'timenow',
+    'bar_index', 'last_bar_index', 'last_bar_time', 'hl2', 'hlc3', 'ohlc4', 'hlcc4', 'year', 'month',
+    'weekofyear', 'dayofmonth', 'dayofweek', 'hour', 'minute', 'second', 'syminfo', 'timeframe', 'barstate',
+    'session', 'ta', 'math', 'str', 'request', 'input', 'runtime', 'chart', 'display', 'position', 'size',
+    'shape', 'location', 'plot', 'hline', 'extend', 'xloc', 'yloc', 'text', 'font', 'format', 'currency',
+    'strategy', 'alert', 'log', 'ticker', 'dividends', 'earnings', 'splits', 'adjustment', 'barmerge',
+    'order', 'scale', 'nz', 'fixnan', 'indicator', 'library',
+}
+# Calls whose arguments must stay const (titles, options, plot styles, metadata)
+CONST_CALLS = re.compile(r'^(indicator|strategy|library|input(\..+)?|plot\w*|hline|fill|bgcolor|barcolor'
+                         r'|alertcondition)$')
+_GENERIC_OWNERS = {'array', 'matrix', 'map', 'new'}
+_WORD = {'name', 'number', 'color', 'string'}
+
+# Pine allows 1000 variables per scope; the folded literals are all globals
+MAX_FOLDED = 500
+
+SECTIONS = ['declaration', 'inputs', 'types', 'data tables', 'functions', 'main', 'folded strings']
+
+
+def tokenize(line, lineno=0):
+    """(kind, text) tokens of one physical line, without whitespace; comments kept as 'comment'."""
+    tokens, pos = [], 0
+    while pos < len(line):
+        match = TOKEN_RE.match(line, pos)
+        if match.lastgroup == 'op' and match.group() in '\'"':
+            raise ValueError(f"line {lineno}: unterminated string")
+        if match.lastgroup != 'ws':
+            tokens.append((match.lastgroup, match.group()))
+        pos = match.end()
+    return tokens
+
+
+
+def logical_lines(source):
+    """
+    [{'level', 'tokens', 'chars'}] - physical lines joined into statements.
+    A line continues the previous one inside open brackets or when its
+    indent is not a multiple of 4 (Pine's line wrapping rule); comment and
+    blank lines count towards the chars of the next statement.
+    """
+    out, pending, depth = [], 0, 0
+    for lineno, raw in enumerate(source.split('\n'), 1):
+        body = raw.lstrip(' \t')
+        indent = sum(4 if ch == '\t' else 1 for ch in raw[:len(raw) - len(body)])
+        tokens = [t for t in tokenize(body, lineno) if t[0] != 'comment']
+        pending += len(raw) + 1
+        if not tokens:
+            continue
+        if out and (depth > 0 or indent % 4):
+            out[-1]['tokens'] += tokens
+            out[-1]['chars'] += pending
+        else:
+            out.append({'level': indent // 4, 'tokens': tokens, 'chars': pending})
+        pending = 0
+        for _, text in tokens:
+            if text in ('(', '[', '{'):
+                depth += 1
+            elif text in (')', ']', '}'):
+                depth -= 1
+    if out:
+        out[-1]['chars'] += pending - 1     # no newline after the last line
+    return out
+
+
+def literal_key(text):
+    """One spelling per string value: "abc" and 'abc' fold together (as 'abc')."""
+    if text[0] == '"' and "'" not in text and '\\' not in text:
+        return "'" + text[1:-1] + "'"
+    return text
+
+
+def _depths(tokens):
+    """Bracket depth in front of each token."""
+    out, depth = [], 0
+    for _, text in tokens:
+        if text in (')', ']', '}'):
+            depth -= 1
+        out.append(depth)
+        if text in ('(', '[', '{'):
+            depth += 1
+    return out
+
+
+def _closing(tokens, start):
+    """Index of the bracket closing tokens[start]."""
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i][1] in ('(', '[', '{'):
+            depth += 1
+        elif tokens[i][1] in (')', ']', '}'):
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens)
+
+
+def _const_mask(tokens):
+    """True for each token inside the arguments of a CONST_CALLS call."""
+    mask, stack = [], []
+    for i, (kind, text) in enumerate(tokens):
+        if text in ('(', '[', '{'):
+            callee, j = '', i - 1
+            while text == '(' and j >= 0 and (tokens[j][0] == 'name' or tokens[j][1] == '.'):
+                callee = tokens[j][1] + callee
+                j -= 1
+            stack.append(bool(stack and stack[-1]) or bool(CONST_CALLS.match(callee)))
+        elif text in (')', ']', '}') and stack:
+            stack.pop()
+        mask.append(bool(stack and stack[-1]))
+    return mask
+
+
+def _function_head(tokens):
+    """(name index, open paren index) when the statement defines a function, else None."""
+    i = 0
+    while i < len(tokens) and tokens[i][1] in ('export', 'method'):
+        i += 1
+    if i + 1 < len(tokens) and tokens[i][0] == 'name' and tokens[i + 1][1] == '(':
+        close = _closing(tokens, i + 1)
+        if close + 1 < len(tokens) and tokens[close + 1][1] == '=>':
+            return i, i + 1
+    return None
+
+
+def _type_blocks(lines):
+    """Indices of the statements inside `type` / `enum` blocks (the field lists)."""
+    inside, block_level = set(), None
+    for k, line in enumerate(lines):
+        if block_level is not None and line['level'] > block_level:
+            inside.add(k)
+            continue
+        block_level = None
+        words = [text for _, text in line['tokens'][:2]]
+        if words[0] in ('type', 'enum') or words == ['export', 'type'] or words == ['export', 'enum']:
+            block_level = line['level']
+    return inside
+
+
+def declared_names(lines, fields=()):
+    """
+    Names the script declares itself and may rename: variables (also
+    tuple and loop variables), functions and their parameters. Names that
+    must keep their spelling are left out - member access, named arguments,
+    types and their fields, imports, exported / method names, builtins and
+    anything called that the script does not define.
+    """
+    declared, protected, called, functions = set(), set(KEYWORDS | BUILTINS), set(), set()
+    for k, line in enumerate(lines):
+        tokens = line['tokens']
+        if k in fields or tokens[0][1] == 'import':
+            protected.update(text for kind, text in tokens if kind == 'name')
+            continue
+        depth = _depths(tokens)
+        for i, (kind, text) in enumerate(tokens):
+            if kind != 'name':
+                continue
+            prev = tokens[i - 1][1] if i else ''
+            nxt = tokens[i + 1][1] if i + 1 < len(tokens) else ''
+            if prev in ('.', 'type', 'enum'):
+                protected.add(text)
+            elif nxt == '=' and depth[i] > 0 and prev in ('(', ','):
+                protected.add(text)                 # named argument (or default parameter)
+            elif nxt == '=' and depth[i] == 0:
+                declared.add(text)
+            if nxt == '(':
+                called.add(text)
+        # [a, b] = f()  /  for [i, x] in arr  /  for x in arr
+        start = 1 if tokens[0][1] == 'for' else 0
+        if len(tokens) > start and tokens[start][1] == '[':
+            close = _closing(tokens, start)
+            if start or (close + 1 < len(tokens) and tokens[close + 1][1] == '='):
+                declared.update(text for kind, text in tokens[start + 1:close] if kind == 'name')
+        elif start and len(tokens) > 2 and tokens[1][0] == 'name' and tokens[2][1] == 'in':
+            declared.add(tokens[1][1])
+        head = _function_head(tokens) if line['level'] == 0 else None
+        if head:
+            name, paren = head
+            functions.add(tokens[name][1])
+            if name:                                # export f() / method f(): part of the interface
+                protected.add(tokens[name][1])
+            declared.add(tokens[name][1])
+            close = _closing(tokens, paren)
+            for i in range(paren + 1, close):
+                if tokens[i][0] == 'name' and tokens[i + 1][1] in (',', ')', '=') and depth[i] == 1:
+                    declared.add(tokens[i][1])
+    protected |= called - functions
+    return declared - protected
+
+
+def _fresh_names(taken):
+    """Shortest identifiers first (a..Z, then two characters, ...), skipping taken ones."""
+    rest = string.ascii_letters + string.digits + '_'
+    for size in itertools.count(1):
+        for tail in itertools.product(rest, repeat=size - 1):
+            for head in string.ascii_letters:
+                name = head + ''.join(tail)
+                if name not in taken:
+                    yield name
+
+
+def assign_names(lines, fields=(), rename=True, fold=True):
+    """
+    ({old name: new name}, {literal: global name}). Every new character of a
+    name costs one per use (a folded literal also pays for its declaration),
+    so the most used items get the shortest names; an item only gets one
+    when that makes the script shorter.
+    """
+    taken = {text for line in lines for kind, text in line['tokens'] if kind == 'name'} | KEYWORDS | BUILTINS
+    uses = {}
+    if rename:
+        declared = declared_names(lines, fields)
+        for line in lines:
+            for kind, text in line['tokens']:
+                if kind == 'name' and text in declared:
+                    uses[('name', text)] = uses.get(('name', text), 0) + 1
+    if fold:
+        for k, line in enumerate(lines):
+            if k in fields:
+                continue
+            for (kind, text), const in zip(line['tokens'], _const_mask(line['tokens'])):
+                if kind == 'string' and len(text) > 2 and not const:
+                    key = ('string', literal_key(text))
+                    uses[key] = uses.get(key, 0) + 1
+
+    renamed, folded = {}, {}
+    names = _fresh_names(taken)
+    name = next(names)
+    for (kind, old), n in sorted(uses.items(), key=lambda item: (-item[1], item[0])):
+        if kind == 'name' and len(name) < len(old):
+            renamed[old] = name
+        elif kind == 'string' and n * (len(old) - len(name)) > len(name) + len(old) + 2 \
+                and len(folded) < MAX_FOLDED:
+            folded[old] = name
+        else:
+            continue
+        name = next(names)
+    return renamed, folded
+
+
+def join_tokens(tokens):
+    """Tokens written back with a space only where two of them would otherwise merge."""
+    out, generic, prev = [], 0, None
+    for kind, text in tokens:
+        if prev is not None:
+            pkind, ptext, closes_generic = prev
+            if ((pkind in _WORD and kind in _WORD)
+                    or (pkind == 'op' and kind == 'op' and ptext[-1] + text[0] in _MERGING)
+                    or ((ptext == ']' or closes_generic) and kind == 'name')):
+                out.append(' ')
+        out.append(text)
+        closes = False
+        if text == '<' and prev is not None and prev[1] in _GENERIC_OWNERS:
+            generic += 1
+        elif text == '>' and generic:
+            generic -= 1
+            closes = True
+        prev = (kind, text, closes)
+    return ''.join(out)
+
+
+def statements(lines, fields=()):
+    """[(section, [line indices])] - top-level statements with their blocks, classified for the report."""
+    groups = []
+    for k, line in enumerate(lines):
+        if line['level'] == 0 or not groups:
+            groups.append([k])
+        else:
+            groups[-1].append(k)
+    out = []
+    for group in groups:
+        tokens = [t for k in group for t in lines[k]['tokens']]
+        first = lines[group[0]]['tokens']
+        literal_chars = sum(len(text) for kind, text in tokens if kind == 'string')
+        if first[0][1] in ('indicator', 'strategy', 'library'):
+            section = 'declaration'
+        elif group[0] in fields or any(k in fields for k in group):
+            section = 'types'
+        elif any(text == 'input' and i + 1 < len(tokens) and tokens[i + 1][1] in ('.', '(')
+                 for i, (_, text) in enumerate(tokens)):
+            section = 'inputs'
+        elif literal_chars * 2 > sum(len(text) for _, text in tokens) and literal_chars > 1000:
+            section = 'data tables'
+        elif _function_head(first):
+            section = 'functions'
+        else:
+            section = 'main'
+        out.append((section, group))
+    return out
+
+
+def minify(source, rename=True, fold=True, indent='\t'):
+    """
+    (text, info) - the minified script and {'sections': {section:
+    [statements, original chars, minified chars]}, 'renamed': {old: new},
+    'folded': {literal: name}}.
+    """
+    first = source.split('\n', 1)[0].strip()
+    version = first + '\n' if first.startswith('//@version') else ''
+    lines = logical_lines(source)
+    fields = _type_blocks(lines)
+    renamed, folded = assign_names(lines, fields, rename, fold)
+
+    sections = {s: [0, 0, 0] for s in SECTIONS}
+    out = [version]
+    sections['declaration'][2] += len(version)
+    declarations = ''.join(f'{name}={literal}\n' for literal, name in folded.items())
+    if declarations:
+        sections['folded strings'][0] = len(folded)
+        sections['folded strings'][2] = len(declarations)
+    placed = False
+    for section, group in statements(lines, fields):
+        counts = sections[section]
+        counts[0] += 1
+        for k in group:
+            line = lines[k]
+            rewritten = []
+            for (kind, text), const in zip(line['tokens'], _const_mask(line['tokens'])):
+                if kind == 'name' and text in renamed and not (rewritten and rewritten[-1][1] == '.'):
+                    text = renamed[text]
+                elif kind == 'string' and literal_key(text) in folded and not const and k not in fields:
+                    kind, text = 'name', folded[literal_key(text)]
+                rewritten.append((kind, text))
+            text = indent * line['level'] + join_tokens(rewritten) + '\n'
+            out.append(text)
+            counts[1] += line['chars']
+            counts[2] += len(text)
+        if declarations and not placed and section == 'declaration':
+            out.append(declarations)
+            placed = True
+    if declarations and not placed:
+        out.insert(1, declarations)
+    info = {'sections': {s: v for s, v in sections.items() if any(v)},
+            'renamed': renamed, 'folded': folded}
+    return ''.join(out), info
+
+
+def verify(source, text, info):
+    """
+    Raise ValueError unless `text` tokenizes to the tokens of `source` once
+    the renames are undone and the folded literals put back.
+    """
+    def flat(src):
+        return [t for line in logical_lines(src) for t in line['tokens']]
+
+    original = [(kind, literal_key(word) if kind == 'string' else word) for kind, word in flat(source)]
+    tokens = [(kind, literal_key(word) if kind == 'string' else word) for kind, word in flat(text)]
+    names = {name: literal for literal, name in info['folded'].items()}
+    back = {new: old for old, new in info['renamed'].items()}
+    restored, declared, skip = [], set(), 0
+    for i, (kind, word) in enumerate(tokens):
+        if skip:
+            skip -= 1
+        elif kind == 'name' and word in names and word not in declared and tokens[i + 1:i + 3] == \
+                [('op', '='), ('string', names[word])]:
+            declared.add(word)              # the folded literal's declaration
+            skip = 2
+        elif kind == 'name' and word in names:
+            restored.append(('string', names[word]))
+        elif kind == 'name' and word in back and not (restored and restored[-1][1] == '.'):
+            restored.append(('name', back[word]))
+        else:
+            restored.append((kind, word))
+    if restored != original:
+        at = next((i for i, (a, b) in enumerate(zip(restored, original)) if a != b),
+                  min(len(restored), len(original)))
+        raise ValueError(f"token {at} differs: {restored[at:at + 5]} vs {original[at:at + 5]}")
+
+
+def print_report(info, original_chars, minified_chars, limit=PINE_CHAR_LIMIT):
+    """Per-section character table and the headroom under the TradingView limit."""
+    print(f"{'Section':16} {'Statements':>10} {'Original':>10} {'Minified':>10} {'Saved':>7}")
+    for section, (count, before, after) in info['sections'].items():
+        saved = f"{(before - after) / before * 100:6.1f}%" if before else f"{'-':>7}"
+        print(f"{section:16} {count:10,} {before:10,} {after:10,} {saved}")
+    print(f"{'total':16} {'':10} {original_chars:10,} {minified_chars:10,} "
+          f"{(original_chars - minified_chars) / max(original_chars, 1) * 100:6.1f}%")
+    print(f"Renamed identifiers: {len(info['renamed'])} | Folded string literals: {len(info['folded'])}")
+    status = (f"UNDER by {limit - minified_chars:,}" if minified_chars <= limit
+              else f"OVER by {minified_chars - limit:,}")
+    print(f"TradingView limit ({limit:,}): {minified_chars:,} characters ({status})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify a Pine script and report its size per section")
+    parser.add_argument('script', help="Pine script")
+    parser.add_argument('--output', help="Write the minified script here (default: only report)")
+    parser.add_argument('--no-rename', action='store_true', help="Keep every identifier")
+    parser.add_argument('--no-fold', action='store_true', help="Keep repeated string literals inline")
+    parser.add_argument('--spaces', action='store_true', help="Indent blocks with 4 spaces instead of a tab")
+    parser.add_argument('--show-names', action='store_true', help="List the renames and folded literals")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.script):
+        print(f"Error: {args.script} not found")
+        return
+    with open(args.script, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    try:
+        text, info = minify(source, not args.no_rename, not args.no_fold, '    ' if args.spaces else '\t')
+        verify(source, text, info)
+    except ValueError as e:
+        print(f"Error: {args.script}: {e}")
+        return
+    print(f"{args.script}\n")
+    print_report(info, len(source), len(text))
+    if args.show_names:
+        for old, new in sorted(info['renamed'].items(), key=lambda item: (len(item[1]), item[1])):
+            print(f"  {new:4} <- {old}")
+        for literal, name in info['folded'].items():
+            print(f"  {name:4} <- {literal}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Minified script saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
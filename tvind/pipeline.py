@@ -0,0 +1,369 @@
+"""
+Weekly Pipeline Runner (content-hashed DAG of the repo scripts)
+
+The weekly refresh is a chain of scripts run by hand, each recomputing
+everything:
+
+    exported CSVs -> rs-tables, pv-screener -> watchlist export
+    watchlist.csv -> dashboard
+    saved industry pages -> scrape-industries -> top39 CSV ---------+
+    allocation CSV -> apply_60_percent_to_csv.py (in place) --------+-> v27 estimate, indArr block
+
+Every step declares the files it reads and writes (globs below the repo). A
+step depends on the steps whose outputs match its inputs, so the order comes
+from the files and independent branches run side by side in a thread pool
+(each step is its own `python3 -m tvind <command>` or script process).
+
+A step is skipped when its signature - a BLAKE2 hash over its command and
+the content of every input and output file - equals the one recorded after
+its last successful run. An upstream step that rewrites identical bytes does
+not wake the steps below it. File digests are memoised by (size, mtime) in
+the state file, so an unchanged tree costs a few stats, not a re-read.
+
+At the end the critical path (the chain of steps with the longest summed run
+time) is printed next to the wall time.
+
+Steps can be replaced with a config file in the screener config style, one
+`name = {'run': [...], 'inputs': [...], 'outputs': [...]}` line per step
+('after': [...] adds ordering that the files do not express).
+
+USAGE:
+    python3 -m tvind pipeline                      # run whatever is out of date
+    python3 -m tvind pipeline --dry-run            # show what would run
+    python3 -m tvind pipeline --only dashboard indarr [--force] [--jobs 4]
+    python3 -m tvind pipeline --steps weekly_steps.txt
+"""
+
+import argparse
+import ast
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from tvind import REPO_DIR
+
+STATE_FILE = os.path.join(REPO_DIR, '.tvind_pipeline.json')
+
+_PERF = 'post-processing/perf-screener'
+_PV = 'post-processing/PVscreener'
+_SWS = 'indicators/strength_within_sectors'
+
+STEPS = {
+    'rs-tables': {
+        'run': ['rs-tables'],
+        'inputs': [f'{_PERF}/run_top_losers_gainers_v2.txt', f'{_PERF}/csv/*.csv'],
+        'outputs': [f'{_PERF}/png/*.png'],
+    },
+    'pv-screener': {
+        'run': ['pv-screener'],
+        'inputs': [f'{_PV}/config_pv_screener.txt', f'{_PV}/csv/*.csv'],
+        'outputs': [f'{_PV}/png/*.png', f'{_PV}/png/io-PVscreener_*.txt'],
+    },
+    'watchlist-export': {
+        'run': ['watchlist', '--files', f'{_PV}/png/io-PVscreener_*.txt',
+                '--query', 'PV Breakouts=io-PVscreener_*',
+                '--query', 'PV Breakouts S&P 500=io-PVscreener_* & io-S&P500',
+                '--output', 'watchlists/io-weekly-PV.txt'],
+        'inputs': [f'{_PV}/png/io-PVscreener_*.txt', 'watchlists/TV_downloads/*/*.txt'],
+        'outputs': ['watchlists/io-weekly-PV.txt'],
+    },
+    'dashboard': {
+        'run': ['dashboard', 'indicators/dashboard/watchlist.csv', 'indicators/dashboard/dashboard.pine'],
+        'inputs': ['indicators/dashboard/watchlist.csv'],
+        'outputs': ['indicators/dashboard/dashboard.pine'],
+    },
+    'scrape-industries': {
+        'run': ['scrape-industries'],
+        'inputs': [f'{_SWS}/industries_stocks_market_cap/*.html'],
+        'outputs': [f'{_SWS}/all_industries_top39_by_marketcap.csv'],
+    },
+    'apply-60-percent': {
+        'run': [f'{_SWS}/apply_60_percent_to_csv.py'],
+        'inputs': [f'{_SWS}/all_industries_top39_stock_counts.csv'],
+        'outputs': [f'{_SWS}/all_industries_top39_stock_counts.csv'],
+    },
+    'v27-estimate': {
+        'run': [f'{_SWS}/calculate_v27_60percent.py'],
+        'inputs': [f'{_SWS}/all_industries_top39_stock_counts.csv', f'{_SWS}/all_industries_top39_by_marketcap.csv'],
+        'outputs': [],
+    },
+    'indarr': {
+        'run': ['indarr', '--encoding', 'packed', '--output', f'{_SWS}/indArr_packed.txt'],
+        'inputs': [f'{_SWS}/all_industries_top39_stock_counts.csv', f'{_SWS}/all_industries_top39_by_marketcap.csv'],
+        'outputs': [f'{_SWS}/indArr_packed.txt'],
+    },
+}
+
+
+def parse_steps(path):
+    """`name = {'run': [...], 'inputs': [...], 'outputs': [...]}` lines; '#' lines are skipped."""
+    steps = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            name, _, value = line.partition('=')
+            try:
+                steps[name.strip()] = ast.literal_eval(value.strip())
+            except (ValueError, SyntaxError) as e:
+                print(f"Error parsing step {name.strip()}: {e}")
+    return steps
+
+
+def expand(patterns, root=REPO_DIR):
+    """Existing files matched by repo-relative globs, sorted and de-duplicated."""
+    return sorted({os.path.relpath(p, root) for pattern in patterns
+                   for p in glob.glob(os.path.join(root, pattern), recursive=True) if os.path.isfile(p)})
+
+
+def _overlap(a, b):
+    """True when two glob patterns can name the same file."""
+    return a == b or fnmatch.fnmatchcase(a, b) or fnmatch.fnmatchcase(b, a)
+
+
+def dependencies(steps):
+    """step -> set of upstream steps (outputs feeding its inputs, plus 'after'); self-edges are in-place updates."""
+    deps = {}
+    for name, step in steps.items():
+        deps[name] = {other for other, o in steps.items() if other != name and
+                      any(_overlap(i, out) for i in step.get('inputs', []) for out in o.get('outputs', []))}
+        deps[name] |= set(step.get('after', []))
+    order, seen, visiting = [], set(), set()
+
+    def visit(n):
+        if n in seen:
+            return
+        if n in visiting:
+            raise ValueError(f"dependency cycle through {n!r}")
+        visiting.add(n)
+        for d in sorted(deps[n]):
+            visit(d)
+        visiting.discard(n)
+        seen.add(n)
+        order.append(n)
+
+    for n in steps:
+        visit(n)
+    return deps, order
+
+
+class Hasher:
+    """BLAKE2 file digests memoised by (size, mtime_ns)."""
+
+    def __init__(self, memo=None, rehash=False):
+        self.memo = {} if rehash or memo is None else dict(memo)
+        self.hashed = 0
+
+    def digest(self, rel):
+        st = os.stat(os.path.join(REPO_DIR, rel))
+        known = self.memo.get(rel)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        h = hashlib.blake2b(digest_size=16)
+        with open(os.path.join(REPO_DIR, rel), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        self.hashed += 1
+        self.memo[rel] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return self.memo[rel][2]
+
+    def signature(self, step):
+        h = hashlib.blake2b(json.dumps(step.get('run', [])).encode(), digest_size=16)
+        for kind in ('inputs', 'outputs'):
+            for rel in expand(step.get(kind, [])):
+                h.update(f'{kind}:{rel}:{self.digest(rel)}\n'.encode())
+        return h.hexdigest()
+
+
+def command(step):
+    """argv of a step: a tvind subcommand, or a script path below the repo."""
+    run = list(step['run'])
+    if run[0].endswith('.py'):
+        return [sys.executable, os.path.join(REPO_DIR, run[0])] + run[1:]
+    return [sys.executable, '-m', 'tvind'] + run
+
+
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"Warning: ignoring unreadable state file {path}")
+    return {'steps': {}, 'files': {}}
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _selected(only, deps, order):
+    """The requested steps plus everything upstream of them."""
+    if not only:
+        return list(order)
+    keep, stack = set(), list(only)
+    while stack:
+        n = stack.pop()
+        if n not in keep:
+            keep.add(n)
+            stack.extend(deps[n])
+    return [n for n in order if n in keep]
+
+
+def run_pipeline(steps, only=None, force=False, jobs=4, dry_run=False, rehash=False, verbose=False,
+                 state_file=STATE_FILE):
+    """Run the stale steps in dependency order; returns {step: (status, seconds, start, end)}."""
+    deps, order = dependencies(steps)
+    names = _selected(only, deps, order)
+    state = load_state(state_file)
+    hasher = Hasher(state.get('files'), rehash)
+    t0 = time.perf_counter()
+    results = {}
+
+    def missing(name):
+        """Input patterns that match nothing and that no upstream step produces."""
+        produced = [o for d in deps[name] for o in steps[d].get('outputs', [])]
+        return [p for p in steps[name].get('inputs', [])
+                if not expand([p]) and not any(_overlap(p, o) for o in produced)]
+
+    def decide(name):
+        """'run' / 'skip' / 'missing' / 'blocked' for a step whose upstream steps are finished."""
+        if any(results[d][0] in ('failed', 'blocked') for d in deps[name] if d in results):
+            return 'blocked'
+        if missing(name):
+            return 'missing'
+        if force or not all(expand([p]) for p in steps[name].get('outputs', [])):
+            return 'run'
+        return 'skip' if state['steps'].get(name) == hasher.signature(steps[name]) else 'run'
+
+    def execute(name):
+        start = time.perf_counter() - t0
+        proc = subprocess.run(command(steps[name]), cwd=REPO_DIR, capture_output=True, text=True)
+        end = time.perf_counter() - t0
+        return name, proc, start, end
+
+    if dry_run:
+        would = set()
+        for name in names:
+            status = decide(name)
+            if status == 'skip' and any(d in would for d in deps[name]):
+                status = 'run (upstream)'
+            if status.startswith('run'):
+                would.add(name)
+            results[name] = (status, 0.0, 0.0, 0.0)
+            detail = f"  {missing(name)}" if status == 'missing' else ''
+            print(f"  {name:20} {status}{detail}")
+        return results
+
+    pending = list(names)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for name in list(pending):
+                if any(d in pending or d in running.values() for d in deps[name] if d in names):
+                    continue
+                pending.remove(name)
+                status = decide(name)
+                if status == 'run':
+                    running[pool.submit(execute, name)] = name
+                    print(f"  > {name:20} {' '.join(steps[name]['run'])}")
+                else:
+                    now = time.perf_counter() - t0
+                    results[name] = (status, 0.0, now, now)
+                    detail = f" (no files for {missing(name)})" if status == 'missing' else ''
+                    print(f"  = {name:20} {status}{detail}")
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                _, proc, start, end = future.result()
+                ok = proc.returncode == 0
+                results[name] = ('done' if ok else 'failed', end - start, start, end)
+                print(f"  {'+' if ok else '!'} {name:20} {'done' if ok else f'failed (exit {proc.returncode})'} "
+                      f"in {(end - start) * 1000:.0f} ms")
+                if verbose or not ok:
+                    tail = (proc.stdout + proc.stderr).strip().splitlines()
+                    for line in (tail if verbose else tail[-15:]):
+                        print(f"      {line}")
+                if ok:
+                    state['steps'][name] = hasher.signature(steps[name])
+                else:
+                    state['steps'].pop(name, None)
+            # keep progress even if a later step is interrupted
+            state['files'] = hasher.memo
+            save_state(state, state_file)
+
+    summary(results, deps, time.perf_counter() - t0, hasher.hashed)
+    return results
+
+
+def critical_path(results, deps):
+    """Longest chain of run time through the DAG: (seconds, [steps])."""
+    best = {}
+    for name in results:
+        upstream = [best[d] for d in deps[name] if d in best]
+        length, chain = max(upstream, key=lambda x: x[0]) if upstream else (0.0, [])
+        best[name] = (length + results[name][1], chain + [name])
+    return max(best.values(), key=lambda x: x[0]) if best else (0.0, [])
+
+
+def summary(results, deps, wall, hashed):
+    counts = {}
+    for status, *_ in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    busy = sum(r[1] for r in results.values())
+    length, chain = critical_path(results, deps)
+    print(f"\nSteps: " + ' | '.join(f"{k} {v}" for k, v in sorted(counts.items())) +
+          f" | files hashed: {hashed}")
+    print(f"Wall: {wall * 1000:.0f} ms | step time: {busy * 1000:.0f} ms | "
+          f"critical path: {length * 1000:.0f} ms")
+    if chain and length > 0:
+        print("  " + ' -> '.join(f"{n} ({results[n][1] * 1000:.0f} ms)" for n in chain if results[n][1] > 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the weekly pipeline steps that are out of date")
+    parser.add_argument('--steps', help="Config file of `name = {...}` step lines (default: the built-in steps)")
+    parser.add_argument('--only', nargs='+', help="Run these steps (and what they depend on)")
+    parser.add_argument('--force', action='store_true', help="Run the selected steps even when up to date")
+    parser.add_argument('--jobs', type=int, default=4, help="Steps running at the same time")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would run")
+    parser.add_argument('--rehash', action='store_true', help="Re-read every file instead of trusting (size, mtime)")
+    parser.add_argument('--state', default=STATE_FILE, help="Signature / digest cache file")
+    parser.add_argument('--verbose', action='store_true', help="Print the output of every step")
+    parser.add_argument('--list', action='store_true', help="Show the steps and their dependencies")
+    args = parser.parse_args()
+
+    steps = parse_steps(args.steps) if args.steps else STEPS
+    try:
+        deps, order = dependencies(steps)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    unknown = [n for n in args.only or [] if n not in steps]
+    if unknown:
+        print(f"Error: unknown steps {unknown} (have {list(steps)})")
+        return
+
+    if args.list:
+        for name in order:
+            print(f"  {name:20} <- {', '.join(sorted(deps[name])) or '-'}")
+        return
+
+    print(f"Pipeline: {len(steps)} steps | jobs: {args.jobs}{' | dry run' if args.dry_run else ''}")
+    run_pipeline(steps, args.only, args.force, args.jobs, args.dry_run, args.rehash, args.verbose, args.state)
+
+
+if __name__ == "__main__":
+    main()
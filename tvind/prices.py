@@ -0,0 +1,107 @@
+"""
+Price Panel Loader
+
+Loads daily (or intraday) OHLCV data for many symbols into a panel: a dict of
+wide DataFrames {field: DataFrame(dates x symbols)} so the engines can work on
+whole symbol x date matrices at once.
+
+Supported inputs:
+    - long CSV/Parquet with Date, Symbol, Open, High, Low, Close, Volume columns
+    - wide CSV/Parquet of closes (Date column + one column per symbol)
+    - a directory of per-symbol CSVs (<SYMBOL>.csv, Yahoo Finance layout)
+    - yfinance download (optional dependency, only imported when used)
+"""
+
+import os
+
+import pandas as pd
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _read_table(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _date_column(df):
+    for col in ('Date', 'Datetime', 'date', 'time', 'Time'):
+        if col in df.columns:
+            return col
+    return df.columns[0]
+
+
+def _from_long(df, date_col):
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col])
+    df['Symbol'] = df['Symbol'].astype(str)
+    panel = {}
+    for field in FIELDS:
+        if field in df.columns:
+            panel[field] = df.pivot_table(index=date_col, columns='Symbol', values=field, aggfunc='last').sort_index()
+    return panel
+
+
+def _from_directory(path):
+    frames = []
+    for filename in sorted(os.listdir(path)):
+        if not filename.endswith('.csv'):
+            continue
+        df = pd.read_csv(os.path.join(path, filename))
+        df['Symbol'] = os.path.splitext(filename)[0]
+        frames.append(df)
+    if not frames:
+        raise FileNotFoundError(f"No CSV files in {path}")
+    df = pd.concat(frames, ignore_index=True)
+    return _from_long(df, _date_column(df))
+
+
+def load_panel(path):
+    """Load an OHLCV panel {field: DataFrame(dates x symbols)} from a file or directory."""
+    if os.path.isdir(path):
+        return _from_directory(path)
+
+    df = _read_table(path)
+    date_col = _date_column(df)
+    if 'Symbol' in df.columns:
+        return _from_long(df, date_col)
+
+    # Wide file: one column of closes per symbol
+    closes = df.set_index(date_col)
+    closes.index = pd.to_datetime(closes.index)
+    closes.columns = closes.columns.astype(str)
+    return {'Close': closes.sort_index().apply(pd.to_numeric, errors='coerce')}
+
+
+def download_panel(symbols, start=None, end=None, period='2y', interval='1d'):
+    """Download an OHLCV panel with yfinance (pip install yfinance)."""
+    try:
+        import yfinance as yf
+    except ImportError:
+        raise ImportError("yfinance is required for downloads: pip install yfinance")
+
+    data = yf.download(list(symbols), start=start, end=end, period=None if start else period,
+                       interval=interval, auto_adjust=False, group_by='column', progress=False)
+    panel = {}
+    for field in FIELDS:
+        if field in data.columns.get_level_values(0):
+            frame = data[field]
+            if isinstance(frame, pd.Series):
+                frame = frame.to_frame(symbols[0])
+            panel[field] = frame.sort_index()
+    return panel
+
+
+def align(panel, symbols=None):
+    """Restrict every field to the same dates and (optionally) the given symbols."""
+    index = None
+    for frame in panel.values():
+        index = frame.index if index is None else index.union(frame.index)
+    out = {}
+    for field, frame in panel.items():
+        frame = frame.reindex(index)
+        if symbols is not None:
+            frame = frame.reindex(columns=list(symbols))
+        out[field] = frame
+    return out
@@ -0,0 +1,207 @@
+"""
+PV Breakout / Gap Engine (Python version of s-PVGapEarnings.pine)
+
+Computes the price/volume breakouts and opening gaps of the s-PV Gap Screener
+for every symbol and every bar of a daily OHLCV panel at once:
+
+    Long PV    close > highest(high, 60)[1] and volume > highest(volume, 60)[1]
+               and close > sma(close, 200)       strength = (close - hh) / hh * 100
+    Short PV   close < lowest(low, 60)[1]   and volume > highest(volume, 60)[1]
+               and close < sma(close, 200)       strength = (ll - close) / ll * 100
+    Gap %      (open - close[1]) / close[1] * 100
+
+The Pine script re-evaluates these inside a `for i = 0 to lookback` loop on
+every bar; here each condition is one rolling window over the (dates x
+symbols) arrays, and "days ago" is an argmax over the reversed lookback
+window. screen() returns the same columns the screener exports, so the
+post-processing renderers and alert/backtest engines can share one source.
+
+USAGE:
+    python3 -m tvind.pv_gap --prices daily.csv [--gap-threshold-1 5 --gap-threshold-2 10] [--output pv_gap.csv]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+
+DEFAULTS = {
+    'price_period': 60,
+    'volume_period': 60,
+    'sma_length': 200,
+    'pv_lookback': 100,
+    'pv_direction': 'Both',
+    'gap_threshold_1': 5.0,
+    'gap_threshold_2': 10.0,
+    'gap_direction': 'Both',
+    'gap_lookback': 100,
+}
+
+COLUMNS = ['PV Breakout Flag', 'PV Days Ago', 'PV Breakout Date', 'PV Strength %', 'PV Type',
+           'Volume Ratio', 'Price vs SMA %',
+           'Gap1 Flag', 'Gap1 Days Ago', 'Gap1 Date', 'Gap1 Size %', 'Gap1 Direction',
+           'Gap2 Flag', 'Gap2 Days Ago', 'Gap2 Date', 'Gap2 Size %', 'Gap2 Direction',
+           'Any Signal', 'Combined Score']
+
+
+def _rolling(a, window, how):
+    """ta.highest / ta.lowest / ta.sma down axis 0 (NaN until the window is full)."""
+    frame = pd.DataFrame(a).rolling(window, min_periods=window)
+    return getattr(frame, how)().to_numpy()
+
+
+def _prev(a):
+    out = np.full_like(a, np.nan)
+    out[1:] = a[:-1]
+    return out
+
+
+def gap_pct(o, c):
+    """Opening gap of every bar in % of the previous close."""
+    c1 = _prev(c)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (o - c1) / c1 * 100
+
+
+def events(o, h, l, c, v, price_period=60, volume_period=60, sma_length=200):
+    """
+    Per-bar (dates x symbols) arrays: 'Long'/'Short' breakout masks with their
+    strength, 'Gap %', 'Volume Ratio' and 'Price vs SMA %'.
+    """
+    hh = _prev(_rolling(h, price_period, 'max'))
+    ll = _prev(_rolling(l, price_period, 'min'))
+    hv = _prev(_rolling(v, volume_period, 'max'))
+    sma = _rolling(c, sma_length, 'mean')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volume_ok = v > hv
+        long_ = (c > hh) & volume_ok & (c > sma)
+        short = (c < ll) & volume_ok & (c < sma)
+        return {
+            'Long': long_,
+            'Short': short,
+            'Long Strength %': (c - hh) / hh * 100,
+            'Short Strength %': (ll - c) / ll * 100,
+            'Gap %': gap_pct(o, c),
+            'Volume Ratio': v / _rolling(v, volume_period, 'mean'),
+            'Price vs SMA %': (c - sma) / sma * 100,
+        }
+
+
+def days_ago(mask, first, last, bar=-1):
+    """
+    Pine `for i = first to last: if mask[i] -> found` for one bar: the smallest
+    i with mask set (NaN if none) as a float vector over symbols.
+    """
+    n = len(mask)
+    bar = bar % n
+    lo = max(bar - last, 0)
+    window = mask[lo:bar - first + 1][::-1] if bar - first >= 0 else mask[:0]
+    if len(window) == 0:
+        return np.full(mask.shape[1], np.nan)
+    found = window.any(axis=0)
+    return np.where(found, window.argmax(axis=0) + first, np.nan)
+
+
+def _pick(values, ago, bar):
+    """values[bar - ago] per symbol, NaN where ago is NaN."""
+    ok = ~np.isnan(ago)
+    rows = np.where(ok, bar - np.nan_to_num(ago).astype(np.int64), 0)
+    return np.where(ok, values[rows, np.arange(values.shape[1])], np.nan)
+
+
+def yyyymmdd(dates):
+    dates = pd.DatetimeIndex(dates)
+    return (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(dtype=np.float64)
+
+
+def screen(panel, symbols=None, bar=-1, **params):
+    """The s-PVGapEarnings export (Symbol x COLUMNS) for one bar, default the latest."""
+    p = {**DEFAULTS, **params}
+    fields = [panel[f].reindex(columns=symbols) if symbols is not None else panel[f]
+              for f in ('Open', 'High', 'Low', 'Close', 'Volume')]
+    index = fields[3].index
+    o, h, l, c, v = (f.to_numpy(dtype=np.float64) for f in fields)
+    bar = bar % len(index)
+
+    ev = events(o, h, l, c, v, p['price_period'], p['volume_period'], p['sma_length'])
+    dates = yyyymmdd(index)[:, None].repeat(c.shape[1], axis=1)
+    out = pd.DataFrame(index=pd.Index(fields[3].columns, name='Symbol'))
+
+    nan = np.full(c.shape[1], np.nan)
+    long_ago = days_ago(ev['Long'], 0, p['pv_lookback'] - 1, bar) \
+        if p['pv_direction'] in ('Long Only', 'Both') else nan
+    short_ago = days_ago(ev['Short'], 0, p['pv_lookback'] - 1, bar) \
+        if p['pv_direction'] in ('Short Only', 'Both') else nan
+    # Pine: the long breakout wins only when it is strictly more recent
+    use_long = ~np.isnan(long_ago) & (np.isnan(short_ago) | (long_ago < short_ago))
+    pv_ago = np.where(use_long, long_ago, short_ago)
+    pv_flag = ~np.isnan(pv_ago)
+
+    out['PV Breakout Flag'] = pv_flag.astype(np.float64)
+    out['PV Days Ago'] = pv_ago
+    out['PV Breakout Date'] = _pick(dates, pv_ago, bar)
+    out['PV Strength %'] = np.where(use_long, _pick(ev['Long Strength %'], long_ago, bar),
+                                    _pick(ev['Short Strength %'], short_ago, bar))
+    out['PV Type'] = np.where(use_long, 1.0, np.where(pv_flag, -1.0, 0.0))
+    out['Volume Ratio'] = ev['Volume Ratio'][bar]
+    out['Price vs SMA %'] = ev['Price vs SMA %'][bar]
+
+    gap = ev['Gap %']
+    direction = {'Both': np.ones_like(gap, dtype=bool), 'Up Only': gap > 0,
+                 'Down Only': gap < 0}[p['gap_direction']]
+    flags = [pv_flag]
+    for k in (1, 2):
+        with np.errstate(invalid='ignore'):
+            mask = (np.abs(gap) >= p[f'gap_threshold_{k}']) & direction
+        ago = days_ago(mask, 1, p['gap_lookback'], bar)
+        size = _pick(gap, ago, bar)
+        out[f'Gap{k} Flag'] = (~np.isnan(ago)).astype(np.float64)
+        out[f'Gap{k} Days Ago'] = ago
+        out[f'Gap{k} Date'] = _pick(dates, ago, bar)
+        out[f'Gap{k} Size %'] = size
+        out[f'Gap{k} Direction'] = np.where(np.isnan(size), np.nan, np.where(size > 0, 1.0, -1.0))
+        flags.append(~np.isnan(ago))
+
+    out['Any Signal'] = np.logical_or.reduce(flags).astype(np.float64)
+    out['Combined Score'] = flags[0] * 30.0 + flags[1] * 20.0 + flags[2] * 30.0
+    return out[COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="s-PV Gap Screener columns for every symbol in one pass")
+    parser.add_argument('--prices', required=True, help="Daily OHLCV file or directory (see tvind.prices)")
+    parser.add_argument('--price-period', type=int, default=DEFAULTS['price_period'])
+    parser.add_argument('--volume-period', type=int, default=DEFAULTS['volume_period'])
+    parser.add_argument('--sma-length', type=int, default=DEFAULTS['sma_length'])
+    parser.add_argument('--pv-lookback', type=int, default=DEFAULTS['pv_lookback'])
+    parser.add_argument('--pv-direction', choices=['Long Only', 'Short Only', 'Both'], default='Both')
+    parser.add_argument('--gap-threshold-1', type=float, default=DEFAULTS['gap_threshold_1'])
+    parser.add_argument('--gap-threshold-2', type=float, default=DEFAULTS['gap_threshold_2'])
+    parser.add_argument('--gap-direction', choices=['Up Only', 'Down Only', 'Both'], default='Both')
+    parser.add_argument('--gap-lookback', type=int, default=DEFAULTS['gap_lookback'])
+    parser.add_argument('--output', help="Write the screener table to this CSV")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in DEFAULTS}
+    panel = load_panel(args.prices)
+
+    start = time.perf_counter()
+    table = screen(panel, **params)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Symbols: {len(table)} | Bars: {len(panel['Close'])} | Signals: {int(table['Any Signal'].sum())} | {elapsed:.1f} ms")
+
+    table = table.sort_values('Combined Score', ascending=False, kind='stable')
+    if args.output:
+        table.to_csv(args.output, float_format='%.4f')
+        print(f"Table saved to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(table.round(2).head(50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+Inbound Webhook Receiver (records the TradingView alerts of webhook/)
+
+The alerts in webhook/json_webhook and webhook/list_alerts post straight to
+Discord and nothing is kept. This receiver sits in between: TradingView posts
+to it, every payload is validated, queued in memory and written to an
+append-only columnar log, then fanned out to the downstream sinks.
+
+    POST /webhook   {"content": "🚨 **{{ticker}}** Alert!\\nPrice: {{close}}\\nTime: {{time}}\\nCondition: {{plot_0}}"}
+                    or the fields directly: {"ticker": ..., "close": ..., "time": ..., "plot_0": ...}
+    GET  /health    counters as JSON
+
+Payloads are parsed into Ticker / Close / Time / Condition; bodies that are
+not JSON, have no ticker or still contain unexpanded {{placeholders}} get a
+400. Accepted alerts are answered 202 as soon as they are queued, and a
+flusher task drains the queue in micro-batches (up to --batch-size alerts or
+--flush-ms, whichever comes first) into an Arrow IPC stream, one file per
+session, read back with read_log().
+
+Backpressure: the queue is bounded. When it is full the handler waits up to
+--put-timeout for room before answering 503 + Retry-After, so a burst at the
+open slows the senders down instead of losing alerts. Each sink (Discord,
+JSON lines file) has its own backlog and worker, so a rate-limited Discord
+webhook never stalls the log: batches logged while the sink is busy are
+merged into its backlog (nothing is dropped) and sent --sink-batch alerts at
+a time once it catches up. Bodies over MAX_BODY, with Content-Length or
+chunked, get a 413.
+
+USAGE:
+    python3 -m tvind.receiver --log-dir alerts_log [--port 8788] [--discord URL] [--jsonl alerts.jsonl]
+    python3 -m tvind.receiver --read alerts_log             # print the recorded alerts
+    python3 -m tvind.receiver --bench 20000 [--bench-connections 16]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import signal
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from tvind.webhooks import BodyTooLarge, WebhookClient, format_response, pack_messages, read_body, read_head
+
+DEFAULT_PORT = 8788
+MAX_BODY = 64 * 1024
+
+SCHEMA = pa.schema([
+    ('Received', pa.timestamp('ns', tz='UTC')),
+    ('Ticker', pa.string()),
+    ('Close', pa.float64()),
+    ('Time', pa.string()),
+    ('Condition', pa.string()),
+    ('Content', pa.string()),
+])
+
+_TICKER = re.compile(r'\*\*([^*\s]+)\*\*')
+_BARE_TICKER = re.compile(r'\b([A-Z][A-Z0-9._!]*(?::[A-Z0-9._!]+)?)\b')
+_FIELDS = {name: re.compile(rf'^{label}:\s*(.+)$', re.MULTILINE)
+           for name, label in (('close', 'Price'), ('time', 'Time'), ('condition', 'Condition'))}
+
+
+def _to_float(value):
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_alert(body):
+    """
+    Validated record dict from one request body, or raises ValueError.
+    Accepts the Discord-style {"content": ...} messages and the raw fields.
+    """
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, ValueError):
+        raise ValueError("body is not JSON")
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be a JSON object")
+
+    content = payload.get('content')
+    if content is not None and not isinstance(content, str):
+        raise ValueError("'content' must be a string")
+    text = content or ''
+    if '{{' in text or any('{{' in str(v) for v in payload.values()):
+        raise ValueError("unexpanded {{placeholder}} in payload")
+
+    ticker = payload.get('ticker')
+    if ticker is None and text:
+        match = _TICKER.search(text) or _BARE_TICKER.search(text)
+        ticker = match.group(1) if match else None
+    if not ticker:
+        raise ValueError("no ticker in payload")
+
+    fields = {name: (m.group(1).strip() if (m := regex.search(text)) else None)
+              for name, regex in _FIELDS.items()}
+    condition = payload.get('plot_0', payload.get('condition', fields['condition']))
+    if condition is None and text:
+        # list_alerts style: '🔴 AAPL OVERBOUGHT at RSI 72.1' - the message is the condition
+        condition = text
+    return {
+        'Ticker': str(ticker),
+        'Close': _to_float(payload.get('close', fields['close'])),
+        'Time': str(payload.get('time', fields['time']) or ''),
+        'Condition': '' if condition is None else str(condition),
+        'Content': text,
+    }
+
+
+def message(record):
+    """webhook/json_webhook text for a record (its own content when it came as a message)."""
+    if record['Content']:
+        return record['Content']
+    return (f"🚨 **{record['Ticker']}** Alert!\nPrice: {record['Close']}\n"
+            f"Time: {record['Time']}\nCondition: {record['Condition']}")
+
+
+class ArrowLog:
+    """Append-only Arrow IPC stream, one file per receiver session."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(directory, f'alerts_{stamp}_{os.getpid()}.arrows')
+        self._sink = pa.OSFile(self.path, 'wb')
+        self._writer = pa.ipc.new_stream(self._sink, SCHEMA)
+
+    def write(self, records, received):
+        columns = {name: [r[name] for r in records] for name in SCHEMA.names if name != 'Received'}
+        batch = pa.record_batch([pa.array(received, SCHEMA.field('Received').type)] +
+                                [pa.array(columns[name], SCHEMA.field(name).type) for name in SCHEMA.names[1:]],
+                                schema=SCHEMA)
+        self._writer.write_batch(batch)
+        self._sink.flush()
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+def read_log(directory):
+    """All recorded alerts of every session as one DataFrame (a truncated last batch is skipped)."""
+    tables = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.arrows'))):
+        with pa.OSFile(path, 'rb') as f:
+            try:
+                reader = pa.ipc.open_stream(f)
+            except pa.ArrowInvalid:
+                continue
+            batches = []
+            try:
+                for batch in reader:
+                    batches.append(batch)
+            except (pa.ArrowInvalid, OSError):
+                print(f"Warning: {path} ends in a partial batch (receiver was killed), skipped it")
+            tables.append(pa.Table.from_batches(batches, schema=SCHEMA))
+    if not tables:
+        return pd.DataFrame(columns=SCHEMA.names)
+    return pa.concat_tables(tables).to_pandas()
+
+
+class JsonlSink:
+    """Append every alert to a JSON lines file."""
+
+    name = 'jsonl'
+
+    def __init__(self, path):
+        self.path = path
+
+    async def write(self, records):
+        lines = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in records)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    async def close(self):
+        pass
+
+
+class DiscordSink:
+    """Forward alerts to a Discord webhook, packed into as few messages as Discord allows."""
+
+    name = 'discord'
+
+    def __init__(self, url, connections=2, per_payload=10):
+        self.client = WebhookClient(url, connections)
+        self.per_payload = per_payload
+
+    async def write(self, records):
+        packed = pack_messages([message(r) for r in records], per_payload=self.per_payload)
+        await self.client.post_many([payload for payload, _ in packed])
+
+    async def close(self):
+        await self.client.close()
+
+
+class SinkBacklog:
+    """Alerts logged but not yet written to one sink; batches arriving while it is busy are merged, not dropped."""
+
+    def __init__(self, max_batch=1000):
+        self.max_batch = max_batch
+        self.records = []
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def add(self, records):
+        self.records.extend(records)
+        self.ready.set()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    async def take(self):
+        """Up to max_batch waiting alerts (None once closed and empty)."""
+        await self.ready.wait()
+        batch, self.records = self.records[:self.max_batch], self.records[self.max_batch:]
+        if not self.records and not self.closed:
+            self.ready.clear()
+        return batch or None
+
+
+class Receiver:
+    """HTTP handler, bounded alert queue, micro-batch flusher and per-sink fan-out workers."""
+
+    def __init__(self, log_dir, sinks=(), queue_size=10000, batch_size=500, flush_interval=0.25,
+                 put_timeout=2.0, sink_batch=1000):
+        self.log = ArrowLog(log_dir)
+        self.queue = asyncio.Queue(queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.sinks = [(sink, SinkBacklog(sink_batch)) for sink in sinks]
+        self.stats = {'accepted': 0, 'rejected': 0, 'busy': 0, 'too_large': 0, 'logged': 0, 'batches': 0,
+                      'max_queue': 0, 'max_sink_backlog': 0, 'sink_errors': 0}
+        self._tasks = []
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await read_head(reader)
+                if head is None:
+                    break
+                start_line, headers = head
+                method, _, rest = start_line.partition(' ')
+                path = rest.split(' ')[0]
+                try:
+                    if int(headers.get('content-length', 0) or 0) > MAX_BODY:
+                        raise BodyTooLarge
+                    body = await read_body(reader, headers, limit=MAX_BODY)
+                except BodyTooLarge:
+                    self.stats['too_large'] += 1
+                    writer.write(format_response(413, headers={'Connection': 'close'}))
+                    await writer.drain()
+                    break
+                writer.write(await self._route(method, path, body))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path.startswith('/health'):
+            stats = {**self.stats, 'queued': self.queue.qsize()}
+            return format_response(200, json.dumps(stats).encode(), {'Content-Type': 'application/json'})
+        if method != 'POST':
+            return format_response(405)
+        try:
+            record = parse_alert(body)
+        except ValueError as e:
+            self.stats['rejected'] += 1
+            return format_response(400, json.dumps({'error': str(e)}).encode(), {'Content-Type': 'application/json'})
+
+        item = (time.time_ns(), record)
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Backpressure: hold this sender until the flusher makes room
+            try:
+                await asyncio.wait_for(self.queue.put(item), self.put_timeout)
+            except asyncio.TimeoutError:
+                self.stats['busy'] += 1
+                return format_response(503, headers={'Retry-After': '1'})
+        self.stats['accepted'] += 1
+        self.stats['max_queue'] = max(self.stats['max_queue'], self.queue.qsize())
+        return format_response(202)
+
+    async def _next_batch(self):
+        """Block for the first alert, then take more until batch_size or flush_interval."""
+        loop = asyncio.get_running_loop()
+        first = await self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                # Stop marker: flush what we have, then stop on the next call
+                self.queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    async def _flusher(self):
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                break
+            received = [t for t, _ in batch]
+            records = [r for _, r in batch]
+            await asyncio.to_thread(self.log.write, records, received)
+            self.stats['logged'] += len(records)
+            self.stats['batches'] += 1
+            for sink, backlog in self.sinks:
+                backlog.add(records)
+                self.stats['max_sink_backlog'] = max(self.stats['max_sink_backlog'], len(backlog.records))
+        for _, backlog in self.sinks:
+            backlog.close()
+
+    async def _sink_worker(self, sink, backlog):
+        while True:
+            records = await backlog.take()
+            if records is None:
+                break
+            try:
+                await sink.write(records)
+            except Exception as e:
+                self.stats['sink_errors'] += 1
+                print(f"Warning: sink {sink.name} failed: {e}")
+        await sink.close()
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self._tasks = [asyncio.create_task(self._flusher())]
+        self._tasks += [asyncio.create_task(self._sink_worker(s, q)) for s, q in self.sinks]
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def stop(self):
+        """Stop accepting, flush everything queued, let the sinks finish, close the log."""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.queue.put(None)
+        await asyncio.gather(*self._tasks)
+        self.log.close()
+
+
+async def run(args):
+    sinks = []
+    if args.discord:
+        sinks.append(DiscordSink(args.discord))
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    receiver = Receiver(args.log_dir, sinks, args.queue_size, args.batch_size, args.flush_ms / 1000,
+                        args.put_timeout, args.sink_batch)
+    await receiver.start(args.host, args.port)
+    print(f"Receiving on http://{args.host}:{receiver.port}/webhook -> {receiver.log.path} (Ctrl+C to stop)")
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await receiver.stop()
+        print(json.dumps(receiver.stats))
+
+
+async def bench(args):
+    """Fire args.bench alerts at an in-process receiver over keep-alive connections and time it."""
+    log_dir = args.log_dir if args.log_dir != 'alerts_log' else tempfile.mkdtemp(prefix='alerts_bench_')
+    receiver = Receiver(log_dir, [], args.queue_size, args.batch_size, args.flush_ms / 1000, args.put_timeout)
+    await receiver.start('127.0.0.1', 0)
+    tickers = [f'SYM{i % 500}' for i in range(args.bench)]
+    payloads = [{'content': f"🚨 **{t}** Alert!\nPrice: {100 + i % 50:.2f}\nTime: 2026-01-02T14:30:00Z\n"
+                            f"Condition: {i % 3}"} for i, t in enumerate(tickers)]
+
+    start = time.perf_counter()
+    async with WebhookClient(f'http://127.0.0.1:{receiver.port}/webhook', args.bench_connections) as client:
+        statuses = await client.post_many(payloads)
+    sent = time.perf_counter() - start
+    await receiver.stop()
+    total = time.perf_counter() - start
+
+    logged = len(read_log(log_dir))
+    accepted = sum(s == 202 for s in statuses)
+    stats = receiver.stats
+    print(f"Alerts: {args.bench} over {args.bench_connections} connections | Accepted: {accepted} | "
+          f"Busy (503): {stats['busy']} | Logged: {logged}")
+    print(f"Send: {sent * 1000:.0f} ms ({args.bench / sent:,.0f} alerts/s) | Drained + flushed: {total * 1000:.0f} ms")
+    print(f"Batches: {stats['batches']} (avg {stats['logged'] / max(stats['batches'], 1):.0f}) | "
+          f"Max queue: {stats['max_queue']} | Log: {log_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive TradingView webhook alerts, log them and fan them out")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--log-dir', default='alerts_log', help="Directory of the append-only alert log")
+    parser.add_argument('--discord', default=os.environ.get('DISCORD_WEBHOOK_URL'),
+                        help="Forward alerts to this Discord webhook (default: $DISCORD_WEBHOOK_URL)")
+    parser.add_argument('--jsonl', help="Also append alerts to this JSON lines file")
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=500, help="Max alerts per log flush")
+    parser.add_argument('--flush-ms', type=float, default=250, help="Max wait before a partial flush")
+    parser.add_argument('--put-timeout', type=float, default=2.0, help="Seconds a sender waits on a full queue")
+    parser.add_argument('--sink-batch', type=int, default=1000, help="Max alerts per sink write when it catches up")
+    parser.add_argument('--read', metavar='LOG_DIR', help="Print the alerts recorded in LOG_DIR and exit")
+    parser.add_argument('--bench', type=int, metavar='N', help="Benchmark: send N alerts to an in-process receiver")
+    parser.add_argument('--bench-connections', type=int, default=16)
+    args = parser.parse_args()
+
+    if args.read:
+        log = read_log(args.read)
+        print(f"Alerts: {len(log)} | Tickers: {log['Ticker'].nunique()}")
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(log.drop(columns='Content').tail(50))
+        return
+    if args.bench:
+        asyncio.run(bench(args))
+        return
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+RS Rotation Backtester (top-N by the perf screener's ranking columns)
+
+generate_rs_tables.py sorts the perf export by 'Rel Return 1M %' and shows the
+top and bottom 20. The strategy that implies - hold the top N by relative
+return or RS and rotate every week - is tested here over a daily price panel.
+The ranking columns are recomputed for every date exactly as the screeners
+define them:
+
+    '<P> Return %'        close / close[anchor] - 1           (tvind.periods anchors)
+    'Rel Return <P> %'    the same on close / benchmark close
+    'RS <P>'              _calc_rs_rating: (ratio - lowest) / (highest - lowest) * 98 + 1
+                          over the period's bars (N-bar periods only)
+    'RS Rank'             IBD-style weighted score of tvind.rs_ranks
+
+Several columns are combined by averaging their cross-sectional percentile
+ranks. On every rebalance date (last bar of each week / month / quarter, or
+every N bars) the top N get equal weights at the close; between rebalances
+the holdings drift with their prices. Everything is array math over the
+(dates x symbols) matrices:
+
+    G          cumulative growth of every symbol (cumprod of 1 + daily return)
+    holding    G[t] / G[last rebalance] per held symbol -> drifted weights
+    turnover   sum |new weights - drifted weights| at each rebalance, charged at cost_bps
+
+SPY and VBINX - the benchmarks of the two perf screeners - are held buy and
+hold over the same dates for comparison.
+
+USAGE:
+    python3 -m tvind.rotation --prices daily.parquet --rank 'Rel Return 1M %' --top 20 --rebalance W
+    python3 -m tvind.rotation --prices daily.parquet --rank 'RS 3M' 'RS 6M' --top 10 --rebalance M --cost-bps 5 --output equity.csv
+"""
+
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.periods import CALENDAR, LOOKBACKS, Anchors, gather_returns
+from tvind.prices import load_panel
+from tvind.rs_ranks import ibd_scores, percentile_ranks
+
+BENCHMARKS = ['SPY', 'VBINX']
+FREQUENCIES = {'W': 'W-FRI', 'M': 'M', 'Q': 'Q'}
+TRADING_DAYS = 252
+
+_RETURN_RE = re.compile(r'^(?P<period>\S+) Return %$')
+_REL_RE = re.compile(r'^Rel Return (?P<period>\S+) %$')
+_RS_RE = re.compile(r'^RS (?P<period>\S+)$')
+
+
+def _period(name, period, calendar=True):
+    if period in LOOKBACKS or (calendar and period in CALENDAR):
+        return period
+    allowed = list(LOOKBACKS) + (list(CALENDAR) if calendar else [])
+    raise KeyError(f"unknown period in {name!r} (use {allowed})")
+
+
+def rs_rating(ratio, length):
+    """Pine _calc_rs_rating on a (dates x symbols) ratio: 1..99 within its own length-bar range."""
+    frame = pd.DataFrame(ratio)
+    high = frame.rolling(length, min_periods=length).max().to_numpy()
+    low = frame.rolling(length, min_periods=length).min().to_numpy()
+    span = high - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(span > 0, 98 * (ratio - low) / span + 1, np.nan)
+
+
+def signal(closes, name, relative_to=None):
+    """(dates x symbols) values of one ranking column for every date."""
+    C = closes.to_numpy(dtype=np.float64)
+    if name == 'RS Rank':
+        return ibd_scores(closes)[0]
+    match = _REL_RE.match(name) or _RS_RE.match(name)
+    if match:
+        if relative_to is None:
+            raise KeyError(f"{name!r} needs a benchmark (--relative-to)")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = C / closes[relative_to].to_numpy(dtype=np.float64)[:, None]
+        if name.startswith('RS '):
+            return rs_rating(ratio, LOOKBACKS[_period(name, match.group('period'), calendar=False)])
+        period = _period(name, match.group('period'))
+        return gather_returns(ratio, Anchors.for_index(closes.index, [period]))[0]
+    match = _RETURN_RE.match(name)
+    if match:
+        period = _period(name, match.group('period'))
+        return gather_returns(C, Anchors.for_index(closes.index, [period]))[0]
+    raise KeyError(f"unknown ranking column {name!r}")
+
+
+def combined_score(closes, columns, relative_to=None):
+    """One column as is; several as the mean of their row-wise percentile ranks (NaN if any is missing)."""
+    if len(columns) == 1:
+        return signal(closes, columns[0], relative_to)
+    return np.mean([percentile_ranks(signal(closes, c, relative_to)) for c in columns], axis=0)
+
+
+def rebalance_rows(index, every='W'):
+    """Row positions of the rebalance dates: last bar of each W/M/Q period, or every N bars."""
+    n = len(index)
+    if str(every).isdigit():
+        return np.arange(int(every) - 1, n, int(every))
+    labels = pd.DatetimeIndex(index).to_period(FREQUENCIES[every]).asi8
+    return np.flatnonzero(np.r_[labels[1:] != labels[:-1], True])
+
+
+def target_weights(scores, top):
+    """(rebalances x symbols) equal weights on the top N finite scores of each row."""
+    finite = np.isfinite(scores)
+    order = np.argsort(np.where(finite, -scores, np.inf), axis=1, kind='stable')[:, :top]
+    picked = np.take_along_axis(finite, order, axis=1)
+    counts = picked.sum(axis=1, keepdims=True)
+    weights = np.zeros(scores.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.put_along_axis(weights, order, np.where(picked, 1.0 / counts, 0.0), axis=1)
+    return weights
+
+
+def backtest(C, scores, rows, top=20, cost_bps=10.0, eligible=None):
+    """
+    Daily strategy returns (trading at the rebalance closes), with the target
+    weights, one-way turnover and cost per rebalance.
+    C: (dates x symbols) closes, scores: same shape, rows: rebalance rows.
+    """
+    n = len(C)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily = C[1:] / C[:-1] - 1
+    growth = np.cumprod(1 + np.nan_to_num(np.vstack([np.zeros(C.shape[1]), daily]),
+                                          nan=0.0, posinf=0.0, neginf=0.0), axis=0)
+
+    ranked = scores[rows]
+    if eligible is not None:
+        ranked = np.where(eligible, ranked, np.nan)
+    weights = target_weights(ranked, top)
+
+    # Weights just before each trade: the previous targets after drifting until this close
+    drift = np.zeros_like(weights)
+    drift[1:] = weights[:-1] * growth[rows[1:]] / growth[rows[:-1]]
+    total = drift.sum(axis=1, keepdims=True)
+    drift = np.divide(drift, total, out=np.zeros_like(drift), where=total > 0)
+    turnover = np.abs(weights - drift).sum(axis=1) / 2
+    costs = 2 * turnover * cost_bps / 1e4
+
+    # Day d is held with the targets of the last rebalance strictly before d
+    segment = np.searchsorted(rows, np.arange(n), side='left') - 1
+    held = segment >= 0
+    k = np.maximum(segment, 0)
+    anchor = growth[rows[k]]
+    w = weights[k]
+    now = (w * growth / anchor).sum(axis=1)
+    before = (w * np.vstack([growth[:1], growth[:-1]]) / anchor).sum(axis=1)
+    returns = np.where(held & (before > 0), now / np.where(before > 0, before, 1) - 1, 0.0)
+
+    trade_cost = np.zeros(n)
+    trade_cost[rows] = costs
+    returns = (1 + returns) * (1 - trade_cost) - 1
+    return returns, weights, turnover, costs
+
+
+def stats(returns, periods_per_year=TRADING_DAYS):
+    """Total / CAGR / volatility / Sharpe (rf 0) / max drawdown of a daily return series."""
+    returns = np.asarray(returns, dtype=np.float64)
+    equity = np.cumprod(1 + returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    years = len(returns) / periods_per_year
+    vol = returns.std(ddof=1) * np.sqrt(periods_per_year) if len(returns) > 1 else np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cagr = equity[-1] ** (1 / years) - 1 if years > 0 else np.nan
+        sharpe = returns.mean() * periods_per_year / vol if vol else np.nan
+    return {
+        'Total %': (equity[-1] - 1) * 100,
+        'CAGR %': cagr * 100,
+        'Vol %': vol * 100,
+        'Sharpe': sharpe,
+        'Max DD %': drawdown.min() * 100,
+        'Calmar': cagr / -drawdown.min() if drawdown.min() < 0 else np.nan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-N rotation by perf screener ranking columns vs SPY and VBINX")
+    parser.add_argument('--prices', required=True, help="Daily price file or directory (see tvind.prices)")
+    parser.add_argument('--rank', nargs='+', default=['Rel Return 1M %'],
+                        help="Ranking columns, e.g. 'Rel Return 1M %%' 'RS 3M' 'RS Rank' '6M Return %%'")
+    parser.add_argument('--top', type=int, default=20, help="Symbols held")
+    parser.add_argument('--rebalance', default='W', help="W, M, Q or a number of bars")
+    parser.add_argument('--cost-bps', type=float, default=10.0, help="Cost per side in basis points of the traded value")
+    parser.add_argument('--relative-to', default='SPY', help="Benchmark of the Rel Return / RS columns")
+    parser.add_argument('--benchmarks', nargs='+', default=BENCHMARKS, help="Buy-and-hold comparisons")
+    parser.add_argument('--exclude', nargs='*', help="Symbols never held (default: the benchmarks)")
+    parser.add_argument('--start', help="First rebalance on or after this date")
+    parser.add_argument('--end', help="Last date of the test")
+    parser.add_argument('--output', help="Write the daily equity curves and drawdowns to this CSV")
+    args = parser.parse_args()
+
+    if args.rebalance not in FREQUENCIES and not args.rebalance.isdigit():
+        print(f"Error: --rebalance must be one of {list(FREQUENCIES)} or a number of bars")
+        return
+
+    closes = load_panel(args.prices)['Close'].sort_index()
+    if args.end:
+        closes = closes.loc[:args.end]
+    missing = [s for s in {args.relative_to, *args.benchmarks} if s not in closes.columns]
+    if missing:
+        print(f"Warning: {', '.join(sorted(missing))} not in the price data")
+    benchmarks = [b for b in args.benchmarks if b in closes.columns]
+    relative_to = args.relative_to if args.relative_to in closes.columns else None
+
+    start = time.perf_counter()
+    try:
+        scores = combined_score(closes, args.rank, relative_to)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return
+    excluded = set(args.exclude if args.exclude is not None else args.benchmarks + [args.relative_to])
+    eligible = ~closes.columns.isin(list(excluded))
+
+    rows = rebalance_rows(closes.index, args.rebalance)
+    # Start once the ranking has values for at least N symbols
+    ready = (np.isfinite(scores[rows]) & eligible).sum(axis=1) >= args.top
+    if args.start:
+        ready &= closes.index[rows] >= pd.Timestamp(args.start)
+    if not ready.any():
+        print("Error: no rebalance date with enough ranked symbols")
+        return
+    rows = rows[np.argmax(ready):]
+    first = rows[0]
+
+    C = closes.to_numpy(dtype=np.float64)
+    returns, weights, turnover, costs = backtest(C[first:], scores[first:], rows - first, args.top,
+                                                 args.cost_bps, eligible)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    index = closes.index[first:]
+    curves = {'Strategy': returns}
+    for b in benchmarks:
+        price = C[first:, closes.columns.get_loc(b)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            curves[b] = np.nan_to_num(np.r_[0.0, price[1:] / price[:-1] - 1])
+
+    years = len(index) / TRADING_DAYS
+    print(f"Symbols: {int(eligible.sum())} | Bars: {len(closes)} | Rank: {', '.join(args.rank)} | Top {args.top} "
+          f"| Rebalance {args.rebalance} ({len(rows)}x) | {elapsed:.0f} ms")
+    print(f"Test: {index[0]:%Y-%m-%d} .. {index[-1]:%Y-%m-%d} ({years:.1f} years)\n")
+
+    table = pd.DataFrame({name: stats(r) for name, r in curves.items()}).T
+    table['Turnover %/yr'] = np.nan
+    table['Costs %/yr'] = np.nan
+    table.loc['Strategy', 'Turnover %/yr'] = turnover[1:].sum() / years * 100
+    table.loc['Strategy', 'Costs %/yr'] = costs.sum() / years * 100
+    print(table.round(2).to_string())
+    print(f"\nAverage one-way turnover per rebalance: {turnover[1:].mean() * 100:.1f}% "
+          f"| holdings: {(weights > 0).sum(axis=1).mean():.1f}")
+
+    yearly = pd.DataFrame({name: pd.Series(r, index=index) for name, r in curves.items()})
+    yearly = ((1 + yearly).groupby(index.year).prod() - 1) * 100
+    print("\nCalendar-year returns (%):")
+    print(yearly.round(1).to_string())
+
+    if args.output:
+        out = pd.DataFrame(index=pd.Index(index, name='Date'))
+        for name, r in curves.items():
+            equity = np.cumprod(1 + r)
+            out[f'{name} Equity'] = equity
+            out[f'{name} Drawdown %'] = (equity / np.maximum.accumulate(equity) - 1) * 100
+        out.to_csv(args.output, float_format='%.6f')
+        print(f"\nEquity curves saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Universe-Wide Relative-Strength Percentile Ranks
+
+The 'RS ...' columns of the perf exports (_calc_rs_rating) normalize each
+symbol against its own min/max history, so they do not say how a symbol ranks
+against the rest of the universe. This module computes IBD-style percentile
+ranks instead:
+
+    score   = 0.4 * R(63) + 0.2 * R(126) + 0.2 * R(189) + 0.2 * R(252)
+    RS Rank = 1..99 percentile of the score among all symbols on that date
+
+where R(n) is the n-bar return. One rankdata call over the (dates x symbols)
+score matrix ranks every date at once (axis=1); missing symbols are pushed to
+the end of each row and masked out of the percentile.
+
+Two modes:
+    --export  add 'RS Rank' columns to a perf screener CSV (3M/6M/1Y returns,
+              the missing 9M weight folded into 1Y) so generate_rs_tables.py
+              can sort on them; written next to it as <name>_ranked.csv (the
+              raw export stays untouched unless --in-place is given)
+    --prices  full daily history from a price panel (e.g. the GIDS universe),
+              kept as a rolling long-format parquet file (Date, Symbol, ...)
+
+USAGE:
+    python3 -m tvind.rs_ranks --export post-processing/perf-screener/csv/watchlist_s-Perf_vs_SPY_2026-02-16.csv
+    python3 -m tvind.rs_ranks --prices gids_daily.parquet --universe gids --history rs_rank_history.parquet
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+from tvind import REPO_DIR
+from tvind.periods import Anchors, gather_returns
+from tvind.prices import load_panel
+
+GIDS_CSV = os.path.join(REPO_DIR, 'indicators', 'stock_vs_industry_strentgh', 'GIDS_Directory_20251121.csv')
+
+# IBD weighting: latest quarter counts double
+LOOKBACKS = {'3M': 63, '6M': 126, '9M': 189, '12M': 252}
+WEIGHTS = {'3M': 0.4, '6M': 0.2, '9M': 0.2, '12M': 0.2}
+
+# Perf exports have no 9M column; its weight moves to 1Y
+EXPORT_WEIGHTS = {'3M Return %': 0.4, '6M Return %': 0.2, '1Y Return %': 0.4}
+
+DEFAULT_KEEP_DAYS = 252
+
+
+def percentile_ranks(scores):
+    """
+    Row-wise 1..99 percentile ranks of a (dates x symbols) array, NaN stays NaN.
+    Ties share their average rank.
+    """
+    scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+    valid = ~np.isnan(scores)
+    ranks = rankdata(np.where(valid, scores, np.inf), method='average', axis=1)
+    n = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = np.where(n > 1, (ranks - 1) / (n - 1), 1.0) * 98 + 1
+    return np.where(valid, np.round(pct), np.nan)
+
+
+def ibd_scores(closes, lookbacks=LOOKBACKS, weights=WEIGHTS):
+    """Weighted return score per date/symbol plus the component returns."""
+    C = closes.to_numpy(dtype=np.float64)
+    anchors = Anchors.for_index(closes.index, list(lookbacks), lookbacks=lookbacks)
+    returns = gather_returns(C, anchors) / 100
+    components = dict(zip(anchors.periods, returns))
+    score = sum(weights[name] * components[name] for name in lookbacks)
+    return score, components
+
+
+def rank_history(closes):
+    """Long-format ranks for every date: Date, Symbol, RS Score, RS Rank, RS Rank 3M/6M/9M/12M."""
+    score, components = ibd_scores(closes)
+    frames = {'RS Score': score * 100, 'RS Rank': percentile_ranks(score)}
+    for name, returns in components.items():
+        frames[f'RS Rank {name}'] = percentile_ranks(returns)
+
+    dates = np.repeat(closes.index.values, closes.shape[1])
+    symbols = np.tile(closes.columns.values, len(closes))
+    out = pd.DataFrame({'Date': dates, 'Symbol': symbols})
+    for name, values in frames.items():
+        out[name] = values.ravel().astype(np.float32)
+    out = out.dropna(subset=['RS Rank'])
+    out['Symbol'] = out['Symbol'].astype('category')
+    return out.reset_index(drop=True)
+
+
+def update_history(path, new, keep_days=DEFAULT_KEEP_DAYS):
+    """Merge new rows into the parquet history (new dates win) and keep the last keep_days dates."""
+    if os.path.exists(path):
+        old = pd.read_parquet(path)
+        old = old[old['Date'] < new['Date'].min()]
+        new = pd.concat([old, new], ignore_index=True)
+    dates = np.sort(new['Date'].unique())[-keep_days:]
+    new = new[new['Date'].isin(dates)].copy()
+    new['Symbol'] = new['Symbol'].astype(str).astype('category')
+    new.to_parquet(path, index=False)
+    return new
+
+
+def rank_export(df, weights=EXPORT_WEIGHTS):
+    """Add 'RS Rank' (weighted) and 'RS Rank <period>' columns to a perf export."""
+    available = {col: w for col, w in weights.items() if col in df.columns}
+    if not available:
+        raise KeyError(f"none of {list(weights)} in export")
+
+    total = sum(available.values())
+    score = sum(df[col].to_numpy(dtype=np.float64) * (w / total) for col, w in available.items())
+    out = df.copy()
+    out['RS Rank'] = percentile_ranks(score)[0]
+    for col in available:
+        period = col.replace(' Return %', '')
+        out[f'RS Rank {period}'] = percentile_ranks(df[col].to_numpy(dtype=np.float64))[0]
+    return out
+
+
+def ranked_path(export):
+    """Sibling of a screener export for its ranked copy: <name>_ranked.csv."""
+    root, ext = os.path.splitext(export)
+    return f"{root}_ranked{ext or '.csv'}"
+
+
+def load_gids_symbols(types=('I', 'E'), gids_csv=GIDS_CSV):
+    """GIDS directory symbols of the given Type codes (I = index, E = ETF)."""
+    gids = pd.read_csv(gids_csv, dtype=str, usecols=['Symbol', 'Name', 'Type'])
+    return gids.loc[gids['Type'].isin(types), 'Symbol'].dropna().unique().tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IBD-style cross-sectional RS percentile ranks")
+    parser.add_argument('--export', help="Perf screener CSV to add RS Rank columns to")
+    parser.add_argument('--prices', help="Daily price file or directory (see tvind.prices)")
+    parser.add_argument('--universe', choices=['all', 'gids'], default='all',
+                        help="Restrict --prices to the GIDS directory symbols")
+    parser.add_argument('--history', default='rs_rank_history.parquet', help="Rolling rank history (parquet)")
+    parser.add_argument('--keep-days', type=int, default=DEFAULT_KEEP_DAYS)
+    parser.add_argument('--output', help="Output CSV (default: <export>_ranked.csv / latest ranks to stdout)")
+    parser.add_argument('--in-place', action='store_true', help="Rewrite the --export file itself")
+    args = parser.parse_args()
+
+    if not args.export and not args.prices:
+        parser.error("one of --export or --prices is required")
+    if args.in_place and (not args.export or args.output):
+        parser.error("--in-place requires --export and excludes --output")
+
+    if args.export:
+        df = pd.read_csv(args.export, dtype={'Symbol': str})
+        start = time.perf_counter()
+        ranked = rank_export(df)
+        elapsed = (time.perf_counter() - start) * 1000
+        output = args.export if args.in_place else args.output or ranked_path(args.export)
+        ranked.to_csv(output, index=False)
+        print(f"Ranked {len(ranked)} symbols in {elapsed:.1f} ms -> {output}")
+        return
+
+    closes = load_panel(args.prices)['Close'].sort_index()
+    if args.universe == 'gids':
+        closes = closes.reindex(columns=[s for s in load_gids_symbols() if s in closes.columns])
+
+    # Only the dates that can still be in the kept window need ranking
+    tail = closes.iloc[-(args.keep_days + max(LOOKBACKS.values())):]
+    start = time.perf_counter()
+    history = rank_history(tail)
+    elapsed = (time.perf_counter() - start) * 1000
+    history = update_history(args.history, history, args.keep_days)
+    print(f"Symbols: {closes.shape[1]} | Dates kept: {history['Date'].nunique()} | {elapsed:.1f} ms")
+    print(f"History saved to {args.history}")
+
+    latest = history[history['Date'] == history['Date'].max()].drop(columns='Date')
+    latest = latest.sort_values('RS Rank', ascending=False)
+    if args.output:
+        latest.to_csv(args.output, index=False, float_format='%.2f')
+        print(f"Latest ranks saved to {args.output}")
+    else:
+        print(latest.head(25).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
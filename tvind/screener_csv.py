@@ -0,0 +1,210 @@
+"""
+Typed Screener CSV Loading (declared schemas per screener export)
+
+pd.read_csv() on a screener export infers float64 for every number, object
+strings for Symbol/Description and reads the Korean ticker 005380 as the int
+5380. The exports have a fixed layout per screener, so each one gets a
+declared profile instead:
+
+    Symbol                     str (leading zeros kept)
+    Description, Quadrant      category
+    flags / types / directions int8    (0/1/-1; an empty cell is 0 = no signal)
+    YYYYMMDD dates             int32   (0 = no date)
+    scores, ranks, counts      int16
+    returns, ratios, metrics   float32
+
+read_export() reads only the requested columns with pyarrow's CSV reader
+(multi-threaded above THREADED_BYTES), converting to the declared types while
+parsing; columns a profile does not know are downcast afterwards (float32 /
+smallest integer). The profile comes from the s-<screener> part of the file
+name (same pattern as tvind.watch) or is given explicitly.
+
+USAGE:
+    python3 -m tvind.screener_csv post-processing/PVscreener/csv/*.csv      # memory / time report
+    python3 -m tvind.screener_csv export.csv --profile perf --scale 20000   # replicated to universe size
+"""
+
+import argparse
+import csv
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+FILENAME_RE = re.compile(r'_(?P<screener>s-.+)_\d{4}-\d{2}-\d{2}\.csv$')
+
+_PERIODS = ['Primary', '1W', '2W', '1M', '2M', '3M', '6M', '9M', '1Y', 'YTD', 'MTD', 'QTD', 'WTD', 'Custom Period']
+_TEXT = {'Symbol': 'str', 'Description': 'category'}
+
+PROFILES = {
+    'pv-gap': {
+        'screener': r'^s-PV_Gap',
+        'dtypes': {
+            **_TEXT,
+            'PV Breakout Flag': 'int8', 'PV Days Ago': 'float32', 'PV Breakout Date': 'int32',
+            'PV Strength %': 'float32', 'PV Type': 'int8', 'Volume Ratio': 'float32', 'Price vs SMA %': 'float32',
+            **{f'Gap{k} {c}': t for k in (1, 2) for c, t in
+               [('Flag', 'int8'), ('Days Ago', 'float32'), ('Date', 'int32'), ('Size %', 'float32'),
+                ('Direction', 'int8')]},
+            'Any Signal': 'int8', 'Combined Score': 'int16',
+        },
+    },
+    'perf': {
+        'screener': r'^s-Perf_vs_',
+        'dtypes': {
+            **_TEXT,
+            **{f'{p} Return %': 'float32' for p in _PERIODS},
+            **{f'Rel Return {p} %': 'float32' for p in _PERIODS},
+            **{f'RS {p}': 'float32' for p in _PERIODS},
+        },
+    },
+    'sectors': {
+        'screener': r'^s-Sector_Rotation',
+        'dtypes': {
+            **_TEXT, 'Rank': 'int16', 'Quadrant': 'category', 'RS-Ratio': 'float32', 'RS-Momentum': 'float32',
+            **{f'{p} Return %': 'float32' for p in _PERIODS},
+            **{f'Rel Return {p} %': 'float32' for p in _PERIODS},
+            **{f'Avg Rel {p} %': 'float32' for p in _PERIODS},
+            **{f'Wins {p}': 'int16' for p in _PERIODS},
+        },
+    },
+}
+
+# Below this size the reader's thread pool costs more than it saves
+THREADED_BYTES = 1 << 20
+
+_INTEGERS = {'int8', 'int16', 'int32'}
+# Integers are parsed as float64 (empty cells, exact YYYYMMDD) and cast afterwards
+_ARROW = {'str': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string()), 'float32': pa.float32(),
+          **{kind: pa.float64() for kind in _INTEGERS}}
+
+
+def detect(path, profiles=PROFILES):
+    """Profile name from an export file name (None when the screener is unknown)."""
+    match = FILENAME_RE.search(os.path.basename(path))
+    if match:
+        for name, profile in profiles.items():
+            if re.search(profile['screener'], match.group('screener')):
+                return name
+    return None
+
+
+def read_export(path, usecols=None, profile=None):
+    """
+    A screener export with its declared dtypes. usecols limits the columns
+    read (unknown names are ignored); profile overrides the file-name match.
+    """
+    profile = profile or detect(path)
+    declared = PROFILES[profile]['dtypes'] if profile else _TEXT
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    columns = [c for c in header if usecols is None or c in usecols]
+    options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types={c: _ARROW[declared[c]] for c in columns if c in declared})
+    threads = os.path.getsize(path) > THREADED_BYTES
+    table = pa_csv.read_csv(path, read_options=pa_csv.ReadOptions(use_threads=threads),
+                            convert_options=options)
+
+    # Casts happen on the Arrow columns so pandas builds the frame only once
+    arrays = []
+    for name, column in zip(table.column_names, table.columns):
+        kind = declared.get(name)
+        if kind in _INTEGERS:
+            column = pc.fill_null(column, 0).cast(kind)
+        elif kind is None and pa.types.is_floating(column.type):
+            values = column.to_numpy()
+            whole = column.null_count == 0 and len(values) and np.array_equal(values, np.round(values))
+            column = column.cast(_smallest_int(values)) if whole else column.cast(pa.float32())
+        elif kind is None and pa.types.is_null(column.type):
+            column = column.cast(pa.float32())     # an all-empty column
+        elif kind is None and pa.types.is_integer(column.type) and len(column):
+            column = column.cast(_smallest_int(column.to_numpy()))
+        arrays.append(column)
+    return pa.table(arrays, names=table.column_names).to_pandas()
+
+
+def _smallest_int(values):
+    """Narrowest signed integer type holding every value."""
+    low, high = values.min(), values.max()
+    for kind in ('int8', 'int16', 'int32'):
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            return kind
+    return 'int64'
+
+
+_DISPLAY = {'float32': 'float64', 'int8': 'int64', 'int16': 'int64', 'int32': 'int64', 'category': 'str'}
+
+
+def for_display(df):
+    """
+    Copy of a (selected, small) frame with the dtypes pd.read_csv() would
+    have produced: float64 / int64 / str. Table cells then print as 1.23
+    instead of 1.2300000190734863 and fillna() accepts any value.
+    """
+    return df.astype({c: _DISPLAY[str(t)] for c, t in df.dtypes.items() if str(t) in _DISPLAY})
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def compare(path, usecols=None, profile=None, repeat=3):
+    """(default ms, default MB, typed ms, typed MB) - best of `repeat` reads each."""
+    timings = []
+    for reader in (lambda: pd.read_csv(path, usecols=usecols),
+                   lambda: read_export(path, usecols, profile)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = reader()
+            best = min(best, (time.perf_counter() - start) * 1000)
+        timings += [best, memory_mb(df)]
+    return tuple(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typed screener CSV loading: memory and time per file")
+    parser.add_argument('files', nargs='+', help="Screener export CSVs")
+    parser.add_argument('--profile', choices=sorted(PROFILES), help="Override the profile from the file name")
+    parser.add_argument('--usecols', nargs='+', help="Read only these columns")
+    parser.add_argument('--scale', type=int, help="Replicate each file to this many rows before measuring")
+    parser.add_argument('--dtypes', action='store_true', help="Show the resulting dtypes")
+    args = parser.parse_args()
+
+    print(f"{'File':60} {'Profile':8} {'Rows':>7} {'default':>16} {'typed':>16} {'RAM':>6} {'speed':>6}")
+    for path in args.files:
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            continue
+        profile = args.profile or detect(path)
+        source, tmp = path, None
+        if args.scale:
+            df = pd.read_csv(path, dtype=str)
+            df = df.iloc[np.resize(np.arange(len(df)), args.scale)]
+            tmp = tempfile.NamedTemporaryFile(suffix=os.path.basename(path)[-15:], delete=False)
+            tmp.close()
+            df.to_csv(tmp.name, index=False)
+            source = tmp.name
+        try:
+            rows = len(read_export(source, args.usecols, profile))
+            d_ms, d_mb, t_ms, t_mb = compare(source, args.usecols, profile)
+        finally:
+            if tmp:
+                os.unlink(tmp.name)
+        print(f"{os.path.basename(path)[:60]:60} {profile or '-':8} {rows:7d} "
+              f"{d_ms:7.1f} ms {d_mb:5.2f} MB {t_ms:7.1f} ms {t_mb:5.2f} MB "
+              f"{t_mb / d_mb * 100:5.0f}% {d_ms / t_ms:5.1f}x")
+        if args.dtypes:
+            print(read_export(path, args.usecols, profile).dtypes.to_string())
+
+
+if __name__ == "__main__":
+    main()
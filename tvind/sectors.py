@@ -0,0 +1,229 @@
+"""
+Sector Rotation Engine (Python version of SPY-vs-sector.pine)
+
+SPY-vs-sector.pine spends one request.security per sector ETF and plots each
+close on its own. This module compares every sector with every other one:
+
+    M[p, i, j] = (1 + R_i(p)) / (1 + R_j(p)) - 1      (% relative performance)
+
+R(p) comes from the shared period anchors (tvind.periods), so the full
+(lookbacks x N x N) matrix is one broadcast of a (lookbacks x N) return
+array. Each sector is ranked by its average outperformance of the others,
+and placed in an RRG-style rotation quadrant against the benchmark:
+
+    RS          = close / close(SPY)
+    RS-Ratio    = 100 * RS / SMA(RS, ratio_window)
+    RS-Momentum = 100 * RS-Ratio / RS-Ratio[momentum]
+
+    Leading   ratio > 100, momentum > 100     Weakening  ratio > 100, momentum < 100
+    Improving ratio < 100, momentum > 100     Lagging    ratio < 100, momentum < 100
+
+The RS series are cached in a parquet file next to the closes they came from;
+a later run only divides the rows that are new or changed (and with
+--download, only fetches the days after the cache).
+
+The ranking table is a screener-style CSV (Symbol, Description, ...) that
+post-processing/perf-screener/generate_rs_tables.py renders with
+run_sector_rotation.txt; --heatmap draws the matrix itself.
+
+USAGE:
+    python3 -m tvind.sectors --download --cache sector_cache.parquet --output sectors_s-Sector_Rotation_2026-02-16.csv --heatmap sectors_heatmap.png
+    python3 -m tvind.sectors --prices daily.csv [--lookbacks 1W 1M 3M 6M YTD] [--rank-by 1M]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.periods import Anchors, gather_returns
+from tvind.prices import download_panel, load_panel
+
+BENCHMARK = 'SPY'
+SECTORS = {
+    'XLC': 'Communication Services', 'XLY': 'Consumer Discretionary', 'XLP': 'Consumer Staples',
+    'XLE': 'Energy', 'XLF': 'Financial', 'XLV': 'Health Care', 'XLI': 'Industrial',
+    'XLB': 'Materials', 'XLRE': 'Real Estate', 'XLK': 'Technology', 'XLU': 'Utilities',
+}
+DESCRIPTIONS = {BENCHMARK: 'S&P 500', **SECTORS}
+
+DEFAULT_LOOKBACKS = ['1W', '1M', '3M', '6M', 'YTD']
+RATIO_WINDOW = 50      # ~10 weeks of daily bars
+MOMENTUM = 10
+QUADRANTS = {(True, True): 'Leading', (True, False): 'Weakening',
+             (False, False): 'Lagging', (False, True): 'Improving'}
+
+
+def relative_matrix(closes, lookbacks=DEFAULT_LOOKBACKS, at=-1):
+    """(lookbacks x N x N) % performance of row symbol vs column symbol, plus the (lookbacks x N) returns."""
+    anchors = Anchors.for_index(closes.index, lookbacks)
+    returns = gather_returns(closes.to_numpy(dtype=np.float64), anchors, at)[:, 0, :]
+    growth = 1 + returns / 100
+    return (growth[:, :, None] / growth[:, None, :] - 1) * 100, returns
+
+
+def cached_ratios(closes, benchmark=BENCHMARK, cache=None):
+    """
+    close / benchmark close for every column, reusing the cached rows whose
+    closes are unchanged. Returns (ratios, reused row count).
+    """
+    bench = closes[benchmark]
+    ratio_cols = [f'{s}/{benchmark}' for s in closes.columns]
+    ratios = pd.DataFrame(np.nan, index=closes.index, columns=ratio_cols)
+    todo = np.ones(len(closes), dtype=bool)
+
+    if cache and os.path.exists(cache):
+        cached = pd.read_parquet(cache)
+        if set(closes.columns) <= set(cached.columns) and set(ratio_cols) <= set(cached.columns):
+            old = cached.reindex(closes.index)
+            same = np.isclose(old[closes.columns].to_numpy(dtype=np.float64),
+                              closes.to_numpy(dtype=np.float64), equal_nan=True).all(axis=1)
+            ratios.loc[same] = old.loc[same, ratio_cols].to_numpy()
+            todo = ~same
+
+    if todo.any():
+        ratios.loc[todo] = (closes.loc[todo].to_numpy(dtype=np.float64) /
+                            bench.loc[todo].to_numpy(dtype=np.float64)[:, None])
+    if cache:
+        pd.concat([closes, ratios], axis=1).to_parquet(cache)
+    ratios.columns = closes.columns
+    return ratios, int((~todo).sum())
+
+
+def rotation(ratios, ratio_window=RATIO_WINDOW, momentum=MOMENTUM):
+    """RS-Ratio and RS-Momentum for every date (dates x symbols each)."""
+    rs_ratio = 100 * ratios / ratios.rolling(ratio_window, min_periods=ratio_window).mean()
+    rs_momentum = 100 * rs_ratio / rs_ratio.shift(momentum)
+    return rs_ratio, rs_momentum
+
+
+def quadrant(rs_ratio, rs_momentum):
+    """Quadrant name per symbol from the latest RS-Ratio / RS-Momentum values."""
+    return [QUADRANTS[(r > 100, m > 100)] if not (np.isnan(r) or np.isnan(m)) else ''
+            for r, m in zip(rs_ratio, rs_momentum)]
+
+
+def rank_table(closes, ratios, lookbacks=DEFAULT_LOOKBACKS, rank_by='1M', benchmark=BENCHMARK,
+               ratio_window=RATIO_WINDOW, momentum=MOMENTUM):
+    """Screener-style table: rank, average outperformance, vs benchmark, RRG coordinates and quadrant."""
+    matrix, returns = relative_matrix(closes, lookbacks)
+    n = matrix.shape[1]
+    off_diagonal = ~np.eye(n, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        avg_rel = np.nanmean(np.where(off_diagonal, matrix, np.nan), axis=2)
+        wins = (np.where(off_diagonal, matrix, np.nan) > 0).sum(axis=2)
+
+    symbols = list(closes.columns)
+    b = symbols.index(benchmark)
+    out = pd.DataFrame({'Symbol': symbols, 'Description': [DESCRIPTIONS.get(s, '') for s in symbols]})
+    k = lookbacks.index(rank_by)
+    out['Rank'] = pd.Series(avg_rel[k]).rank(ascending=False, method='min').to_numpy()
+    for i, p in enumerate(lookbacks):
+        out[f'{p} Return %'] = returns[i]
+        out[f'Rel Return {p} %'] = matrix[i, :, b]
+        out[f'Avg Rel {p} %'] = avg_rel[i]
+        out[f'Wins {p}'] = wins[i]
+
+    rs_ratio, rs_momentum = rotation(ratios, ratio_window, momentum)
+    out['RS-Ratio'] = rs_ratio.iloc[-1].to_numpy()
+    out['RS-Momentum'] = rs_momentum.iloc[-1].to_numpy()
+    out['Quadrant'] = quadrant(out['RS-Ratio'], out['RS-Momentum'])
+    return out.sort_values('Rank', kind='stable').reset_index(drop=True), matrix
+
+
+def draw_heatmap(matrix, symbols, lookbacks, out_path, subtitle=''):
+    """One annotated N x N panel per lookback (row vs column %), same look as the screener PNGs."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    n = len(symbols)
+    fig, axes = plt.subplots(1, len(lookbacks), figsize=(6 * len(lookbacks), 6.5), squeeze=False)
+    for ax, p, m in zip(axes[0], lookbacks, matrix):
+        limit = np.nanmax(np.abs(m)) or 1.0
+        ax.imshow(m, cmap='RdYlGn', vmin=-limit, vmax=limit)
+        ax.set_xticks(range(n))
+        ax.set_xticklabels(symbols, rotation=45, ha='right', fontsize=8)
+        ax.set_yticks(range(n))
+        ax.set_yticklabels(symbols, fontsize=8)
+        for i in range(n):
+            for j in range(n):
+                if i != j and not np.isnan(m[i, j]):
+                    ax.text(j, i, f'{m[i, j]:.1f}', ha='center', va='center', fontsize=6)
+        ax.set_title(f'{p}: row vs column %', fontsize=12, fontweight='bold')
+
+    fig.suptitle('Sector Relative Performance', fontsize=16, fontweight='bold')
+    if subtitle:
+        fig.text(0.5, 0.93, subtitle, ha='center', va='top', fontsize=11)
+    plt.savefig(out_path, bbox_inches='tight', dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sector vs sector relative-performance matrix and RRG quadrants")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--prices', help="Daily price file or directory (see tvind.prices)")
+    source.add_argument('--download', action='store_true', help="Download the sector ETFs with yfinance")
+    parser.add_argument('--symbols', nargs='+', default=list(SECTORS), help="Sector ETFs (default: the Pine list)")
+    parser.add_argument('--benchmark', default=BENCHMARK)
+    parser.add_argument('--lookbacks', nargs='+', default=DEFAULT_LOOKBACKS)
+    parser.add_argument('--rank-by', default='1M', help="Lookback the Rank column is based on")
+    parser.add_argument('--ratio-window', type=int, default=RATIO_WINDOW)
+    parser.add_argument('--momentum', type=int, default=MOMENTUM)
+    parser.add_argument('--cache', help="Parquet cache of closes and RS ratios between runs")
+    parser.add_argument('--output', help="Write the ranking table (screener CSV) here")
+    parser.add_argument('--heatmap', help="Write the N x N heatmap PNG here (needs matplotlib)")
+    args = parser.parse_args()
+
+    if args.rank_by not in args.lookbacks:
+        parser.error(f"--rank-by {args.rank_by} is not one of --lookbacks")
+    symbols = [args.benchmark] + [s for s in args.symbols if s != args.benchmark]
+
+    if args.download:
+        start = None
+        if args.cache and os.path.exists(args.cache):
+            cached = pd.read_parquet(args.cache)
+            start = (cached.index[-1] - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+        closes = download_panel(symbols, start=start)['Close']
+        if start:
+            closes = closes.combine_first(cached[[s for s in symbols if s in cached.columns]])
+    else:
+        closes = load_panel(args.prices)['Close']
+
+    missing = [s for s in symbols if s not in closes.columns]
+    if args.benchmark in missing:
+        print(f"Error: benchmark {args.benchmark} not in the price data")
+        return
+    if missing:
+        print(f"Warning: no prices for {missing}")
+    closes = closes.reindex(columns=[s for s in symbols if s not in missing]).sort_index()
+
+    start = time.perf_counter()
+    ratios, reused = cached_ratios(closes, args.benchmark, args.cache)
+    table, matrix = rank_table(closes, ratios, args.lookbacks, args.rank_by, args.benchmark,
+                               args.ratio_window, args.momentum)
+    elapsed = (time.perf_counter() - start) * 1000
+    date = closes.index[-1]
+    print(f"Symbols: {closes.shape[1]} | Lookbacks: {len(args.lookbacks)} | Cached ratio rows: {reused}/{len(closes)} "
+          f"| Date: {date:%Y-%m-%d} | {elapsed:.1f} ms")
+
+    if args.output:
+        table.to_csv(args.output, index=False, float_format='%.2f')
+        print(f"Table saved to {args.output}")
+    else:
+        cols = ['Symbol', 'Rank', f'Avg Rel {args.rank_by} %', f'Rel Return {args.rank_by} %',
+                'RS-Ratio', 'RS-Momentum', 'Quadrant']
+        print(table[cols].round(2).to_string(index=False))
+
+    if args.heatmap:
+        order = [list(closes.columns).index(s) for s in table['Symbol']]
+        ordered = matrix[:, order][:, :, order]
+        subtitle = f"Date: {date:%Y-%m-%d} | Week: {date.isocalendar()[1]} | ranked by {args.rank_by}"
+        draw_heatmap(ordered, table['Symbol'].tolist(), args.lookbacks, args.heatmap, subtitle)
+        print(f"Heatmap saved to {args.heatmap}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Intraday Session-Bucket Aggregator (Python version of manipulation_calc_v1.pine)
+
+Splits every regular session into the gap and four periods of the Market
+Manipulation Calculator and builds its per-day table for many symbols at once:
+
+    Gap           price 9:30 - previous close
+    9:30-10:00    price 10:00 - price 9:30
+    10:00-11:00   price 11:00 - price 10:00
+    11:00-2:00    price 14:00 - price 11:00
+    2:00-4:00     price 16:00 - price 14:00
+    Daily Total   sum of the above, % Change = close to close
+
+As in the Pine script, "price HH:MM" is the close of the bar stamped HH:MM. A
+missing 16:00 bar (regular-session data ends at 15:55/15:59) falls back to the
+last bar of the session. Each bar gets its mark with one searchsorted over
+the time-of-day index, then one groupby-last over the (dates x symbols) close
+matrix fills a (days x marks x symbols) array - no per-bar state, no cap on
+the number of days.
+
+USAGE:
+    python3 -m tvind.session_buckets --prices intraday_5m.csv [--start 2024-11-01] [--rows 10] [--output table.csv]
+
+The price file is any layout tvind.prices.load_panel reads, with intraday
+timestamps (exchange time, or tz-aware and converted with --tz).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind.prices import load_panel
+
+EXCHANGE_TZ = 'America/New_York'
+
+# Minutes after midnight of the captured prices: 9:30, 10:00, 11:00, 14:00, 16:00
+MARKS = np.array([570, 600, 660, 840, 960])
+PERIODS = ['9:30-10:00', '10:00-11:00', '11:00-2:00', '2:00-4:00']
+COLUMNS = ['Gap'] + PERIODS + ['Daily Total', '% Change', 'Start Price', 'End Price']
+
+
+def to_exchange_time(index, tz=EXCHANGE_TZ):
+    """Naive timestamps are taken as exchange time; tz-aware ones are converted."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert(tz).tz_localize(None)
+    return index
+
+
+def bucket_marks(index):
+    """
+    Mark id per bar: 0 for the 9:30 bar, k for bars in (MARKS[k-1], MARKS[k]],
+    -1 outside 9:30-16:00. The last close in each mark is the captured price.
+    """
+    minutes = index.hour * 60 + index.minute
+    marks = np.searchsorted(MARKS, minutes, side='left')
+    return np.where((minutes >= MARKS[0]) & (minutes <= MARKS[-1]), marks, -1)
+
+
+def mark_prices(closes):
+    """(days x marks x symbols) array of captured prices plus the session dates."""
+    marks = bucket_marks(closes.index)
+    in_session = marks >= 0
+    session = closes[in_session]
+    days = session.index.normalize()
+
+    captured = session.groupby([days, marks[in_session]]).last()
+    unique_days = days.unique()
+    full = pd.MultiIndex.from_product([unique_days, range(len(MARKS))])
+    captured = captured.reindex(full)
+    return captured.to_numpy(dtype=np.float64).reshape(len(unique_days), len(MARKS), -1), unique_days
+
+
+def daily_table(closes, start=None, end=None, prev_close=None):
+    """
+    Per-symbol, per-day Gap/period/total table (long format, indexed by Symbol, Date).
+
+    prev_close  optional (dates x symbols) daily closes; by default the previous
+                session's 16:00 price is used, like request.security 'D' close[1].
+    """
+    P, days = mark_prices(closes)
+    if prev_close is not None:
+        prev = prev_close.reindex(columns=closes.columns).shift(1).reindex(days).to_numpy(dtype=np.float64)
+    else:
+        prev = np.vstack([np.full((1, P.shape[2]), np.nan), P[:-1, -1, :]])
+
+    gap = P[:, 0, :] - prev
+    periods = np.diff(P, axis=1)
+    total = gap + periods.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = np.where(prev != 0, (P[:, -1, :] - prev) / prev * 100, 0.0)
+
+    values = np.stack([gap, *periods.transpose(1, 0, 2), total, pct, prev, P[:, -1, :]], axis=-1)
+    # Like the Pine script: a day only counts when every captured price exists
+    complete = ~np.isnan(values).any(axis=-1)
+
+    in_range = np.ones(len(days), dtype=bool)
+    if start is not None:
+        in_range &= days >= pd.Timestamp(start)
+    if end is not None:
+        in_range &= days <= pd.Timestamp(end)
+    complete &= in_range[:, None]
+
+    day_idx, sym_idx = np.nonzero(complete)
+    table = pd.DataFrame(values[day_idx, sym_idx], columns=COLUMNS)
+    table.insert(0, 'Date', days[day_idx])
+    table.insert(0, 'Symbol', closes.columns[sym_idx])
+    return table.sort_values(['Symbol', 'Date']).set_index(['Symbol', 'Date'])
+
+
+def summarize(table, rows=None):
+    """
+    Cumulative rows of the Pine table per symbol, over all days (Total) and the
+    last `rows` days (Visible): summed periods, % of the latest price, and the
+    Amateur (gap + first 30 min) vs Smart Money (rest of the day) split.
+    """
+    moves = ['Gap'] + PERIODS + ['Daily Total']
+    grouped = table.groupby(level='Symbol')
+    scopes = {'Total': table}
+    if rows:
+        scopes['Visible'] = grouped.tail(rows)
+
+    current = grouped['End Price'].last()
+    out = {}
+    for scope, frame in scopes.items():
+        g = frame.groupby(level='Symbol')
+        sums = g[moves].sum()
+        first, last = g['Start Price'].first(), g['End Price'].last()
+        out[(scope, 'Days')] = g.size()
+        for col in moves:
+            out[(scope, col)] = sums[col]
+            out[(scope, f'{col} % of Price')] = sums[col] / current * 100
+        out[(scope, '% Change')] = (last - first) / first * 100
+        out[(scope, 'Amateur')] = sums['Gap'] + sums[PERIODS[0]]
+        out[(scope, 'Smart Money')] = sums[PERIODS[1:]].sum(axis=1)
+    return pd.DataFrame(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gap / session-period table for many symbols from intraday bars")
+    parser.add_argument('--prices', required=True, help="Intraday price file or directory (see tvind.prices)")
+    parser.add_argument('--start', default='2024-11-01', help="First day to record (Pine 'Start Date')")
+    parser.add_argument('--end', help="Last day to record (Pine 'End Date')")
+    parser.add_argument('--rows', type=int, default=10, help="Days in the Visible summary (Pine 'Max Display Rows')")
+    parser.add_argument('--tz', default=EXCHANGE_TZ, help="Exchange time zone for tz-aware timestamps")
+    parser.add_argument('--output', help="Write the per-day table to this CSV")
+    parser.add_argument('--summary', help="Write the per-symbol cumulative summary to this CSV")
+    args = parser.parse_args()
+
+    closes = load_panel(args.prices)['Close']
+    closes.index = to_exchange_time(closes.index, args.tz)
+    closes = closes.sort_index()
+
+    start = time.perf_counter()
+    table = daily_table(closes, args.start, args.end)
+    summary = summarize(table, args.rows)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Bars: {len(closes):,} | Symbols: {closes.shape[1]} | Symbol-days: {len(table):,} | {elapsed:.1f} ms")
+
+    if args.output:
+        table.to_csv(args.output, float_format='%.4f')
+        print(f"Table saved to {args.output}")
+    if args.summary:
+        summary.to_csv(args.summary, float_format='%.4f')
+        print(f"Summary saved to {args.summary}")
+    if not args.output and not args.summary:
+        with pd.option_context('display.max_rows', 60, 'display.width', 200):
+            print(table.groupby(level='Symbol').tail(args.rows).round(2))
+            print()
+            print(summary.round(2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Gap-Adjusted Ratio Engine for the SR Market-Ratio Watchlists
+
+Evaluates every ratio listed in indicators/SR/ratio_watchlist_*.txt at once,
+with the same gap adjustment as f_gapAdjustedPrice in SR_v1.pine / SR_v2.pine:
+
+    gap        open - prevClose on bars where |open - prevClose| > 0.001
+    adjusted   close - cumulativeGap   (from the gap start date onwards)
+
+The cumulative gap is one cumsum over the (dates x symbols) matrix of opens
+and closes, and the ratios are one broadcast division of the adjusted matrix
+gathered at the numerator and denominator column indices.
+
+Watchlist tickers are TradingView names; names_vs_TW_YF.csv maps them to the
+Yahoo Finance symbols used for --download (e.g. DXY -> DX-Y.NYB). By default
+only the symbols of the ratio pairs are loaded; --all-assets adds every
+ticker of names_vs_TW_YF.csv (multi-ticker rows such as 'GLD, SLV' and the
+Benchmark column included), and --adjusted writes the (gap-adjusted) close
+series of every loaded symbol.
+
+USAGE:
+    python3 -m tvind.sr_ratios --prices ohlc.csv [--without-gaps --gap-start 2024-01-01] [--output ratios.csv]
+    python3 -m tvind.sr_ratios --download --watchlist indicators/SR/ratio_watchlist_sector_rotation.txt
+    python3 -m tvind.sr_ratios --download --all-assets --without-gaps --adjusted sr_assets_adjusted.csv
+"""
+
+import argparse
+import csv
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from tvind import REPO_DIR
+from tvind.periods import Anchors, gather_returns
+from tvind.prices import download_panel, load_panel
+
+SR_DIR = os.path.join(REPO_DIR, 'indicators', 'SR')
+NAMES_CSV = os.path.join(SR_DIR, 'names_vs_TW_YF.csv')
+WATCHLIST_GLOB = os.path.join(SR_DIR, 'ratio_watchlist_*.txt')
+
+# Same tolerance as the Pine newDay check
+GAP_TOLERANCE = 0.001
+DEFAULT_SMA = 55
+
+
+def load_symbol_map(names_csv=NAMES_CSV):
+    """
+    TradingView ticker -> Yahoo Finance ticker from names_vs_TW_YF.csv;
+    multi-ticker rows ('DBB, PDBC') map element by element.
+    """
+    mapping = {}
+    with open(names_csv, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            tv = [s.strip() for s in (row.get('Tradingview') or '').split(',') if s.strip()]
+            yf = [s.strip() for s in (row.get('YF') or '').split(',') if s.strip()]
+            if tv and len(tv) == len(yf):
+                mapping.update(zip(tv, yf))
+    return mapping
+
+
+def load_assets(names_csv=NAMES_CSV):
+    """Every TradingView ticker of names_vs_TW_YF.csv: the mapped assets and their benchmarks."""
+    assets = set(load_symbol_map(names_csv))
+    with open(names_csv, 'r', newline='') as f:
+        assets.update((row.get('Benchmark') or '').strip() for row in csv.DictReader(f))
+    assets.discard('')
+    return sorted(assets)
+
+
+def read_ratios(paths):
+    """Unique NUM/DEN pairs from watchlist files, in file order ('#' lines are comments)."""
+    ratios = []
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '/' not in line:
+                    continue
+                num, den = (s.strip() for s in line.split('/', 1))
+                if (num, den) not in ratios:
+                    ratios.append((num, den))
+    return ratios
+
+
+def gap_adjusted(opens, closes, gap_start=None, tolerance=GAP_TOLERANCE):
+    """
+    Vectorized f_gapAdjustedPrice over a (dates x symbols) panel.
+
+    Gaps count from gap_start (inclusive) and are subtracted from the close
+    from then on; before gap_start the raw close is returned.
+    """
+    opens = opens.reindex_like(closes)
+    O = opens.to_numpy(dtype=np.float64)
+    C = closes.to_numpy(dtype=np.float64)
+
+    prev = np.vstack([np.full((1, C.shape[1]), np.nan), C[:-1]])
+    gap = O - prev
+    with np.errstate(invalid='ignore'):
+        is_gap = ~np.isnan(gap) & (np.abs(gap) > tolerance)
+
+    active = np.ones(len(C), dtype=bool)
+    if gap_start is not None:
+        active = (closes.index >= pd.Timestamp(gap_start))
+    is_gap &= active[:, None]
+
+    cumulative = np.cumsum(np.where(is_gap, gap, 0.0), axis=0)
+    adjusted = np.where(active[:, None], C - cumulative, C)
+    return pd.DataFrame(adjusted, index=closes.index, columns=closes.columns)
+
+
+def compute_ratios(prices, ratios, inverse=False):
+    """All NUM/DEN series as one gather + divide; a zero or missing denominator gives NaN."""
+    cols = {sym: i for i, sym in enumerate(prices.columns)}
+    usable = [(n, d) for n, d in ratios if n in cols and d in cols]
+    if inverse:
+        usable = [(d, n) for n, d in usable]
+
+    P = prices.to_numpy(dtype=np.float64)
+    num = P[:, [cols[n] for n, _ in usable]]
+    den = P[:, [cols[d] for _, d in usable]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        R = np.where(den != 0, num / den, np.nan)
+    return pd.DataFrame(R, index=prices.index, columns=[f"{n}/{d}" for n, d in usable])
+
+
+def summarize(ratio_frame, sma=DEFAULT_SMA):
+    """Last value, distance from the SMA and recent change for every ratio."""
+    filled = ratio_frame.ffill()
+    last = filled.iloc[-1]
+    mean = ratio_frame.rolling(sma, min_periods=sma).mean().iloc[-1]
+    changes = gather_returns(filled.to_numpy(dtype=np.float64),
+                             Anchors.for_index(filled.index, ['1W', '1M']), at=-1)[:, 0, :]
+    summary = pd.DataFrame({
+        'Ratio': last,
+        f'SMA {sma}': mean,
+        f'vs SMA {sma} %': (last / mean - 1) * 100,
+        'Chg 1W %': changes[0],
+        'Chg 1M %': changes[1],
+    })
+    summary.index.name = 'Pair'
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gap-adjusted ratios for every SR watchlist pair")
+    parser.add_argument('--prices', help="OHLC file or directory keyed by TradingView ticker (see tvind.prices)")
+    parser.add_argument('--download', action='store_true', help="Download OHLC with yfinance instead")
+    parser.add_argument('--watchlist', nargs='*', help="Ratio watchlist files (default: ratio_watchlist_*.txt)")
+    parser.add_argument('--without-gaps', action='store_true', help="Remove overnight gaps (Pine 'Without Gaps')")
+    parser.add_argument('--gap-start', default='2024-01-01', help="Gap adjustment start date")
+    parser.add_argument('--all-assets', action='store_true',
+                        help="Also load every asset of names_vs_TW_YF.csv, not only the ratio symbols")
+    parser.add_argument('--inverse', action='store_true', help="Flip all ratios (Pine 'Inverse Ratios')")
+    parser.add_argument('--sma', type=int, default=DEFAULT_SMA)
+    parser.add_argument('--output', help="Write the full ratio series to this CSV")
+    parser.add_argument('--summary', help="Write the latest-bar summary to this CSV")
+    parser.add_argument('--adjusted', help="Write the (gap-adjusted) close series of every symbol to this CSV")
+    args = parser.parse_args()
+
+    if not args.prices and not args.download:
+        parser.error("one of --prices or --download is required")
+
+    paths = args.watchlist or sorted(glob.glob(WATCHLIST_GLOB))
+    ratios = read_ratios(paths)
+    symbols = sorted({s for pair in ratios for s in pair})
+    if args.all_assets:
+        symbols = sorted(set(symbols) | set(load_assets()))
+    print(f"Ratios: {len(ratios)} from {len(paths)} watchlists | Symbols: {len(symbols)}")
+
+    if args.download:
+        yf_map = load_symbol_map()
+        yf_symbols = [yf_map.get(s, s) for s in symbols]
+        panel = download_panel(yf_symbols)
+        rename = dict(zip(yf_symbols, symbols))
+        panel = {field: frame.rename(columns=rename) for field, frame in panel.items()}
+    else:
+        panel = load_panel(args.prices)
+
+    closes = panel['Close'].reindex(columns=symbols)
+    missing = closes.columns[closes.isna().all()].tolist()
+    if missing:
+        print(f"Warning: no prices for {', '.join(missing)} - their ratios are skipped")
+        closes = closes.drop(columns=missing)
+
+    start = time.perf_counter()
+    if args.without_gaps:
+        if 'Open' not in panel:
+            print("Error: --without-gaps needs Open prices.")
+            return
+        prices = gap_adjusted(panel['Open'], closes, args.gap_start)
+    else:
+        prices = closes
+    ratio_frame = compute_ratios(prices, ratios, args.inverse)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Computed {ratio_frame.shape[1]} ratios x {ratio_frame.shape[0]} bars in {elapsed:.1f} ms")
+
+    summary = summarize(ratio_frame, args.sma)
+    if args.adjusted:
+        prices.to_csv(args.adjusted, float_format='%.6f')
+        print(f"{'Gap-adjusted' if args.without_gaps else 'Close'} series of {prices.shape[1]} symbols "
+              f"saved to {args.adjusted}")
+    if args.output:
+        ratio_frame.to_csv(args.output, float_format='%.6f')
+        print(f"Ratios saved to {args.output}")
+    if args.summary:
+        summary.to_csv(args.summary, float_format='%.4f')
+        print(f"Summary saved to {args.summary}")
+    if not args.output and not args.summary and not args.adjusted:
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(summary.round(4))
+
+
+if __name__ == "__main__":
+    main()
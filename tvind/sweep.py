@@ -0,0 +1,300 @@
+"""
+PV / Gap Parameter Sweep (process pool over a shared-memory panel)
+
+s-PVGapEarnings.pine exposes the price / volume periods of the PV breakout,
+gap_threshold_1 (5%), gap_threshold_2 (10%), gap_direction and gap_lookback
+(100). This runner evaluates a grid of them with the Python engine
+(tvind.pv_gap) and puts every parameter set's signal counts and forward
+returns into one table:
+
+    PV / Gap1 / Gap2 Events     signals over the whole panel
+    ... Ret <h> %               mean forward return in the signal's direction
+    ... Hit <h> %               share of signals that moved in their direction
+    ... Exc <h> %               same, in excess of the benchmark (SPY)
+    Listed / Day                symbols the screener shows per day (Any Signal
+                                within the PV / gap lookbacks)
+
+The OHLCV panel is copied once into a multiprocessing.shared_memory block;
+workers map it as numpy arrays instead of receiving a pickled copy. One task
+is one (price_period, volume_period, sma_length) combination on one chunk of
+symbol columns: the rolling windows are computed once per task and every gap
+setting of the grid reuses them, and every signal and lookback is per symbol,
+so tasks are independent. They return sums and counts that add up across
+the chunks. --chunks (default: enough for 4 tasks per worker) sets the split,
+so the task count is not capped by the 6 PV combinations of the default grid.
+
+USAGE:
+    python3 -m tvind.sweep --prices daily.parquet [--jobs 8] [--output sweep.csv]
+    python3 -m tvind.sweep --prices daily.parquet --price-period 20 60 120 --gap-threshold-1 3 5 7.5 --gap-lookback 20 100
+    python3 -m tvind.sweep --prices daily.parquet --bench-scaling 1 2 4 8 [--chunks 32]
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from tvind.event_study import forward_outcomes
+from tvind.prices import load_panel
+from tvind.pv_gap import DEFAULTS, events
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+HORIZONS = [5, 20]
+
+# Default grid: Pine defaults plus one step either side
+GRID = {
+    'price_period': [20, 60, 120],
+    'volume_period': [20, 60],
+    'sma_length': [200],
+    'gap_threshold_1': [3.0, 5.0, 7.5],
+    'gap_threshold_2': [10.0, 15.0],
+    'gap_direction': ['Both', 'Up Only', 'Down Only'],
+    'gap_lookback': [20, 100],
+}
+PV_KEYS = ('price_period', 'volume_period', 'sma_length')
+GAP_KEYS = ('gap_threshold_1', 'gap_threshold_2', 'gap_direction', 'gap_lookback')
+
+# Worker state: views on the shared block, set by _attach()
+_SHARED = {}
+
+
+class SharedPanel:
+    """The (fields x dates x symbols) OHLCV block in shared memory; closes it on exit."""
+
+    def __init__(self, arrays):
+        shape = (len(arrays),) + arrays[0].shape
+        self.memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        self.shape = shape
+        block = np.ndarray(shape, dtype=np.float64, buffer=self.memory.buf)
+        for k, a in enumerate(arrays):
+            block[k] = a
+        del block
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _attach(name, shape, benchmark):
+    """Pool initializer: map the shared block (kept open for the worker's lifetime)."""
+    memory = shared_memory.SharedMemory(name=name)
+    _SHARED['memory'] = memory
+    _SHARED['block'] = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+    _SHARED['benchmark'] = benchmark
+
+
+def _last_seen(mask):
+    """Row of the latest True at or before each row (-1 before the first), per column."""
+    t = np.arange(len(mask), dtype=np.int32)[:, None]
+    return np.maximum.accumulate(np.where(mask, t, -1), axis=0)
+
+
+def _recent(seen, first, last):
+    """
+    True where the mask behind _last_seen() was set between first (0 or 1)
+    and last bars ago - the screener's `for i = first to last` lookback loop.
+    """
+    t = np.arange(len(seen), dtype=np.int32)[:, None]
+    if first:
+        seen = np.vstack([np.full((1, seen.shape[1]), -1, dtype=seen.dtype), seen[:-1]])
+    return (seen >= 0) & (t - seen <= last)
+
+
+def _outcome_sums(prefix, rows, cols, sides, c, h, l, bench, horizons):
+    """
+    Event count and [sum, count] of the signed return, hit rate (%) and excess
+    per horizon ('<prefix> Ret 5 %', ...) - additive across symbol chunks.
+    """
+    sums = {f'{prefix} Events': np.array([len(rows), 1.0])}
+    columns = {}
+    if len(rows):
+        out = forward_outcomes(c, h, l, rows, cols, sides, horizons, bench)
+        side = np.asarray(sides, dtype=np.float64)[:, None]
+        columns = {'Ret': out['Return %'] * side, 'Hit': out['Hit'] * 100.0}
+        if bench is not None:
+            columns['Exc'] = out['Excess %'] * side
+    for j, hz in enumerate(horizons):
+        for name in ('Ret', 'Hit', 'Exc'):
+            values = columns[name][:, j] if name in columns else np.empty(0)
+            ok = ~np.isnan(values)
+            sums[f'{prefix} {name} {hz} %'] = np.array([values[ok].sum(), ok.sum()], dtype=np.float64)
+    return sums
+
+
+def evaluate(pv, gap_grid, cols, horizons=HORIZONS):
+    """
+    Sums for one (price_period, volume_period, sma_length) combination on the
+    symbol columns cols = (start, stop), one dict per gap setting. Runs in a
+    worker on the shared panel.
+    """
+    block = _SHARED['block']
+    o, h, l, c, v = block[:, :, cols[0]:cols[1]]
+    k = _SHARED['benchmark']
+    bench = block[3][:, k] if k is not None else None
+    ev = events(o, h, l, c, v, **pv)
+
+    pv_mask = ev['Long'] | ev['Short']
+    rows, cols = np.nonzero(pv_mask)
+    pv_sums = _outcome_sums('PV', rows, cols, np.where(ev['Long'][rows, cols], 1, -1), c, h, l,
+                            bench, horizons)
+    pv_listed = _recent(_last_seen(pv_mask), 0, DEFAULTS['pv_lookback'] - 1)
+
+    gap = ev['Gap %']
+    with np.errstate(invalid='ignore'):
+        moves = {'Both': np.abs(gap), 'Up Only': gap, 'Down Only': -gap}
+    # Gap settings share masks, outcomes and lookback windows: compute each once per task
+    seen, stats, recent = {}, {}, {}
+    warm = max(pv['price_period'], pv['volume_period'], pv['sma_length'])
+    out = []
+    for gp in gap_grid:
+        sums = dict(pv_sums)
+        listed = pv_listed.copy()
+        for k in (1, 2):
+            key = (gp['gap_direction'], gp[f'gap_threshold_{k}'])
+            if key not in stats:
+                with np.errstate(invalid='ignore'):
+                    mask = moves[key[0]] >= key[1]
+                rows, cols = np.nonzero(mask)
+                stats[key] = _outcome_sums('', rows, cols, np.where(gap[rows, cols] > 0, 1, -1),
+                                           c, h, l, bench, horizons)
+                seen[key] = _last_seen(mask)
+            sums.update({f'Gap{k}{name}': value for name, value in stats[key].items()})
+            window = key + (gp['gap_lookback'],)
+            if window not in recent:
+                recent[window] = _recent(seen[key], 1, gp['gap_lookback'])
+            listed |= recent[window]
+        # symbols listed per day add up across chunks, like the event counts
+        days = len(listed) - warm
+        sums['Listed / Day'] = np.array([listed[warm:].sum() / days if days > 0 else np.nan, 1.0])
+        out.append(sums)
+    return out
+
+
+def auto_chunks(n_pv, jobs, n_symbols, per_worker=4):
+    """Symbol chunks per PV combination so there are about per_worker tasks for each worker."""
+    return int(min(max(-(-per_worker * jobs // n_pv), 1), max(n_symbols, 1)))
+
+
+def grid_tasks(grid, n_symbols, chunks=1):
+    """
+    [(pv params, [gap params, ...], (first column, end column)), ...] - one
+    task per PV combination and chunk of symbol columns.
+    """
+    gap_grid = [dict(zip(GAP_KEYS, values)) for values in itertools.product(*(grid[k] for k in GAP_KEYS))]
+    bounds = np.linspace(0, n_symbols, min(chunks, max(n_symbols, 1)) + 1).astype(int)
+    return [(dict(zip(PV_KEYS, values)), gap_grid, (int(a), int(b)))
+            for values in itertools.product(*(grid[k] for k in PV_KEYS))
+            for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _finish(name, total):
+    """Table value from summed [sum, count]: the total for the counts, else the mean (NaN without data)."""
+    if name.endswith('Events'):
+        return int(total[0])
+    if name == 'Listed / Day':
+        return total[0]
+    return total[0] / total[1] if total[1] else np.nan
+
+
+def run_sweep(panel, tasks, jobs, horizons=HORIZONS):
+    """Evaluate every task on a process pool sharing one panel; returns the result table."""
+    totals = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_attach,
+                             initargs=(panel.memory.name, panel.shape, panel.benchmark)) as pool:
+        futures = [pool.submit(evaluate, pv, gap_grid, cols, horizons) for pv, gap_grid, cols in tasks]
+        for (pv, gap_grid, _), future in zip(tasks, futures):
+            for i, sums in enumerate(future.result()):
+                key = (tuple(pv.values()), i)
+                if key not in totals:
+                    totals[key] = ({**pv, **gap_grid[i]}, {})
+                merged = totals[key][1]
+                for name, value in sums.items():
+                    merged[name] = merged[name] + value if name in merged else value
+    return pd.DataFrame([{**params, **{name: _finish(name, total) for name, total in merged.items()}}
+                         for params, merged in totals.values()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PV / gap parameter grid on a process pool with a shared-memory panel")
+    parser.add_argument('--prices', required=True, help="Daily OHLCV file or directory (see tvind.prices)")
+    for key, values in GRID.items():
+        kind = str if key == 'gap_direction' else type(values[0])
+        parser.add_argument(f"--{key.replace('_', '-')}", nargs='+', type=kind, default=values,
+                            help=f"Values to sweep (default: {' '.join(map(str, values))})")
+    parser.add_argument('--benchmark', default='SPY', help="Symbol for the excess returns")
+    parser.add_argument('--horizons', type=int, nargs='+', default=HORIZONS, help="Forward bars")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--chunks', type=int,
+                        help="Symbol chunks per PV combination (default: about 4 tasks per worker)")
+    parser.add_argument('--bench-scaling', type=int, nargs='+', metavar='JOBS',
+                        help="Time the sweep with each of these worker counts instead")
+    parser.add_argument('--sort', default='Gap1 Ret 20 %', help="Sort the table by this column")
+    parser.add_argument('--output', help="Write the full table to this CSV")
+    args = parser.parse_args()
+
+    grid = {key: getattr(args, key) for key in GRID}
+    bad = sorted(set(grid['gap_direction']) - {'Both', 'Up Only', 'Down Only'})
+    if bad:
+        print(f"Error: unknown gap direction {bad} (use 'Both', 'Up Only', 'Down Only')")
+        return
+
+    panel_frames = load_panel(args.prices)
+    closes = panel_frames['Close'].sort_index()
+    symbols = list(closes.columns)
+    arrays = [panel_frames[f].reindex(index=closes.index, columns=symbols).to_numpy(dtype=np.float64)
+              for f in FIELDS]
+    benchmark = symbols.index(args.benchmark) if args.benchmark in symbols else None
+    if benchmark is None:
+        print(f"Warning: benchmark {args.benchmark} not in the price data, no excess returns")
+
+    n_pv = int(np.prod([len(grid[k]) for k in PV_KEYS]))
+    chunks = args.chunks or auto_chunks(n_pv, max(args.bench_scaling or [args.jobs]), len(symbols))
+    tasks = grid_tasks(grid, len(symbols), chunks)
+    n_gap = len(tasks[0][1])
+    print(f"Symbols: {len(symbols)} | Bars: {len(closes)} | Parameter sets: {n_pv * n_gap} "
+          f"({n_pv} PV combinations x {n_gap} gap settings) | Tasks: {len(tasks)} "
+          f"({n_pv} x {len(tasks) // n_pv} symbol chunks)")
+
+    with SharedPanel(arrays) as panel:
+        panel.benchmark = benchmark
+        del arrays, panel_frames
+        print(f"Shared panel: {panel.memory.size / 1e6:.0f} MB in {panel.memory.name}")
+
+        if args.bench_scaling:
+            base = None
+            for jobs in args.bench_scaling:
+                if len(tasks) < jobs:
+                    print(f"Warning: {len(tasks)} tasks for {jobs} workers, {jobs - len(tasks)} stay idle "
+                          f"(raise --chunks)")
+                start = time.perf_counter()
+                run_sweep(panel, tasks, jobs, args.horizons)
+                elapsed = time.perf_counter() - start
+                base = base or elapsed * args.bench_scaling[0]
+                print(f"  jobs {jobs:3d}: {elapsed * 1000:8.0f} ms | speedup {base / elapsed:5.2f}x "
+                      f"| efficiency {base / elapsed / jobs * 100:5.1f}%")
+            return
+
+        start = time.perf_counter()
+        table = run_sweep(panel, tasks, args.jobs, args.horizons)
+        elapsed = (time.perf_counter() - start) * 1000
+    print(f"Swept with {args.jobs} workers in {elapsed:.0f} ms\n")
+
+    if args.sort in table.columns:
+        table = table.sort_values(args.sort, ascending=False, kind='stable')
+    if args.output:
+        table.to_csv(args.output, index=False, float_format='%.4f')
+        print(f"Table saved to {args.output}")
+    with pd.option_context('display.max_rows', 40, 'display.width', 250, 'display.max_columns', 40):
+        print(table.round(2).head(40).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Screener Export Watcher (render new exports as they land)
+
+TradingView exports arrive as <list>_s-<screener>_<YYYY-MM-DD>.csv in
+post-processing/*/csv/, and each renderer only draws the files listed under
+"### files to run" in its config. This watcher notices new exports and
+renders just that file:
+
+    detect     inotify (IN_CLOSE_WRITE / IN_MOVED_TO, via ctypes - no extra
+               package) on Linux, polling of (size, mtime) elsewhere or with --poll
+    classify   the s-<screener> part of the name picks the job (JOBS)
+    render     a worker thread that has already imported pandas/matplotlib
+               and loaded the renderer module calls its process_csv() with
+               the settings of the job's config (re-read when it changes)
+
+so a figure is ready a second or two after the download instead of after a
+cold start of the script.
+
+USAGE:
+    python3 -m tvind watch                         # watch post-processing/*/csv
+    python3 -m tvind watch --poll --interval 2     # without inotify
+    python3 -m tvind watch --include-existing --once --output-dir /tmp/png
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import glob
+import os
+import queue
+import re
+import select
+import struct
+import threading
+import time
+
+from tvind import REPO_DIR
+
+WATCH_DIRS = os.path.join(REPO_DIR, 'post-processing', '*', 'csv')
+FILENAME_RE = re.compile(r'^(?P<list>.+?)_(?P<screener>s-.+)_(?P<date>\d{4}-\d{2}-\d{2})\.csv$')
+
+# screener name (regex on the s-<screener> part) -> tvind command and its config
+JOBS = {
+    'perf': {'screener': r'^s-Perf_vs_', 'command': 'rs-tables',
+             'config': 'post-processing/perf-screener/run_top_losers_gainers_v2.txt'},
+    'sectors': {'screener': r'^s-Sector_Rotation', 'command': 'rs-tables',
+                'config': 'post-processing/perf-screener/run_sector_rotation.txt'},
+    'pv-gap': {'screener': r'^s-PV_Gap_Screener', 'command': 'pv-screener',
+               'config': 'post-processing/PVscreener/config_pv_screener.txt'},
+}
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+_EVENT = struct.Struct('iIII')
+
+
+def classify(path, jobs=JOBS):
+    """Job name for an export file name (None for anything else, e.g. SPY_2026-02-16.csv)."""
+    match = FILENAME_RE.match(os.path.basename(path))
+    if not match:
+        return None
+    for name, job in jobs.items():
+        if re.search(job['screener'], match.group('screener')):
+            return name
+    return None
+
+
+class Renderer:
+    """One renderer module per tvind command, loaded once; config parsed again only when it changes."""
+
+    def __init__(self, jobs=JOBS, output_dir=None):
+        self.jobs = jobs
+        self.output_dir = output_dir
+        self.modules = {}
+        self.configs = {}
+
+    def warm(self):
+        """Import everything a render needs before the first file arrives."""
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from tvind.cli import load
+
+        for job in self.jobs.values():
+            if job['command'] not in self.modules:
+                module = load(job['command'])
+                if self.output_dir:
+                    module.OUTPUT_DIR = self.output_dir
+                self.modules[job['command']] = module
+            self.settings(job)
+        # first text draw loads the font cache
+        fig = plt.figure(figsize=(1, 1))
+        fig.text(0.5, 0.5, 'warm')
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def settings(self, job):
+        """parse_config() of the job's config without its files list, cached by mtime."""
+        path = os.path.join(REPO_DIR, job['config'])
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.configs.get(path)
+        if cached is None or cached[0] != mtime:
+            parsed = self.modules[job['command']].parse_config(path)
+            cached = self.configs[path] = (mtime, parsed[1:])
+        return cached[1]
+
+    def render(self, path, name):
+        job = self.jobs[name]
+        self.modules[job['command']].process_csv(os.path.abspath(path), *self.settings(job))
+
+
+def inotify_paths(dirs, stop, timeout=0.5):
+    """
+    Iterator over files closed after writing or moved into the directories
+    (Linux inotify via libc). Raises OSError / AttributeError right away when
+    inotify is not available.
+    """
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    watches = {}
+    for d in dirs:
+        wd = libc.inotify_add_watch(fd, os.fsencode(d), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+        watches[wd] = d
+    return _inotify_events(fd, watches, stop, timeout)
+
+
+def _inotify_events(fd, watches, stop, timeout):
+    try:
+        while not stop.is_set():
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                continue
+            buf = os.read(fd, 64 * 1024)
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+                name = buf[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if name and wd in watches:
+                    yield os.path.join(watches[wd], os.fsdecode(name))
+    finally:
+        os.close(fd)
+
+
+def poll_paths(dirs, stop, interval=1.0):
+    """Yield files that are new or changed and whose (size, mtime) held still for one interval."""
+    def snapshot():
+        out = {}
+        for d in dirs:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        out[entry.path] = (st.st_size, st.st_mtime_ns)
+        return out
+
+    seen = snapshot()
+    candidates = {}
+    while not stop.wait(interval):
+        current = snapshot()
+        for path, sig in current.items():
+            if seen.get(path) == sig:
+                continue
+            if candidates.get(path) == sig:
+                seen[path] = sig
+                candidates.pop(path)
+                yield path
+            else:
+                candidates[path] = sig
+
+
+def watch(dirs, renderer, use_inotify=True, interval=1.0, existing=(), once=False, stop=None):
+    """Feed classified exports to one warm worker thread until stopped (or, with once, until `existing` is done)."""
+    stop = stop or threading.Event()
+    work = queue.Queue()
+    queued = set()
+    lock = threading.Lock()
+
+    def submit(path, detected):
+        name = classify(path, renderer.jobs)
+        if name is None:
+            return
+        with lock:
+            if path in queued:
+                return
+            queued.add(path)
+        work.put((path, name, detected))
+
+    def worker():
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            path, name, detected = item
+            with lock:
+                queued.discard(path)
+            try:
+                renderer.render(path, name)
+                print(f"[{name}] {os.path.basename(path)} rendered "
+                      f"{(time.perf_counter() - detected) * 1000:.0f} ms after detection")
+            except Exception as e:
+                print(f"Error: rendering {path} failed: {e}")
+
+    start = time.perf_counter()
+    renderer.warm()
+    print(f"Worker warm in {(time.perf_counter() - start) * 1000:.0f} ms | jobs: {', '.join(renderer.jobs)}")
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    for path in existing:
+        submit(path, time.perf_counter())
+    if once:
+        work.put(None)
+        thread.join()
+        return
+
+    source, mode = None, 'inotify'
+    if use_inotify:
+        try:
+            source = inotify_paths(dirs, stop)
+        except (OSError, AttributeError) as e:
+            print(f"Warning: inotify unavailable ({e}), polling every {interval:g} s")
+    if source is None:
+        source, mode = poll_paths(dirs, stop, interval), 'polling'
+    print(f"Watching {len(dirs)} directories with {mode} (Ctrl+C to stop)")
+
+    try:
+        for path in source:
+            submit(path, time.perf_counter())
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        work.put(None)
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render new screener exports as soon as they land")
+    parser.add_argument('--dirs', nargs='+', help="Directories to watch (default: post-processing/*/csv)")
+    parser.add_argument('--poll', action='store_true', help="Poll instead of using inotify")
+    parser.add_argument('--interval', type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument('--include-existing', action='store_true', help="Render the exports already present first")
+    parser.add_argument('--once', action='store_true', help="Exit after the existing exports (with --include-existing)")
+    parser.add_argument('--output-dir', help="Write every PNG here instead of each renderer's png/")
+    args = parser.parse_args()
+
+    dirs = [d for d in (args.dirs or sorted(glob.glob(WATCH_DIRS))) if os.path.isdir(d)]
+    if not dirs:
+        print("Error: no directories to watch")
+        return
+
+    existing = []
+    if args.include_existing:
+        existing = sorted(e.path for d in dirs for e in os.scandir(d) if e.is_file() and classify(e.name))
+        print(f"Existing exports: {len(existing)}")
+
+    watch(dirs, Renderer(output_dir=args.output_dir), not args.poll, args.interval, existing, args.once)
+
+
+if __name__ == "__main__":
+    main()
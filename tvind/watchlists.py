@@ -0,0 +1,286 @@
+"""
+Watchlist Index (bitset algebra over the exported TradingView lists)
+
+watchlists/TV_downloads, nqusb_watchlists and other_watchlists hold a few
+dozen lists in two layouts:
+
+    TradingView export   one line: AMEX:SPY,NASDAQ:QQQ,###MID CAP,AMEX:MDY,...
+    line per symbol      ### io_assets_classes / # ==== headers, one symbol per line
+
+Every symbol gets an integer ID the first time it is seen (keyed by the bare
+ticker, so NYSE:HD and HD are the same symbol) and every list - and every
+###section of a list, as 'list#SECTION' - is one Python int used as a bitset:
+bit i is set when symbol i is in it. Combining lists is then integer math:
+
+    A | B     union            A & B     intersection            A - B    difference
+
+and "which lists contain X" tests one bit per list. Lists are named by their
+path below watchlists/ without the extension ('TV_downloads/SP500/io-S&P500');
+any unique trailing part ('io-S&P500', 'SP500/io-S&P500') works as well, and
+a wildcard picks the newest of the dated lists it matches ('io-PVscreener_*').
+Quote names containing spaces or operators in expressions: "z-retail fashion".
+
+The result is written back in the TradingView import format (###SECTION
+markers followed by EXCH:SYMBOL entries on one comma-separated line).
+
+USAGE:
+    python3 -m tvind.watchlists --lists
+    python3 -m tvind.watchlists --contains NVDA HD
+    python3 -m tvind.watchlists --query 'io-S&P500 & io-NASDAQ100' --query 'SP400=io-SP400 - io-S&P500' --output combined.txt
+    python3 -m tvind.watchlists --files 'post-processing/PVscreener/png/io-PVscreener_*.txt' --query 'PV=io-PVscreener_* & io-S&P500'
+"""
+
+import argparse
+import fnmatch
+import glob
+import os
+import re
+import shlex
+import time
+
+import numpy as np
+
+from tvind import REPO_DIR
+
+WATCHLIST_DIR = os.path.join(REPO_DIR, 'watchlists')
+DEFAULT_DIRS = ['TV_downloads', 'nqusb_watchlists', 'other_watchlists']
+
+_SYMBOL_RE = re.compile(r'^(?:([A-Z0-9_]+):)?([A-Z0-9][A-Z0-9._!&^/-]*)$')
+_RULE_RE = re.compile(r'^#\s*[=\-#]{3,}\s*$')
+_OPERATORS = {'|', '&', '-', '(', ')'}
+
+
+def parse_entries(text):
+    """
+    [(section, 'EXCH:SYM' or 'SYM'), ...] of one list file in either layout.
+    Prose lines (reference guides, comments outside a ==== header) are skipped.
+    """
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    items = lines[0].split(',') if len(lines) == 1 and ',' in lines[0] else lines
+    entries, section, in_header = [], '', False
+    for item in (i.strip() for i in items):
+        if item.startswith('###'):
+            section, in_header = item.lstrip('#').strip(), False
+        elif _RULE_RE.match(item):
+            in_header = not in_header
+        elif item.startswith('#'):
+            if in_header:
+                section = item.lstrip('#').strip()
+        elif _SYMBOL_RE.match(item):
+            entries.append((section, item))
+    return entries
+
+
+def bit_ids(bits):
+    """Symbol IDs set in an int bitset, ascending."""
+    if bits <= 0:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+class WatchlistIndex:
+    """Symbol <-> ID dictionary plus one int bitset per list and per list section."""
+
+    def __init__(self):
+        self.ids = {}           # ticker -> ID
+        self.symbols = []       # ID -> display symbol (exchange-qualified when any list had it)
+        self.lists = {}         # name -> bitset
+        self._containing = None
+
+    def symbol_id(self, symbol):
+        exchange, ticker = _SYMBOL_RE.match(symbol).groups()
+        i = self.ids.get(ticker)
+        if i is None:
+            i = self.ids[ticker] = len(self.symbols)
+            self.symbols.append(symbol)
+        elif exchange and ':' not in self.symbols[i]:
+            self.symbols[i] = symbol
+        return i
+
+    def add(self, name, entries):
+        """Add one list from parse_entries() output; sections become 'name#SECTION'."""
+        bits, sections = 0, {}
+        for section, symbol in entries:
+            bit = 1 << self.symbol_id(symbol)
+            bits |= bit
+            if section:
+                sections[section] = sections.get(section, 0) | bit
+        if not bits:
+            return
+        self.lists[name] = self.lists.get(name, 0) | bits
+        for section, section_bits in sections.items():
+            key = f'{name}#{section}'
+            self.lists[key] = self.lists.get(key, 0) | section_bits
+        self._containing = None
+
+    def add_file(self, path, name=None):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            self.add(name or os.path.splitext(os.path.basename(path))[0], parse_entries(f.read()))
+
+    @classmethod
+    def from_dirs(cls, dirs=DEFAULT_DIRS, base=WATCHLIST_DIR, files=()):
+        """Ingest every .txt list below the given directories in one walk, plus single files (named by their stem)."""
+        index = cls()
+        for path in files:
+            index.add_file(path)
+        for d in dirs:
+            root = d if os.path.isabs(d) else os.path.join(base, d)
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if not filename.endswith('.txt'):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    name = os.path.splitext(os.path.relpath(path, base))[0].replace(os.sep, '/')
+                    index.add_file(path, name)
+        return index
+
+    def resolve(self, name):
+        """Full list name from an exact name, a unique trailing part of it or a wildcard (newest match)."""
+        if name in self.lists:
+            return name
+        if any(ch in name for ch in '*?['):
+            # dated names (..._YYYY-MM-DD) sort chronologically: the last match is the newest
+            matches = sorted(k for k in self.lists if '#' not in k and
+                             (fnmatch.fnmatchcase(k, name) or fnmatch.fnmatchcase(k, '*/' + name)))
+            if not matches:
+                raise KeyError(f"no list matches {name!r}")
+            return matches[-1]
+        matches = [k for k in self.lists if k.endswith('/' + name)]
+        if len(matches) != 1:
+            raise KeyError(f"{'ambiguous' if matches else 'unknown'} list {name!r}"
+                           + (f": {matches}" if matches else ''))
+        return matches[0]
+
+    def get(self, name):
+        return self.lists[self.resolve(name)]
+
+    def evaluate(self, expression):
+        """Bitset of an expression over list names with |, &, - and parentheses (left to right)."""
+        tokens = []
+        for word in shlex.split(expression):
+            # operators stand alone; parentheses may hug the names: (A | B) & C
+            core = word.lstrip('(')
+            tokens.extend('(' * (len(word) - len(core)))
+            name = core.rstrip(')')
+            tokens.extend([name] if name else [])
+            tokens.extend(')' * (len(core) - len(name)))
+        pos = 0
+
+        def operand():
+            nonlocal pos
+            if pos >= len(tokens):
+                raise ValueError(f"incomplete expression {expression!r}")
+            token = tokens[pos]
+            pos += 1
+            if token == '(':
+                value = chain()
+                if pos >= len(tokens) or tokens[pos] != ')':
+                    raise ValueError(f"missing ')' in {expression!r}")
+                pos += 1
+                return value
+            if token in _OPERATORS:
+                raise ValueError(f"unexpected {token!r} in {expression!r}")
+            return self.get(token)
+
+        def chain():
+            nonlocal pos
+            value = operand()
+            while pos < len(tokens) and tokens[pos] in ('|', '&', '-'):
+                op = tokens[pos]
+                pos += 1
+                rhs = operand()
+                value = value | rhs if op == '|' else value & rhs if op == '&' else value & ~rhs
+            return value
+
+        value = chain()
+        if pos != len(tokens):
+            raise ValueError(f"unexpected {tokens[pos]!r} in {expression!r}")
+        return value
+
+    def members(self, bits):
+        """Display symbols of a bitset in ID (first seen) order."""
+        return [self.symbols[i] for i in bit_ids(bits)]
+
+    def containing(self, symbol):
+        """Names of the lists and sections that contain the symbol."""
+        match = _SYMBOL_RE.match(symbol.strip().upper())
+        i = self.ids.get(match.group(2)) if match else None
+        if i is None:
+            return []
+        if self._containing is None:
+            # Inverted index: one bitset over list numbers per symbol, built once
+            names = list(self.lists)
+            inverse = [0] * len(self.symbols)
+            for k, name in enumerate(names):
+                for s in bit_ids(self.lists[name]):
+                    inverse[s] |= 1 << k
+            self._containing = (names, inverse)
+        names, inverse = self._containing
+        return [names[k] for k in bit_ids(inverse[i])]
+
+
+def to_tradingview(sections):
+    """[(section, symbols), ...] -> one-line TradingView import text with ###SECTION markers."""
+    items = []
+    for section, symbols in sections:
+        if section:
+            items.append(f'###{section}')
+        items.extend(symbols)
+    return ','.join(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set algebra over the exported watchlists with int bitsets")
+    parser.add_argument('--dirs', nargs='+', default=DEFAULT_DIRS, help="Directories below watchlists/ to ingest")
+    parser.add_argument('--files', nargs='+', default=[], help="Extra list files (globs allowed), named by their stem")
+    parser.add_argument('--lists', action='store_true', help="Show every list and section with its size")
+    parser.add_argument('--contains', nargs='+', help="Show which lists contain these symbols")
+    parser.add_argument('--query', action='append', default=[],
+                        help="[SECTION=]expression, e.g. 'Large=io-S&P500 | io-NASDAQ100' (repeatable)")
+    parser.add_argument('--output', help="Write the query results in TradingView import format")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    files = sorted({p for pattern in args.files for p in glob.glob(pattern)})
+    index = WatchlistIndex.from_dirs(args.dirs, files=files)
+    elapsed = (time.perf_counter() - start) * 1000
+    lists = sum(1 for k in index.lists if '#' not in k)
+    print(f"Lists: {lists} | Sections: {len(index.lists) - lists} | Symbols: {len(index.symbols)} "
+          f"| indexed in {elapsed:.1f} ms")
+
+    if args.lists:
+        for name, bits in index.lists.items():
+            print(f"  {bits.bit_count():5d}  {name}")
+
+    for symbol in args.contains or []:
+        found = index.containing(symbol)
+        print(f"\n{symbol}: {len(found)} lists")
+        for name in found:
+            print(f"  {name}")
+
+    results = []
+    for query in args.query:
+        section, _, expression = query.rpartition('=')
+        start = time.perf_counter()
+        try:
+            bits = index.evaluate(expression)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e.args[0]}")
+            return
+        symbols = index.members(bits)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n{section or expression}: {len(symbols)} symbols ({elapsed:.2f} ms)")
+        if not args.output:
+            print('  ' + ', '.join(symbols[:30]) + (' ...' if len(symbols) > 30 else ''))
+        results.append((section.strip(), symbols))
+
+    if args.output and results:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(to_tradingview(results))
+        print(f"\nWatchlist saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
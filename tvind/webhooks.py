@@ -0,0 +1,345 @@
+"""
+Async Webhook Client and Local Stand-In Server
+
+The alerts in webhook/ post one Discord JSON payload per symbol per alert
+(webhook/json_webhook). WebhookClient posts many payloads over a small pool
+of keep-alive HTTP/1.1 connections instead of one connection per message:
+
+    - at most `connections` sockets are opened and reused for every request
+    - a 429 answer (Discord rate limit) pauses all requests for retry_after
+      seconds, then the payload is retried
+    - a payload is only resent when the server never saw it: a failed
+      connect, or a reused idle socket the server had closed (failing before
+      any response byte). Timeouts and broken responses count as failures,
+      since Discord would post a resent alert twice
+    - pack_messages() joins alert messages into payloads of <= 2000 characters
+      (Discord's content limit), so a burst of alerts is a handful of requests
+
+Only the standard library is used (asyncio streams), so the alert engine has
+no extra dependency. The same request/response helpers back a stand-in
+webhook server that answers like Discord (204, optional 429s) and prints what
+it receives - point the alert engine at it to test without touching Discord.
+
+USAGE:
+    python3 -m tvind.webhooks --serve [--port 8787] [--rate-limit 20]
+    python3 -m tvind.webhooks --post http://127.0.0.1:8787/webhook --message "test alert"
+
+Webhook URLs are secrets: pass them on the command line or through
+DISCORD_WEBHOOK_URL, never commit them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PORT = 8787
+DISCORD_LIMIT = 2000
+DEFAULT_CONNECTIONS = 2
+
+REASONS = {200: 'OK', 202: 'Accepted', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 429: 'Too Many Requests',
+           503: 'Service Unavailable'}
+
+
+async def read_head(reader, prefix=b''):
+    """
+    Start line and lower-cased headers of one HTTP message, None on a cleanly
+    closed connection. prefix: bytes of the start line already read.
+    """
+    line = prefix + await reader.readline()
+    if not line:
+        return None
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = raw.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return line.decode('latin-1').strip(), headers
+
+
+class BodyTooLarge(ValueError):
+    """A chunked body grew past read_body()'s limit."""
+
+
+async def read_body(reader, headers, until_eof=False, limit=None):
+    """
+    Body by Content-Length or chunked encoding (responses without either run
+    to EOF). With a limit, a chunked body larger than it raises BodyTooLarge
+    before the oversized chunk is read (Content-Length is checked by the caller).
+    """
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length']))
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks, total = [], 0
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                return b''.join(chunks)
+            total += size
+            if limit is not None and total > limit:
+                raise BodyTooLarge(f"chunked body over {limit} bytes")
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+    return await reader.read() if until_eof else b''
+
+
+def format_response(status, body=b'', headers=None):
+    """Raw HTTP/1.1 response bytes."""
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}']
+    for name, value in {**(headers or {}), 'Content-Length': str(len(body))}.items():
+        lines.append(f'{name}: {value}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def pack_messages(messages, limit=DISCORD_LIMIT, per_payload=10):
+    """
+    Join messages into {"content": ...} payloads of at most `limit` characters
+    and `per_payload` messages. Returns [(payload, [message indices])].
+    """
+    payloads = []
+    current, members, size = [], [], 0
+    for i, message in enumerate(messages):
+        message = message[:limit]
+        extra = len(message) + (2 if current else 0)
+        if current and (size + extra > limit or len(current) >= per_payload):
+            payloads.append(({'content': '\n\n'.join(current)}, members))
+            current, members, size = [], [], 0
+            extra = len(message)
+        current.append(message)
+        members.append(i)
+        size += extra
+    if current:
+        payloads.append(({'content': '\n\n'.join(current)}, members))
+    return payloads
+
+
+class StaleConnection(ConnectionError):
+    """A reused keep-alive socket failed before any response byte: the server had closed it while idle."""
+
+
+class WebhookClient:
+    """POST JSON payloads to one webhook URL over a pool of reused keep-alive connections."""
+
+    def __init__(self, url, connections=DEFAULT_CONNECTIONS, timeout=10.0, max_retries=3):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"unsupported webhook URL scheme: {parts.scheme!r}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(connections)
+        self._idle = []
+        self._resume_at = 0.0
+        self.stats = {'requests': 0, 'connections': 0, 'rate_limited': 0, 'failed': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _open(self):
+        self.stats['connections'] += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+
+    async def _request(self, conn, body):
+        reader, writer = conn
+        head = (f'POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                f'Connection: keep-alive\r\n\r\n').encode('latin-1')
+        try:
+            writer.write(head + body)
+            await writer.drain()
+            first = await asyncio.wait_for(reader.read(1), self.timeout)
+        except ConnectionError as e:
+            raise StaleConnection(f"connection failed before the response: {e}") from e
+        if not first:
+            raise StaleConnection("connection closed before the response")
+
+        # Response bytes have arrived: from here on any failure is final (the POST was received)
+        async def response():
+            result = await read_head(reader, first)
+            if result is None:
+                raise ConnectionResetError("connection closed in the response")
+            status_line, headers = result
+            data = await read_body(reader, headers, until_eof=headers.get('connection', '').lower() == 'close')
+            return status_line, headers, data
+
+        status_line, headers, data = await asyncio.wait_for(response(), self.timeout)
+        keep = headers.get('connection', '').lower() != 'close'
+        return int(status_line.split()[1]), headers, data, keep
+
+    async def post(self, payload):
+        """POST one payload; returns the final HTTP status (0 if the request never completed)."""
+        body = json.dumps(payload).encode('utf-8')
+        async with self._slots:
+            for attempt in range(self.max_retries + 1):
+                # A 429 on any connection pauses every request (Discord's buckets are per webhook)
+                delay = self._resume_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                reused = bool(self._idle)
+                conn = self._idle.pop() if reused else None
+                try:
+                    if conn is None:
+                        try:
+                            conn = await self._open()
+                        except (OSError, asyncio.TimeoutError):
+                            if attempt < self.max_retries:
+                                continue            # nothing was sent yet
+                            raise
+                    try:
+                        status, headers, data, keep = await self._request(conn, body)
+                    except StaleConnection:
+                        if not reused:
+                            raise
+                        # The server closed the idle socket and never saw the POST: resend once on a fresh one.
+                        # Timeouts and failures after response bytes are not retried - webhooks are not
+                        # idempotent and a resend could post the alert twice.
+                        conn[1].close()
+                        conn = await self._open()
+                        status, headers, data, keep = await self._request(conn, body)
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                    if conn:
+                        conn[1].close()
+                    print(f"Error: webhook request failed: {e!r}")
+                    self.stats['failed'] += 1
+                    return 0
+
+                self.stats['requests'] += 1
+                if keep:
+                    self._idle.append(conn)
+                else:
+                    conn[1].close()
+
+                if status == 429 and attempt < self.max_retries:
+                    self.stats['rate_limited'] += 1
+                    self._resume_at = time.monotonic() + _retry_after(headers, data)
+                    continue
+                if status >= 300:
+                    self.stats['failed'] += 1
+                    print(f"Warning: webhook answered {status}: {data[:200].decode('utf-8', 'replace')}")
+                return status
+        print(f"Error: webhook request failed: could not connect after {self.max_retries + 1} attempts")
+        self.stats['failed'] += 1
+        return 0
+
+    async def post_many(self, payloads):
+        """POST all payloads concurrently (bounded by the connection pool), statuses in order."""
+        return await asyncio.gather(*(self.post(p) for p in payloads))
+
+
+def _retry_after(headers, data):
+    """Seconds to wait after a 429: Discord's JSON retry_after, else the Retry-After header, else 1 s."""
+    try:
+        return float(json.loads(data)['retry_after'])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(headers.get('retry-after', 1.0))
+    except ValueError:
+        return 1.0
+
+
+def deliver(url, payloads, connections=DEFAULT_CONNECTIONS):
+    """Synchronous wrapper: post every payload, return (statuses, client stats)."""
+    async def _run():
+        async with WebhookClient(url, connections) as client:
+            statuses = await client.post_many(payloads)
+            return statuses, client.stats
+    return asyncio.run(_run())
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, rate_limit=0, quiet=False):
+    """
+    Stand-in Discord webhook: answers 204 to every JSON POST and, with
+    rate_limit=N, a 429 with retry_after to every Nth request.
+    """
+    counter = {'requests': 0, 'payloads': 0}
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await read_head(reader)
+                if head is None:
+                    break
+                start_line, headers = head
+                body = await read_body(reader, headers)
+                counter['requests'] += 1
+
+                if rate_limit and counter['requests'] % rate_limit == 0:
+                    reply = json.dumps({'message': 'You are being rate limited.', 'retry_after': 0.25})
+                    writer.write(format_response(429, reply.encode(), {'Content-Type': 'application/json'}))
+                elif not start_line.startswith('POST'):
+                    writer.write(format_response(405))
+                else:
+                    try:
+                        payload = json.loads(body)
+                    except ValueError:
+                        writer.write(format_response(400, b'{"message": "Cannot send an empty message"}'))
+                    else:
+                        counter['payloads'] += 1
+                        if not quiet:
+                            print(f"[{counter['payloads']}] {payload.get('content', payload)}\n")
+                        writer.write(format_response(204))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Stand-in webhook listening on http://{host}:{port}/webhook (Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(f"Requests: {counter['requests']} | Payloads accepted: {counter['payloads']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async Discord webhook client and local stand-in server")
+    parser.add_argument('--serve', action='store_true', help="Run the stand-in webhook server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--rate-limit', type=int, default=0, help="Server: answer 429 to every Nth request")
+    parser.add_argument('--quiet', action='store_true', help="Server: do not print payloads")
+    parser.add_argument('--post', metavar='URL', help="Post --message to this webhook URL")
+    parser.add_argument('--message', default='Test alert from tvind.webhooks')
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            asyncio.run(serve(args.host, args.port, args.rate_limit, args.quiet))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    url = args.post or os.environ.get('DISCORD_WEBHOOK_URL')
+    if not url:
+        parser.error("--serve or --post URL (or DISCORD_WEBHOOK_URL) is required")
+    start = time.perf_counter()
+    statuses, stats = deliver(url, [{'content': args.message}])
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Status: {statuses[0]} | {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,109 +8,146 @@ os.environ["OPENBLAS_NUM_THREADS"] = "1"
 os.environ["VECLIB_MAXIMUM_THREADS"] = "1"
 os.environ["NUMEXPR_NUM_THREADS"] = "1"
 
-import pandas as pd
-import numpy as np
+import argparse
+import re
 import warnings
 
 # Suppress standard Python warnings
 warnings.filterwarnings("ignore")
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans, AgglomerativeClustering
-import plotly.express as px
-import plotly.graph_objects as go
-import os
+# pandas, numpy, scipy, sklearn and plotly are imported inside the functions that
+# use them, so --help starts fast
+
+# Configuration (override with --input / --output / --plot)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+input_file = os.path.join(SCRIPT_DIR, "ETFs-industries.csv")
+output_csv = os.path.join(SCRIPT_DIR, "ETFs-industries-clustered.csv")
+output_plot = os.path.join(SCRIPT_DIR, "cluster_plot.html")
+
+# Domain knowledge used to group related concepts (e.g. 'Uranium' and 'Energy')
+SECTOR_KEYWORDS = {
+    "energy": ["uranium", "nuclear", "oil", "gas", "solar", "power", "fuel", "cleantech", "renewables"],
+    "technology": ["software", "cybersecurity", "semiconductor", "semi", "quantum", "robotics", "data", "internet", "tech"],
+    "healthcare": ["biotech", "medical", "pharmaceutical", "generic", "healthcare", "devices", "neuroscience"],
+    "finance": ["bank", "insurance", "financial", "investment", "trusts", "broker"],
+    "materials": ["metal", "gold", "silver", "aluminum", "steel", "rare earth", "miners", "mining", "chemicals"],
+    "industrials": ["aerospace", "defense", "machinery", "transportation", "freight", "airlines", "trucking", "shipping", "construction"],
+    "consumer": ["retail", "apparel", "food", "beverages", "stores", "restaurants", "household", "gaming", "casinos"]
+}
 
-# Configuration
-input_file = "/home/imagda/_invest2024/tradingview/watchlist/ETFs-industries.csv"
-output_csv = "/home/imagda/_invest2024/tradingview/watchlist/ETFs-industries-clustered.csv"
-output_plot = "/home/imagda/_invest2024/tradingview/watchlist/cluster_plot.html"
+# One compiled alternation per sector - substring match, same as `kw in desc`
+SECTOR_PATTERNS = {
+    sector: re.compile("|".join(re.escape(kw) for kw in keywords))
+    for sector, keywords in SECTOR_KEYWORDS.items()
+}
 
-def semantic_enrichment(df):
+# Fixed names for the default 8-cluster hybrid mode
+CLUSTER_NAMES = {
+    0: "Financials & Insurance",
+    1: "Materials & Mining",
+    2: "Utilities & Infrastructure",
+    3: "Energy & Power",
+    4: "Consumer & Retail",
+    5: "Technology & Innovation",
+    6: "Healthcare & Life Sciences",
+    7: "Industrial & Aerospace"
+}
+
+def semantic_enrichment(df, text_column='Description'):
     """
     Enriches the description with domain knowledge to group related concepts.
     This helps TF-IDF bridge the gap between terms like 'Uranium' and 'Energy'.
+    Each sector pattern is matched once over the whole column (no per-row loop).
     """
-    mappings = {
-        "energy": ["uranium", "nuclear", "oil", "gas", "solar", "power", "fuel", "cleantech", "renewables"],
-        "technology": ["software", "cybersecurity", "semiconductor", "semi", "quantum", "robotics", "data", "internet", "tech"],
-        "healthcare": ["biotech", "medical", "pharmaceutical", "generic", "healthcare", "devices", "neuroscience"],
-        "finance": ["bank", "insurance", "financial", "investment", "trusts", "broker"],
-        "materials": ["metal", "gold", "silver", "aluminum", "steel", "rare earth", "miners", "mining", "chemicals"],
-        "industrials": ["aerospace", "defense", "machinery", "transportation", "freight", "airlines", "trucking", "shipping", "construction"],
-        "consumer": ["retail", "apparel", "food", "beverages", "stores", "restaurants", "household", "gaming", "casinos"]
-    }
-    
-    enriched_descriptions = []
-    for _, row in df.iterrows():
-        desc = row['Description'].lower()
-        tags = []
-        for sector, keywords in mappings.items():
-            if any(kw in desc for kw in keywords):
-                tags.append(sector)
-        
-        # Combine original description with sector tags for better semantic weight
-        enriched = desc + " " + " ".join(tags)
-        enriched_descriptions.append(enriched)
-    
-    return enriched_descriptions
+    import pandas as pd
+
+    desc = df[text_column].fillna('').astype(str).str.lower()
+
+    tags = pd.Series('', index=desc.index)
+    for sector, pattern in SECTOR_PATTERNS.items():
+        hit = desc.str.contains(pattern)
+        tags = tags.where(~hit, tags + sector + ' ')
+
+    # Combine original description with sector tags for better semantic weight
+    return (desc + " " + tags.str.rstrip()).tolist()
+
+def cluster_centroids(X, labels, n_clusters):
+    """Mean of each cluster as one sparse indicator-matrix product."""
+    import numpy as np
+    from scipy import sparse
+
+    onehot = sparse.csr_matrix(
+        (np.ones(len(labels)), (labels, np.arange(len(labels)))),
+        shape=(n_clusters, len(labels))
+    )
+    counts = np.asarray(onehot.sum(axis=1))
+    return (onehot @ X).toarray() / np.maximum(counts, 1)
 
-def perform_clustering():
-    if not os.path.exists(input_file):
-        print(f"Error: {input_file} not found.")
+def top_term_names(centroids, vectorizer, n_terms=3):
+    """Name each cluster after its heaviest TF-IDF terms."""
+    import numpy as np
+
+    terms = np.asarray(vectorizer.get_feature_names_out())
+    top = np.argsort(-centroids, axis=1)[:, :n_terms]
+    return {i: " / ".join(terms[row]) for i, row in enumerate(top)}
+
+def perform_clustering(input_path=input_file, output_path=output_csv, plot_path=output_plot,
+                       scalable=False, n_clusters=8, max_features=100, text_column='Description'):
+    if not os.path.exists(input_path):
+        print(f"Error: {input_path} not found.")
         return
 
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.cluster import KMeans, MiniBatchKMeans, AgglomerativeClustering
+    import plotly.express as px
+
     # 1. Load Data
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_path)
     print(f"Loaded {len(df)} ETFs.")
 
-    # 2. Preprocess & Vectorize
-    enriched = semantic_enrichment(df)
-    vectorizer = TfidfVectorizer(max_features=100)
-    X = vectorizer.fit_transform(enriched).toarray()
-
-    # 3. Dimensionality Reduction (PCA)
-    pca = PCA(n_components=2)
-    X_pca = pca.fit_transform(X)
-    df['Dim1'] = X_pca[:, 0]
-    df['Dim2'] = X_pca[:, 1]
-
-    # 4. Hybrid Clustering
-    # Step A: Hierarchical to get initial clusters and centroids
-    n_clusters = 8
-    hierarchical = AgglomerativeClustering(n_clusters=n_clusters)
-    hier_labels = hierarchical.fit_predict(X)
-    
-    # Calculate centroids from hierarchical clustering
-    initial_centroids = []
-    for i in range(n_clusters):
-        initial_centroids.append(X[hier_labels == i].mean(axis=0))
-    initial_centroids = np.array(initial_centroids)
-
-    # Step B: Refine with K-means
-    kmeans = KMeans(n_clusters=n_clusters, init=initial_centroids, n_init=1)
-    df['Cluster_ID'] = kmeans.fit_predict(X)
-    
+    # 2. Preprocess & Vectorize (X stays a sparse CSR matrix)
+    enriched = semantic_enrichment(df, text_column)
+    vectorizer = TfidfVectorizer(max_features=max_features)
+    X = vectorizer.fit_transform(enriched)
+
+    # 3. Dimensionality Reduction (TruncatedSVD works on sparse input)
+    svd = TruncatedSVD(n_components=2, random_state=42)
+    X_2d = svd.fit_transform(X)
+    df['Dim1'] = X_2d[:, 0]
+    df['Dim2'] = X_2d[:, 1]
+
+    if scalable:
+        # 4. Scalable Clustering: mini-batch K-means straight on the sparse matrix
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=42)
+        df['Cluster_ID'] = kmeans.fit_predict(X)
+        cluster_names = top_term_names(kmeans.cluster_centers_, vectorizer)
+    else:
+        # 4. Hybrid Clustering
+        # Step A: Hierarchical to get initial clusters and centroids
+        # (ward linkage needs dense input - fine at watchlist size, use --scalable beyond that)
+        hierarchical = AgglomerativeClustering(n_clusters=n_clusters)
+        hier_labels = hierarchical.fit_predict(X.toarray())
+
+        # Calculate centroids from hierarchical clustering
+        initial_centroids = cluster_centroids(X, hier_labels, n_clusters)
+
+        # Step B: Refine with K-means
+        kmeans = KMeans(n_clusters=n_clusters, init=initial_centroids, n_init=1)
+        df['Cluster_ID'] = kmeans.fit_predict(X)
+        cluster_names = CLUSTER_NAMES if n_clusters == len(CLUSTER_NAMES) else \
+            top_term_names(kmeans.cluster_centers_, vectorizer)
+
     # 5. Assign Cluster Names
-    cluster_names = {
-        0: "Financials & Insurance",
-        1: "Materials & Mining",
-        2: "Utilities & Infrastructure",
-        3: "Energy & Power",
-        4: "Consumer & Retail",
-        5: "Technology & Innovation",
-        6: "Healthcare & Life Sciences",
-        7: "Industrial & Aerospace"
-    }
     df['Cluster_Name'] = df['Cluster_ID'].map(cluster_names)
 
     # 6. Visualization
     fig = px.scatter(
         df, x='Dim1', y='Dim2',
         color='Cluster_Name',
-        text='Symbol',
-        hover_data=['Description', 'Cluster'],
+        text='Symbol' if len(df) <= 500 else None,
+        hover_data=[c for c in [text_column, 'Cluster'] if c in df.columns],
         title='ETF Industries: Semantic Clustering (Named Zones)',
         template='plotly_dark'
     )
@@ -124,10 +161,25 @@ def perform_clustering():
     )
 
     # 6. Save results
-    df.to_csv(output_csv, index=False)
-    fig.write_html(output_plot)
-    print(f"CSV saved to {output_csv}")
-    print(f"Plot saved to {output_plot}")
+    df.to_csv(output_path, index=False)
+    fig.write_html(plot_path)
+    print(f"CSV saved to {output_path}")
+    print(f"Plot saved to {plot_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic clustering of ETF/stock descriptions")
+    parser.add_argument('--input', default=input_file)
+    parser.add_argument('--output', default=output_csv)
+    parser.add_argument('--plot', default=output_plot)
+    parser.add_argument('--scalable', action='store_true',
+                        help="Sparse mini-batch K-means for large universes (e.g. the GIDS directory)")
+    parser.add_argument('--clusters', type=int, default=8)
+    parser.add_argument('--max-features', type=int, default=100)
+    parser.add_argument('--text-column', default='Description', help="e.g. 'Name' for GIDS_Directory")
+    args = parser.parse_args()
+
+    perform_clustering(args.input, args.output, args.plot, args.scalable,
+                       args.clusters, args.max_features, args.text_column)
 
 if __name__ == "__main__":
-    perform_clustering()
+    main()